@@ -1,9 +1,9 @@
 from rest_framework import serializers
 from .models import MarketInsight, CareerPath, CareerStep, CareerStepSkill, LearningResource
-from taxonomy.serializers import SkillSerializer
+from taxonomy.serializers import DynamicFieldsMixin, SkillSerializer
 
 
-class MarketInsightSerializer(serializers.ModelSerializer):
+class MarketInsightSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for market insights"""
     
     class Meta:
@@ -15,7 +15,7 @@ class MarketInsightSerializer(serializers.ModelSerializer):
         ]
 
 
-class LearningResourceSerializer(serializers.ModelSerializer):
+class LearningResourceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for learning resources"""
     
     class Meta:
@@ -26,7 +26,7 @@ class LearningResourceSerializer(serializers.ModelSerializer):
         ]
 
 
-class CareerStepSkillSerializer(serializers.ModelSerializer):
+class CareerStepSkillSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for career step skills"""
     skill = SkillSerializer(read_only=True)
     learning_resources = LearningResourceSerializer(
@@ -43,7 +43,7 @@ class CareerStepSkillSerializer(serializers.ModelSerializer):
         ]
 
 
-class CareerStepSerializer(serializers.ModelSerializer):
+class CareerStepSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for career steps"""
     required_skills = CareerStepSkillSerializer(many=True, read_only=True)
     
@@ -55,7 +55,7 @@ class CareerStepSerializer(serializers.ModelSerializer):
         ]
 
 
-class CareerPathSerializer(serializers.ModelSerializer):
+class CareerPathSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for career paths"""
     steps = CareerStepSerializer(many=True, read_only=True)
     
@@ -67,7 +67,7 @@ class CareerPathSerializer(serializers.ModelSerializer):
         ]
 
 
-class SkillLearningResourcesSerializer(serializers.ModelSerializer):
+class SkillLearningResourcesSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for skill with learning resources"""
     learning_resources = LearningResourceSerializer(many=True, read_only=True)
     
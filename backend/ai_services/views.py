@@ -9,6 +9,8 @@ import logging
 import time
 
 from taxonomy.models import Occupation, Skill
+from taxonomy.labels import resolve
+from taxonomy.serializers import field_tree, requested_fields, wants, skill_prefetches
 from .models import MarketInsight, CareerPath, CareerStep, CareerStepSkill, LearningResource
 from .serializers import (
     MarketInsightSerializer, 
@@ -20,6 +22,24 @@ from .gemini_service import GeminiService
 logger = logging.getLogger(__name__)
 
 
+def career_path_prefetches(request):
+    """Prefetches for CareerPathSerializer, limited to the fields a request selects"""
+    tree = field_tree(request)
+    prefetches = []
+    if wants(requested_fields(tree), 'steps'):
+        prefetches.append('steps')
+    if wants(requested_fields(tree, 'steps'), 'required_skills'):
+        prefetches.append('steps__required_skills__skill')
+        step_skill_fields = requested_fields(tree, 'steps.required_skills')
+        if wants(step_skill_fields, 'learning_resources'):
+            prefetches.append('steps__required_skills__skill__learning_resources')
+        if wants(step_skill_fields, 'skill'):
+            prefetches += skill_prefetches(
+                'steps__required_skills__skill__', requested_fields(tree, 'steps.required_skills.skill')
+            )
+    return prefetches
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([AllowAny])
 def occupation_market_insights(request, occupation_id):
@@ -29,7 +49,7 @@ def occupation_market_insights(request, occupation_id):
     if request.method == 'GET':
         try:
             market_insight = MarketInsight.objects.get(occupation=occupation)
-            serializer = MarketInsightSerializer(market_insight)
+            serializer = MarketInsightSerializer(market_insight, context={'request': request})
             return Response(serializer.data)
         except MarketInsight.DoesNotExist:
             return Response(
@@ -62,7 +82,7 @@ def occupation_market_insights(request, occupation_id):
                 }
             )
             
-            serializer = MarketInsightSerializer(market_insight)
+            serializer = MarketInsightSerializer(market_insight, context={'request': request})
             return Response(
                 serializer.data, 
                 status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
@@ -83,11 +103,8 @@ def occupation_career_paths(request, occupation_id):
     occupation = get_object_or_404(Occupation, id=occupation_id)
     
     if request.method == 'GET':
-        career_paths = CareerPath.objects.filter(occupation=occupation).prefetch_related(
-            'steps__required_skills__skill',
-            'steps__required_skills__skill__learning_resources'
-        )
-        serializer = CareerPathSerializer(career_paths, many=True)
+        career_paths = CareerPath.objects.filter(occupation=occupation).prefetch_related(*career_path_prefetches(request))
+        serializer = CareerPathSerializer(career_paths, many=True, context={'request': request})
         return Response(serializer.data)
     
     elif request.method == 'POST':
@@ -106,11 +123,8 @@ def occupation_career_paths(request, occupation_id):
             
             if recent_paths:
                 # Return existing paths instead of regenerating
-                career_paths = CareerPath.objects.filter(occupation=occupation).prefetch_related(
-                    'steps__required_skills__skill',
-                    'steps__required_skills__skill__learning_resources'
-                )
-                serializer = CareerPathSerializer(career_paths, many=True)
+                career_paths = CareerPath.objects.filter(occupation=occupation).prefetch_related(*career_path_prefetches(request))
+                serializer = CareerPathSerializer(career_paths, many=True, context={'request': request})
                 return Response({
                     'message': 'Recent career paths found, returning existing data. Use force=true to regenerate.',
                     'data': serializer.data
@@ -153,16 +167,10 @@ def occupation_career_paths(request, occupation_id):
                     for skill_data in step_data.get('required_skills', []):
                         skill_name = skill_data.get('skill_name', '').strip()
                         if skill_name:
-                            all_skill_names.add(skill_name.lower())
+                            all_skill_names.add(skill_name)
             
-            # Bulk lookup existing skills
-            existing_skills = {}
-            if all_skill_names:
-                skills_queryset = Skill.objects.filter(
-                    preferred_label__iregex=r'^(' + '|'.join(all_skill_names) + r')$'
-                )
-                for skill in skills_queryset:
-                    existing_skills[skill.preferred_label.lower()] = skill
+            # Bulk lookup existing skills by preferred or alternative label
+            existing_skills = _resolve_skills(all_skill_names)
             
             print(f"Found {len(existing_skills)} existing skills out of {len(all_skill_names)} requested")
             
@@ -199,7 +207,7 @@ def occupation_career_paths(request, occupation_id):
                                 for skill_data in step_data.get('required_skills', []):
                                     skill_name = skill_data.get('skill_name', '').strip()
                                     if skill_name:
-                                        skill = existing_skills.get(skill_name.lower())
+                                        skill = existing_skills.get(skill_name)
                                         if skill:
                                             skills_to_create.append(CareerStepSkill(
                                                 career_step=career_step,
@@ -223,11 +231,8 @@ def occupation_career_paths(request, occupation_id):
                         continue
             
             # Return the created career paths
-            career_paths = CareerPath.objects.filter(occupation=occupation).prefetch_related(
-                'steps__required_skills__skill',
-                'steps__required_skills__skill__learning_resources'
-            )
-            serializer = CareerPathSerializer(career_paths, many=True)
+            career_paths = CareerPath.objects.filter(occupation=occupation).prefetch_related(*career_path_prefetches(request))
+            serializer = CareerPathSerializer(career_paths, many=True, context={'request': request})
             return Response(serializer.data, status=status.HTTP_201_CREATED)
             
         except Exception as e:
@@ -246,7 +251,7 @@ def skill_learning_resources(request, skill_id):
     
     if request.method == 'GET':
         resources = LearningResource.objects.filter(skill=skill)
-        serializer = LearningResourceSerializer(resources, many=True)
+        serializer = LearningResourceSerializer(resources, many=True, context={'request': request})
         return Response(serializer.data)
     
     elif request.method == 'POST':
@@ -281,7 +286,7 @@ def skill_learning_resources(request, skill_id):
                     cost=resource_data.get('cost', '')
                 )
                 created_resources.append(resource)
-            serializer = LearningResourceSerializer(created_resources, many=True)
+            serializer = LearningResourceSerializer(created_resources, many=True, context={'request': request})
             return Response(serializer.data, status=status.HTTP_201_CREATED)
             
         except Exception as e:
@@ -292,13 +297,11 @@ def skill_learning_resources(request, skill_id):
             )
 
 
-def _find_or_create_skill(skill_name: str):
-    """Find existing skill by name or return None"""
-    try:
-        # Try exact match first
-        return Skill.objects.filter(preferred_label__iexact=skill_name).first()
-    except Exception:
-        return None
+def _resolve_skills(skill_names):
+    """Map skill names to existing skills with one indexed label lookup"""
+    skill_ids = resolve(skill_names)
+    skills = Skill.objects.in_bulk(set(skill_ids.values()))
+    return {name: skills[skill_id] for name, skill_id in skill_ids.items() if skill_id in skills}
 
 
 @api_view(['POST'])
@@ -339,6 +342,13 @@ def generate_all_insights(request, occupation_id):
             occupation.description or occupation.definition
         )
         
+        existing_skills = _resolve_skills({
+            skill_data['skill_name']
+            for path_data in career_paths_data
+            for step_data in path_data.get('steps', [])
+            for skill_data in step_data.get('required_skills', [])
+        })
+        
         created_paths = []
         with transaction.atomic():
             for path_data in career_paths_data:
@@ -362,7 +372,7 @@ def generate_all_insights(request, occupation_id):
                     )
                     
                     for skill_data in step_data.get('required_skills', []):
-                        skill = _find_or_create_skill(skill_data['skill_name'])
+                        skill = existing_skills.get(skill_data['skill_name'])
                         if skill:
                             CareerStepSkill.objects.create(
                                 career_step=career_step,
@@ -373,9 +383,7 @@ def generate_all_insights(request, occupation_id):
                 
                 created_paths.append(career_path)
         
-        career_paths = CareerPath.objects.filter(occupation=occupation).prefetch_related(
-            'steps__required_skills__skill'
-        )
+        career_paths = CareerPath.objects.filter(occupation=occupation).prefetch_related(*career_path_prefetches(None))
         results['career_paths'] = CareerPathSerializer(career_paths, many=True).data
         
         return Response(results, status=status.HTTP_201_CREATED)
@@ -233,6 +233,13 @@ DATABASES['default']['OPTIONS'] = {
     'timeout': 300,  # 5 minutes timeout for database operations
 }
 
+# Binary taxonomy snapshots, mmapped read-only by every worker process
+TAXONOMY_SNAPSHOT_DIR = config('TAXONOMY_SNAPSHOT_DIR', default=str(BASE_DIR / 'snapshots'))
+
+# HTTP caching of the taxonomy read endpoints; ETags change with every import
+TAXONOMY_CACHE_MAX_AGE = config('TAXONOMY_CACHE_MAX_AGE', default=300, cast=int)
+TAXONOMY_CACHE_STALE_WHILE_REVALIDATE = config('TAXONOMY_CACHE_STALE_WHILE_REVALIDATE', default=3600, cast=int)
+
 # Logging configuration for AI services
 LOGGING = {
     'version': 1,
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Import after the app registry is ready; builds the taxonomy caches up front
+from taxonomy.warmup import warm_caches_on_start  # noqa: E402
+
+warm_caches_on_start()
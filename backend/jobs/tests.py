@@ -1,3 +1,65 @@
+import os
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from taxonomy import extraction
+from taxonomy.models import Skill
+from .views import extract_requirements
+
+
+DESCRIPTION = 'We need a Python developer experienced in managing projects and project management with python.'
+
+
+class RequirementExtractionTests(TestCase):
+    """Job requirements are the preferred labels of the taxonomy skills a description mentions"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for skill_id, label, alt_labels in (
+            ('python', 'Python (computer programming)', 'Python'),
+            ('project-management', 'project management', 'managing projects'),
+            ('management', 'management', ''),
+        ):
+            Skill.objects.create(id=skill_id, uuid_history=f'uuid-{skill_id}', preferred_label=label, alt_labels=alt_labels)
+        cls.user = User.objects.create_user('seeker', password='secret')
+
+    def setUp(self):
+        # Test classes share the empty database's version key
+        extraction._extractor_version = None
+
+    def test_preferred_labels_in_order_of_mention(self):
+        self.assertEqual(
+            extract_requirements(DESCRIPTION),
+            ['Python (computer programming)', 'project management']
+        )
+        self.assertEqual(extract_requirements(''), [])
+        self.assertEqual(extract_requirements(None), [])
+
+    def test_at_most_eight_requirements(self):
+        for index in range(10):
+            Skill.objects.create(id=f'tool-{index}', uuid_history=f'uuid-tool-{index}', preferred_label=f'toolkit{index}')
+        extraction._extractor_version = None
+        description = ' '.join(f'toolkit{index}' for index in range(10))
+        self.assertEqual(extract_requirements(description), [f'toolkit{index}' for index in range(8)])
 
-# Create your tests here.
+    @mock.patch.dict(os.environ, {'SERPAPI_KEY': 'test-key'})
+    @mock.patch('jobs.views.requests.get')
+    def test_search_results_carry_requirements(self, get):
+        get.return_value.ok = True
+        get.return_value.json.return_value = {
+            'jobs_results': [{
+                'job_id': 'job-1', 'title': 'Developer', 'description': DESCRIPTION,
+                'apply_options': [{'link': 'https://example.org/apply'}],
+            }],
+        }
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/jobs/search/', {'query': 'developer'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data['jobs'][0]['requirements'],
+            ['Python (computer programming)', 'project management']
+        )
@@ -7,6 +7,8 @@ from django.conf import settings
 import logging
 from dotenv import load_dotenv
 
+from taxonomy.extraction import extract_skills
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -185,28 +187,11 @@ def extract_industry(job):
 
 
 def extract_requirements(description):
-    """Extract requirements from job description"""
+    """Extract the taxonomy skills mentioned in a job description"""
     requirements = []
-    text = description.lower()
-    
-    tech_skills = [
-        'javascript', 'python', 'java', 'react', 'node.js', 'typescript', 'sql', 'aws',
-        'docker', 'kubernetes', 'git', 'html', 'css', 'angular', 'vue.js', 'mongodb',
-        'postgresql', 'redis', 'graphql', 'rest api', 'microservices', 'agile', 'scrum'
-    ]
-    
-    soft_skills = [
-        'communication', 'teamwork', 'leadership', 'problem solving', 'analytical thinking',
-        'project management', 'time management', 'creativity', 'adaptability'
-    ]
-    
-    for skill in tech_skills:
-        if skill.lower() in text:
-            requirements.append(skill)
-    
-    for skill in soft_skills[:2]:
-        if skill.lower() in text or len(requirements) < 3:
-            requirements.append(skill)
+    for mention in extract_skills(description or ''):
+        if mention['label'] and mention['label'] not in requirements:
+            requirements.append(mention['label'])
     
     return requirements[:8]
 
@@ -2,7 +2,7 @@ from django.contrib import admin
 from .models import (
     ModelInfo, SkillGroup, Skill, OccupationGroup, Occupation,
     SkillToSkillRelation, OccupationToSkillRelation, 
-    SkillHierarchy, OccupationHierarchy
+    SkillHierarchy, OccupationHierarchy, ImportCheckpoint
 )
 
 
@@ -23,9 +23,13 @@ class SkillGroupAdmin(admin.ModelAdmin):
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
-    list_display = ['preferred_label', 'skill_type', 'reuse_level', 'is_localized', 'created_at']
+    list_display = [
+        'preferred_label', 'skill_type', 'reuse_level', 'occupation_count', 'essential_count',
+        'is_localized', 'created_at'
+    ]
     list_filter = ['skill_type', 'reuse_level', 'is_localized', 'created_at']
     search_fields = ['preferred_label', 'description', 'alt_labels']
+    readonly_fields = ['occupation_count', 'essential_count']
     ordering = ['preferred_label']
 
 
@@ -69,3 +73,10 @@ class SkillHierarchyAdmin(admin.ModelAdmin):
 class OccupationHierarchyAdmin(admin.ModelAdmin):
     list_display = ['parent_object_type', 'parent_id', 'child_object_type', 'child_id', 'created_at']
     list_filter = ['parent_object_type', 'child_object_type', 'created_at']
+
+
+@admin.register(ImportCheckpoint)
+class ImportCheckpointAdmin(admin.ModelAdmin):
+    list_display = ['file_name', 'rows_committed', 'batch_id', 'completed', 'updated_at']
+    list_filter = ['completed']
+    readonly_fields = ['file_name', 'source_signature', 'rows_committed', 'batch_id', 'completed']
@@ -0,0 +1,148 @@
+"""
+In-memory prefix autocomplete over skill and occupation labels.
+
+Each index keeps the normalized preferred and alternative labels in one
+sorted list, so the labels starting with a prefix are a contiguous range
+found with bisect. Results for short prefixes, whose ranges are large, are
+ranked once when the index is built. Indexes are rebuilt per process when a
+new taxonomy version is imported.
+"""
+import threading
+from bisect import bisect_left
+from django.db.models import Count
+from .models import Skill, Occupation, OccupationToSkillRelation
+from .text import normalize_label, split_alt_labels
+from .versioning import taxonomy_version
+
+
+MAX_RESULTS = 20
+# Prefixes up to this length have their results ranked at build time
+PRECOMPUTED_PREFIX_LENGTH = 3
+
+# Match tiers, best first
+PREFERRED_LABEL, ALT_LABEL, LATER_WORD = range(3)
+
+
+class AutocompleteIndex:
+    """Sorted label index of one entity type"""
+
+    def __init__(self, entity_type, rows, popularity):
+        self.entity_type = entity_type
+        self.labels = {}
+        entries = []
+        for entity_id, preferred_label, alt_labels in rows:
+            self.labels[entity_id] = preferred_label
+            rank = -popularity.get(entity_id, 0)
+            key = normalize_label(preferred_label)
+            if key:
+                entries.append((key, (PREFERRED_LABEL, rank, len(key)), entity_id))
+                # Also complete on later words: "python" finds "programming in python"
+                words = key.split(' ')
+                for position in range(1, len(words)):
+                    entries.append((' '.join(words[position:]), (LATER_WORD, rank, len(key)), entity_id))
+            for alt_label in split_alt_labels(alt_labels):
+                alt_key = normalize_label(alt_label)
+                if alt_key and alt_key != key:
+                    entries.append((alt_key, (ALT_LABEL, rank, len(alt_key)), entity_id))
+
+        entries.sort()
+        self.keys = [entry[0] for entry in entries]
+        self.scores = [entry[1] for entry in entries]
+        self.ids = [entry[2] for entry in entries]
+        self.precomputed = {}
+        self._precompute()
+
+    def _range(self, prefix):
+        start = bisect_left(self.keys, prefix)
+        return start, bisect_left(self.keys, prefix + '\uffff', start)
+
+    def _top(self, start, end, limit):
+        """Best-scoring distinct entities in keys[start:end]"""
+        results = []
+        seen = set()
+        for position in sorted(range(start, end), key=self.scores.__getitem__):
+            entity_id = self.ids[position]
+            if entity_id not in seen:
+                seen.add(entity_id)
+                results.append((self.scores[position], entity_id))
+                if len(results) == limit:
+                    break
+        return results
+
+    def _precompute(self):
+        for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+            start = 0
+            while start < len(self.keys):
+                prefix = self.keys[start][:length]
+                if len(prefix) < length:
+                    start += 1
+                    continue
+                end = bisect_left(self.keys, prefix + '\uffff', start)
+                self.precomputed[prefix] = self._top(start, end, MAX_RESULTS)
+                start = end
+
+    def complete(self, prefix, limit=MAX_RESULTS):
+        """Return [(score, id)] of the best matches for a normalized prefix"""
+        if not prefix:
+            return []
+        if prefix in self.precomputed:
+            return self.precomputed[prefix][:limit]
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            return []
+        return self._top(*self._range(prefix), limit)
+
+
+def build_indexes():
+    skill_popularity = dict(Skill.objects.filter(occupation_count__gt=0).values_list('id', 'occupation_count'))
+    occupation_popularity = dict(
+        OccupationToSkillRelation.objects.values_list('occupation_id').annotate(count=Count('id')).order_by()
+    )
+    return {
+        'skill': AutocompleteIndex(
+            'skill',
+            Skill.objects.values_list('id', 'preferred_label', 'alt_labels').iterator(chunk_size=5000),
+            skill_popularity
+        ),
+        'occupation': AutocompleteIndex(
+            'occupation',
+            Occupation.objects.values_list('id', 'preferred_label', 'alt_labels').iterator(chunk_size=5000),
+            occupation_popularity
+        ),
+    }
+
+
+_lock = threading.Lock()
+_indexes = None
+_indexes_version = None
+
+
+def get_indexes():
+    """Return the autocomplete indexes of the current taxonomy version"""
+    global _indexes, _indexes_version
+    version = taxonomy_version()
+    if _indexes_version != version:
+        with _lock:
+            if _indexes_version != version:
+                _indexes = build_indexes()
+                _indexes_version = version
+    return _indexes
+
+
+def autocomplete(query, entity_type=None, limit=10):
+    """Return up to `limit` suggestions as dicts with id, label and type"""
+    prefix = normalize_label(query)
+    limit = max(1, min(limit, MAX_RESULTS))
+    indexes = get_indexes()
+    types = [entity_type] if entity_type else list(indexes)
+
+    matches = []
+    for name in types:
+        index = indexes[name]
+        for score, entity_id in index.complete(prefix, limit):
+            matches.append((score, name, entity_id))
+    matches.sort(key=lambda match: match[0])
+
+    return [
+        {'id': entity_id, 'label': indexes[name].labels[entity_id], 'type': name}
+        for _, name, entity_id in matches[:limit]
+    ]
@@ -0,0 +1,76 @@
+"""
+HTTP conditional requests for the taxonomy read endpoints.
+
+Taxonomy data only changes through imports, so a response is identified by
+the taxonomy version: `conditional` derives a weak ETag from it and a
+Last-Modified date from the latest import. A matching If-None-Match or
+If-Modified-Since is answered with 304 before the view runs, from the
+process-cached version, so revalidation costs no query. Successful responses
+are marked publicly cacheable for TAXONOMY_CACHE_MAX_AGE seconds; errors get
+no validators, so a 404 is never revalidated into a 304. The hierarchy tree,
+which has ETags of its own, uses `cache_publicly` and `accepts_gzip` directly.
+"""
+import hashlib
+from functools import wraps
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from .versioning import taxonomy_last_modified, taxonomy_version
+
+
+def version_etag(request, *args, **kwargs):
+    digest = hashlib.sha1(taxonomy_version().encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def version_last_modified(request, *args, **kwargs):
+    return taxonomy_last_modified()
+
+
+def cache_publicly(response):
+    """Mark a response cacheable by browsers and shared caches per the TAXONOMY_CACHE_* settings"""
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=settings.TAXONOMY_CACHE_MAX_AGE,
+        stale_while_revalidate=settings.TAXONOMY_CACHE_STALE_WHILE_REVALIDATE,
+    )
+
+
+def accepts_gzip(request):
+    """Whether the Accept-Encoding header allows gzip, honouring q-values (`gzip;q=0` refuses it)"""
+    qualities = {}
+    for coding in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, *params = coding.split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    # `*` stands for every coding the header does not name
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+def conditional(view):
+    """Wrap a read-only view with version-keyed ETag, Last-Modified and Cache-Control"""
+    conditional_view = condition(etag_func=version_etag, last_modified_func=version_last_modified)(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        if response.status_code != 304 and not 200 <= response.status_code < 300:
+            del response['ETag']
+            del response['Last-Modified']
+            return response
+        if response.status_code == 304:
+            # DRF varies the full response on Accept; the 304 must say so too
+            patch_vary_headers(response, ['Accept'])
+        if not response.has_header('Cache-Control'):
+            cache_publicly(response)
+        return response
+
+    return wrapper
@@ -0,0 +1,125 @@
+"""
+Closure tables of the skill and occupation hierarchies.
+
+SkillHierarchyClosure and OccupationHierarchyClosure hold one row per
+(ancestor, descendant) pair with the number of links between them, computed
+in memory from the parent/child rows in a single pass after each import. A
+subtree or a breadcrumb is then one indexed SELECT instead of one query per
+level.
+"""
+from collections import defaultdict, deque
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from .models import (
+    Skill, SkillGroup, Occupation, OccupationGroup,
+    SkillHierarchy, OccupationHierarchy,
+    SkillHierarchyClosure, OccupationHierarchyClosure
+)
+
+
+# hierarchy name: (hierarchy model, closure model, models holding the node labels)
+HIERARCHIES = {
+    'skill': (SkillHierarchy, SkillHierarchyClosure, (Skill, SkillGroup)),
+    'occupation': (OccupationHierarchy, OccupationHierarchyClosure, (Occupation, OccupationGroup)),
+}
+
+
+def closure_pairs(edges):
+    """Yield (ancestor type, ancestor ID, descendant type, descendant ID, depth) from parent/child edges.
+
+    `edges` yields (parent type, parent ID, child type, child ID). A node
+    reachable along several paths gets its shortest distance; cycles are
+    cut where they close.
+    """
+    children = defaultdict(list)
+    for parent_type, parent_id, child_type, child_id in edges:
+        children[(parent_type, parent_id)].append((child_type, child_id))
+
+    for ancestor in children:
+        depths = {ancestor: 0}
+        queue = deque([ancestor])
+        while queue:
+            node = queue.popleft()
+            for child in children.get(node, ()):
+                if child not in depths:
+                    depths[child] = depths[node] + 1
+                    queue.append(child)
+                    yield ancestor[0], ancestor[1], child[0], child[1], depths[child]
+
+
+def sync_closure(hierarchy_model, closure_model, batch_size=5000):
+    """Bring one closure table in line with its hierarchy; returns (inserted, deleted)"""
+    edges = hierarchy_model.objects.values_list(
+        'parent_object_type', 'parent_id', 'child_object_type', 'child_id'
+    ).iterator(chunk_size=batch_size)
+    wanted = {
+        (ancestor_id, descendant_id): (ancestor_type, descendant_type, depth)
+        for ancestor_type, ancestor_id, descendant_type, descendant_id, depth in closure_pairs(edges)
+    }
+
+    stale = []
+    existing = closure_model.objects.values_list(
+        'pk', 'ancestor_id', 'descendant_id', 'ancestor_type', 'descendant_type', 'depth'
+    )
+    for pk, ancestor_id, descendant_id, *values in existing.iterator(chunk_size=batch_size):
+        if wanted.get((ancestor_id, descendant_id)) == tuple(values):
+            del wanted[(ancestor_id, descendant_id)]
+        else:
+            stale.append(pk)
+
+    for start in range(0, len(stale), batch_size):
+        closure_model.objects.filter(pk__in=stale[start:start + batch_size]).delete()
+    closure_model.objects.bulk_create(
+        (
+            closure_model(
+                ancestor_type=ancestor_type, ancestor_id=ancestor_id,
+                descendant_type=descendant_type, descendant_id=descendant_id, depth=depth
+            )
+            for (ancestor_id, descendant_id), (ancestor_type, descendant_type, depth) in wanted.items()
+        ),
+        batch_size=batch_size
+    )
+    return len(wanted), len(stale)
+
+
+def rebuild_closures(batch_size=5000):
+    """Sync both closure tables with the imported hierarchies"""
+    return {
+        closure_model.__name__: sync_closure(hierarchy_model, closure_model, batch_size)
+        for hierarchy_model, closure_model, _ in HIERARCHIES.values()
+    }
+
+
+def _with_labels(queryset, id_field, label_models):
+    """Annotate the preferred label of the node in `id_field`, whichever model holds it"""
+    return queryset.annotate(label=Coalesce(*[
+        Subquery(model.objects.filter(pk=OuterRef(id_field)).values('preferred_label')[:1])
+        for model in label_models
+    ]))
+
+
+def ancestors(hierarchy, node_id):
+    """Ancestors of a node, root first, as dicts with id, type, label and depth"""
+    _, closure_model, label_models = HIERARCHIES[hierarchy]
+    rows = _with_labels(
+        closure_model.objects.filter(descendant_id=node_id), 'ancestor_id', label_models
+    ).order_by('-depth', 'ancestor_id').values_list('ancestor_id', 'ancestor_type', 'label', 'depth')
+    return [
+        {'id': ancestor_id, 'type': ancestor_type, 'label': label, 'depth': depth}
+        for ancestor_id, ancestor_type, label, depth in rows
+    ]
+
+
+def descendants(hierarchy, node_id, max_depth=None):
+    """Descendants of a node, nearest first, as dicts with id, type, label and depth"""
+    _, closure_model, label_models = HIERARCHIES[hierarchy]
+    rows = closure_model.objects.filter(ancestor_id=node_id)
+    if max_depth is not None:
+        rows = rows.filter(depth__lte=max_depth)
+    rows = _with_labels(rows, 'descendant_id', label_models).order_by('depth', 'descendant_id').values_list(
+        'descendant_id', 'descendant_type', 'label', 'depth'
+    )
+    return [
+        {'id': descendant_id, 'type': descendant_type, 'label': label, 'depth': depth}
+        for descendant_id, descendant_type, label, depth in rows
+    ]
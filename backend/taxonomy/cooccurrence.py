@@ -0,0 +1,164 @@
+"""
+Precomputed skill co-occurrence for skill suggestions.
+
+Two skills co-occur when an occupation relates to both. With A the
+occupation x skill incidence matrix, each entry weighted by relation type
+and signalling value, the co-occurrence matrix is the sparse product AᵀA.
+It is computed with SciPy for SKILL_BLOCK_SIZE skills at a time, so memory
+is bounded by the co-occurrence rows of one block rather than the whole
+matrix. Only the top NEIGHBOURS_PER_SKILL entries of each row are kept in
+SkillNeighbour. A suggestion is then one indexed lookup, and suggestions
+for several seed skills sum their rows.
+"""
+import logging
+from array import array
+from collections import Counter
+import numpy as np
+from scipy import sparse
+from django.db.models import Sum
+from .models import Skill, OccupationToSkillRelation, SkillNeighbour
+
+
+logger = logging.getLogger(__name__)
+
+NEIGHBOURS_PER_SKILL = 50
+# Skills whose co-occurrence rows are computed in one sparse product
+SKILL_BLOCK_SIZE = 1024
+
+# Relations without a type count as optional ones. import_csv skips rows
+# with any other type; rows of an unknown type that reach the database
+# another way are left out of the matrices and logged.
+RELATION_TYPE_WEIGHTS = {'essential': 1.0, 'optional': 0.5, '': 0.5}
+# Weight of relations without a signalling value
+DEFAULT_SIGNALLING_VALUE = 1.0
+
+
+def relation_weight(relation_type, signalling_value):
+    """Weight of one occupation-to-skill relation, or None for an unknown relation type"""
+    weight = RELATION_TYPE_WEIGHTS.get(relation_type)
+    if weight is None:
+        return None
+    if signalling_value is None:
+        signalling_value = DEFAULT_SIGNALLING_VALUE
+    return weight * float(signalling_value)
+
+
+def relation_matrix(relations):
+    """Return (occupation IDs, skill IDs, occupation x skill CSR matrix of relation weights).
+
+    `relations` yields (occupation ID, skill ID, relation type, signalling
+    value). Skill columns are sorted by ID. Relations of an unknown type are
+    skipped.
+    """
+    occupation_index, skill_index = {}, {}
+    rows, columns, weights = array('q'), array('q'), array('d')
+    unknown_types = Counter()
+    for occupation_id, skill_id, relation_type, signalling_value in relations:
+        weight = relation_weight(relation_type, signalling_value)
+        if weight is None:
+            unknown_types[relation_type] += 1
+            continue
+        rows.append(occupation_index.setdefault(occupation_id, len(occupation_index)))
+        columns.append(skill_index.setdefault(skill_id, len(skill_index)))
+        weights.append(weight)
+    if unknown_types:
+        logger.warning('Skipped occupation-to-skill relations of unknown types: %s', dict(unknown_types))
+
+    skill_ids = sorted(skill_index)
+    rank = np.empty(len(skill_ids), dtype=np.int64)
+    rank[[skill_index[skill_id] for skill_id in skill_ids]] = np.arange(len(skill_ids))
+    matrix = sparse.csr_matrix(
+        (np.frombuffer(weights), (np.frombuffer(rows, dtype=np.int64), rank[np.frombuffer(columns, dtype=np.int64)])),
+        shape=(len(occupation_index), len(skill_ids))
+    )
+    matrix.sum_duplicates()
+    return list(occupation_index), skill_ids, matrix
+
+
+def top_neighbours(relations, limit=NEIGHBOURS_PER_SKILL):
+    """Yield (skill ID, neighbour ID, score, common occupations) for the top neighbours of every skill.
+
+    `relations` yields (occupation ID, skill ID, relation type, signalling value).
+    """
+    _, skill_ids, matrix = relation_matrix(relations)
+    binary = matrix.copy()
+    binary.data[:] = 1.0
+    matrix_t, binary_t = matrix.T.tocsr(), binary.T.tocsr()
+
+    for start in range(0, len(skill_ids), SKILL_BLOCK_SIZE):
+        stop = min(start + SKILL_BLOCK_SIZE, len(skill_ids))
+        common = (binary_t[start:stop] @ binary).tocsr()
+        scores = (matrix_t[start:stop] @ matrix).tocsr()
+        common.sort_indices()
+        scores.sort_indices()
+        for row in range(stop - start):
+            skill = start + row
+            neighbours = common.indices[common.indptr[row]:common.indptr[row + 1]]
+            row_common = common.data[common.indptr[row]:common.indptr[row + 1]]
+            # The product drops zero scores, so align the scores with the co-occurring skills
+            row_scores = np.zeros(len(neighbours))
+            begin, end = scores.indptr[row], scores.indptr[row + 1]
+            row_scores[np.searchsorted(neighbours, scores.indices[begin:end])] = scores.data[begin:end]
+
+            keep = neighbours != skill
+            neighbours, row_scores, row_common = neighbours[keep], row_scores[keep], row_common[keep]
+            # Highest score first, ties broken by the higher skill ID
+            top = np.lexsort((-neighbours, -row_scores))[:limit]
+            for neighbour, score, count in zip(
+                neighbours[top].tolist(), row_scores[top].tolist(), row_common[top].tolist()
+            ):
+                yield skill_ids[skill], skill_ids[neighbour], round(score, 6), int(count)
+
+
+def rebuild_neighbours(batch_size=5000):
+    """Sync SkillNeighbour with the current relations; returns (inserted, deleted)"""
+    relations = OccupationToSkillRelation.objects.values_list(
+        'occupation_id', 'skill_id', 'relation_type', 'signalling_value'
+    ).iterator(chunk_size=batch_size)
+    wanted = {
+        (skill_id, neighbour_id): (score, common)
+        for skill_id, neighbour_id, score, common in top_neighbours(relations)
+    }
+
+    stale = []
+    existing = SkillNeighbour.objects.values_list(
+        'pk', 'skill_id', 'neighbour_id', 'score', 'common_occupation_count'
+    )
+    for pk, skill_id, neighbour_id, score, common in existing.iterator(chunk_size=batch_size):
+        if wanted.get((skill_id, neighbour_id)) == (score, common):
+            del wanted[(skill_id, neighbour_id)]
+        else:
+            stale.append(pk)
+
+    for start in range(0, len(stale), batch_size):
+        SkillNeighbour.objects.filter(pk__in=stale[start:start + batch_size]).delete()
+    SkillNeighbour.objects.bulk_create(
+        (
+            SkillNeighbour(skill_id=skill_id, neighbour_id=neighbour_id, score=score, common_occupation_count=common)
+            for (skill_id, neighbour_id), (score, common) in wanted.items()
+        ),
+        batch_size=batch_size
+    )
+    return len(wanted), len(stale)
+
+
+def suggest(seed_ids, limit=10):
+    """Return [(skill, score, common occupations)] of the skills that co-occur most with the seeds"""
+    seed_ids = list(seed_ids)
+    if len(seed_ids) == 1:
+        return [
+            (neighbour.neighbour, neighbour.score, neighbour.common_occupation_count)
+            for neighbour in SkillNeighbour.objects.filter(skill_id=seed_ids[0])
+            .select_related('neighbour').order_by('-score', 'neighbour_id')[:limit]
+        ]
+
+    ranked = list(
+        SkillNeighbour.objects.filter(skill_id__in=seed_ids).exclude(neighbour_id__in=seed_ids)
+        .values('neighbour_id').annotate(total=Sum('score'), common=Sum('common_occupation_count'))
+        .order_by('-total', 'neighbour_id')[:limit]
+    )
+    skills = Skill.objects.in_bulk([row['neighbour_id'] for row in ranked])
+    return [
+        (skills[row['neighbour_id']], row['total'], row['common'])
+        for row in ranked if row['neighbour_id'] in skills
+    ]
@@ -0,0 +1,54 @@
+"""
+Denormalized per-skill relation counters.
+
+Skill.occupation_count and Skill.essential_count count the occupation to
+skill relations of each skill, so popularity rankings read an indexed column
+instead of aggregating the relation table. Relation saves and deletes
+recount their skill. import_csv disconnects those receivers
+(signals.deferred_skill_counts) and recounts every skill once after the
+import, and reconcile_skill_counts repairs any drift left by other bulk
+writes.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from .models import Skill, OccupationToSkillRelation
+
+
+def counted(condition=Q()):
+    """Subquery counting the relations of the outer skill that match `condition`"""
+    relations = OccupationToSkillRelation.objects.filter(condition, skill=OuterRef('pk'))
+    return Coalesce(
+        Subquery(relations.order_by().values('skill').annotate(count=Count('id')).values('count')),
+        Value(0),
+        output_field=IntegerField()
+    )
+
+
+def actual_counts():
+    return {
+        'occupation_count': counted(),
+        'essential_count': counted(Q(relation_type='essential')),
+    }
+
+
+def drifted_skills():
+    """Skills whose stored counters differ from their relations"""
+    counts = actual_counts()
+    return Skill.objects.alias(
+        actual_occupation_count=counts['occupation_count'],
+        actual_essential_count=counts['essential_count'],
+    ).exclude(
+        occupation_count=F('actual_occupation_count'), essential_count=F('actual_essential_count')
+    )
+
+
+def recount_skills(skill_ids=None):
+    """Recompute the counters of some skills, or of all; returns the number of skills changed.
+
+    Only skills whose counters are off are written, which also spares their
+    full-text index rows.
+    """
+    skills = drifted_skills()
+    if skill_ids is not None:
+        skills = skills.filter(pk__in=skill_ids)
+    return Skill.objects.filter(pk__in=skills.values('pk')).update(**actual_counts())
@@ -0,0 +1,344 @@
+"""
+Column mappings for the Tabiya taxonomy CSV files.
+
+This module deliberately does not import any Django models so that the
+parsing functions can run in worker processes of a process pool.
+"""
+import csv
+import gzip
+import io
+import os
+import tarfile
+import zipfile
+from itertools import islice
+
+
+class DirectorySource:
+    """Taxonomy CSV files stored loose in a directory, optionally gzipped"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __str__(self):
+        return self.path
+
+    def _path(self, file_name):
+        for candidate in (file_name, file_name + '.gz'):
+            path = os.path.join(self.path, candidate)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def exists(self, file_name):
+        return self._path(file_name) is not None
+
+    def open(self, file_name):
+        path = self._path(file_name)
+        if path.endswith('.gz'):
+            return gzip.open(path, 'rb')
+        return open(path, 'rb')
+
+    def size(self, file_name):
+        """Uncompressed size in bytes, or None if it is not known up front"""
+        path = self._path(file_name)
+        return None if path.endswith('.gz') else os.path.getsize(path)
+
+    def signature(self, file_name):
+        stat = os.stat(self._path(file_name))
+        return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+
+class ArchiveSource:
+    """Taxonomy CSV files inside a zip or tar archive, read without extracting.
+
+    Members are matched on their base name, so releases that wrap the CSV
+    files in a top-level folder work as well.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.is_zip = zipfile.is_zipfile(path)
+        self._members = None
+
+    def __str__(self):
+        return self.path
+
+    def members(self):
+        """Map CSV base names to (member name, uncompressed size, checksum)"""
+        if self._members is None:
+            members = {}
+            if self.is_zip:
+                with zipfile.ZipFile(self.path) as archive:
+                    entries = [
+                        (info.filename, info.file_size, info.CRC)
+                        for info in archive.infolist() if not info.is_dir()
+                    ]
+            else:
+                with tarfile.open(self.path, 'r:*') as archive:
+                    entries = [
+                        (info.name, info.size, info.mtime)
+                        for info in archive.getmembers() if info.isfile()
+                    ]
+            for name, size, checksum in sorted(entries, key=lambda entry: entry[0].count('/')):
+                members.setdefault(os.path.basename(name), (name, size, checksum))
+            self._members = members
+        return self._members
+
+    def exists(self, file_name):
+        return file_name in self.members()
+
+    def open(self, file_name):
+        member_name = self.members()[file_name][0]
+        if self.is_zip:
+            archive = zipfile.ZipFile(self.path)
+            return _ArchiveMember(archive, archive.open(member_name))
+        archive = tarfile.open(self.path, 'r:*')
+        return _ArchiveMember(archive, archive.extractfile(member_name))
+
+    def size(self, file_name):
+        return self.members()[file_name][1]
+
+    def signature(self, file_name):
+        stat = os.stat(self.path)
+        _, size, checksum = self.members()[file_name]
+        return f'{stat.st_size}:{stat.st_mtime_ns}:{size}:{checksum}'
+
+
+class _ArchiveMember(io.BufferedReader):
+    """Streams one archive member and closes the archive along with it"""
+
+    def __init__(self, archive, member):
+        super().__init__(member)
+        self.archive = archive
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.archive.close()
+
+
+def open_source(path):
+    """Return the DirectorySource or ArchiveSource for a path"""
+    if os.path.isdir(path):
+        return DirectorySource(path)
+    if zipfile.is_zipfile(path) or tarfile.is_tarfile(path):
+        return ArchiveSource(path)
+    raise ValueError(f'{path} is neither a directory nor a zip/tar archive')
+
+
+def read_csv_batches(source, file_name, batch_size):
+    """Yield (field dicts, bytes read so far) batches of a Tabiya CSV file.
+
+    The file is decoded incrementally from its (possibly compressed) byte
+    stream, so memory use does not depend on the size of the file.
+    """
+    parse_row = ROW_PARSERS[file_name]
+    with source.open(file_name) as raw:
+        text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        for chunk in chunked(map(parse_row, csv.DictReader(text)), batch_size):
+            yield chunk, raw.tell()
+
+
+def chunked(iterable, size):
+    """Yield lists of at most `size` items from an iterable"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_bool(value):
+    return (value or '').lower() == 'true'
+
+
+def parse_signalling_value(value):
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def model_info_fields(row):
+    return dict(
+        uuid_history=row.get('UUIDHISTORY', ''),
+        name=row.get('NAME', ''),
+        locale=row.get('LOCALE', ''),
+        description=row.get('DESCRIPTION', ''),
+        version=row.get('VERSION', ''),
+        released=parse_bool(row.get('RELEASED', '')),
+        release_notes=row.get('RELEASENOTES', '')
+    )
+
+
+def skill_group_fields(row):
+    return dict(
+        id=row.get('ID', ''),
+        uuid_history=row.get('UUIDHISTORY', ''),
+        origin_uri=row.get('ORIGINURI', ''),
+        code=row.get('CODE') or None,
+        preferred_label=row.get('PREFERREDLABEL', ''),
+        alt_labels=row.get('ALTLABELS', ''),
+        description=row.get('DESCRIPTION', ''),
+        scope_note=row.get('SCOPENOTE', '')
+    )
+
+
+def skill_fields(row):
+    return dict(
+        id=row.get('ID', ''),
+        uuid_history=row.get('UUIDHISTORY', ''),
+        origin_uri=row.get('ORIGINURI', ''),
+        skill_type=row.get('SKILLTYPE', ''),
+        reuse_level=row.get('REUSELEVEL', ''),
+        preferred_label=row.get('PREFERREDLABEL', ''),
+        alt_labels=row.get('ALTLABELS', ''),
+        description=row.get('DESCRIPTION', ''),
+        definition=row.get('DEFINITION', ''),
+        scope_note=row.get('SCOPENOTE', ''),
+        is_localized=parse_bool(row.get('ISLOCALIZED', ''))
+    )
+
+
+def occupation_group_fields(row):
+    return dict(
+        id=row.get('ID', ''),
+        uuid_history=row.get('UUIDHISTORY', ''),
+        origin_uri=row.get('ORIGINURI', ''),
+        code=row.get('CODE', ''),
+        group_type=row.get('GROUPTYPE', ''),
+        preferred_label=row.get('PREFERREDLABEL', ''),
+        alt_labels=row.get('ALTLABELS', ''),
+        description=row.get('DESCRIPTION', '')
+    )
+
+
+def occupation_fields(row):
+    return dict(
+        id=row.get('ID', ''),
+        uuid_history=row.get('UUIDHISTORY', ''),
+        origin_uri=row.get('ORIGINURI', ''),
+        occupation_group_code=row.get('OCCUPATIONGROUPCODE', ''),
+        code=row.get('CODE', ''),
+        preferred_label=row.get('PREFERREDLABEL', ''),
+        alt_labels=row.get('ALTLABELS', ''),
+        description=row.get('DESCRIPTION', ''),
+        definition=row.get('DEFINITION', ''),
+        scope_note=row.get('SCOPENOTE', ''),
+        regulated_profession_note=row.get('REGULATEDPROFESSIONNOTE', ''),
+        occupation_type=row.get('OCCUPATIONTYPE', ''),
+        is_localized=parse_bool(row.get('ISLOCALIZED', ''))
+    )
+
+
+def hierarchy_fields(row):
+    return dict(
+        parent_object_type=row.get('PARENTOBJECTTYPE', ''),
+        parent_id=row.get('PARENTID', ''),
+        child_object_type=row.get('CHILDOBJECTTYPE', ''),
+        child_id=row.get('CHILDID', '')
+    )
+
+
+def skill_relation_fields(row):
+    return dict(
+        requiring_skill_id=row.get('REQUIRINGID', ''),
+        required_skill_id=row.get('REQUIREDID', ''),
+        relation_type=row.get('RELATIONTYPE', '')
+    )
+
+
+def occupation_skill_relation_fields(row):
+    return dict(
+        occupation_id=row.get('OCCUPATIONID', ''),
+        skill_id=row.get('SKILLID', ''),
+        relation_type=row.get('RELATIONTYPE', ''),
+        signalling_value_label=row.get('SIGNALLINGVALUELABEL', ''),
+        signalling_value=parse_signalling_value(row.get('SIGNALLINGVALUE', ''))
+    )
+
+
+# Header row of each Tabiya CSV file.
+CSV_COLUMNS = {
+    'model_info.csv': [
+        'UUIDHISTORY', 'NAME', 'LOCALE', 'DESCRIPTION', 'VERSION', 'RELEASED',
+        'RELEASENOTES', 'CREATEDAT', 'UPDATEDAT'
+    ],
+    'skill_groups.csv': [
+        'ID', 'ORIGINURI', 'UUIDHISTORY', 'CODE', 'SCOPENOTE', 'PREFERREDLABEL',
+        'ALTLABELS', 'DESCRIPTION', 'CREATEDAT', 'UPDATEDAT'
+    ],
+    'skills.csv': [
+        'ID', 'ORIGINURI', 'UUIDHISTORY', 'SKILLTYPE', 'REUSELEVEL', 'PREFERREDLABEL',
+        'ALTLABELS', 'DESCRIPTION', 'DEFINITION', 'SCOPENOTE', 'ISLOCALIZED',
+        'CREATEDAT', 'UPDATEDAT'
+    ],
+    'occupation_groups.csv': [
+        'ID', 'ORIGINURI', 'UUIDHISTORY', 'CODE', 'GROUPTYPE', 'PREFERREDLABEL',
+        'ALTLABELS', 'DESCRIPTION', 'CREATEDAT', 'UPDATEDAT'
+    ],
+    'occupations.csv': [
+        'ID', 'ORIGINURI', 'UUIDHISTORY', 'OCCUPATIONGROUPCODE', 'CODE', 'DEFINITION',
+        'SCOPENOTE', 'REGULATEDPROFESSIONNOTE', 'OCCUPATIONTYPE', 'ISLOCALIZED',
+        'PREFERREDLABEL', 'ALTLABELS', 'DESCRIPTION', 'CREATEDAT', 'UPDATEDAT'
+    ],
+    'skill_hierarchy.csv': [
+        'PARENTOBJECTTYPE', 'PARENTID', 'CHILDID', 'CHILDOBJECTTYPE', 'CREATEDAT', 'UPDATEDAT'
+    ],
+    'occupation_hierarchy.csv': [
+        'PARENTOBJECTTYPE', 'PARENTID', 'CHILDID', 'CHILDOBJECTTYPE', 'CREATEDAT', 'UPDATEDAT'
+    ],
+    'skill_to_skill_relations.csv': [
+        'REQUIRINGID', 'RELATIONTYPE', 'REQUIREDID', 'CREATEDAT', 'UPDATEDAT'
+    ],
+    'occupation_to_skill_relations.csv': [
+        'OCCUPATIONTYPE', 'OCCUPATIONID', 'RELATIONTYPE', 'SIGNALLINGVALUELABEL',
+        'SIGNALLINGVALUE', 'SKILLID', 'CREATEDAT', 'UPDATEDAT'
+    ],
+}
+
+
+# Maps each Tabiya CSV file to the function that turns one of its rows into
+# model field values.
+ROW_PARSERS = {
+    'model_info.csv': model_info_fields,
+    'skill_groups.csv': skill_group_fields,
+    'skills.csv': skill_fields,
+    'occupation_groups.csv': occupation_group_fields,
+    'occupations.csv': occupation_fields,
+    'skill_hierarchy.csv': hierarchy_fields,
+    'occupation_hierarchy.csv': hierarchy_fields,
+    'skill_to_skill_relations.csv': skill_relation_fields,
+    'occupation_to_skill_relations.csv': occupation_skill_relation_fields,
+}
+
+
+class ParseFailure:
+    """Sent through a parse queue when a worker could not read its file"""
+
+    def __init__(self, file_name, error):
+        self.file_name = file_name
+        self.error = error
+
+
+def parse_into_queue(source, file_name, queue, batch_size, cancelled=None):
+    """Parse a CSV file of `source` in a worker process and feed batches into `queue`.
+
+    Batches from read_csv_batches() are followed by a final None. The queue
+    is bounded, so a worker never runs far ahead of the writer consuming it.
+    Once the `cancelled` event is set, the worker stops after the batch it
+    is putting and sends the final None.
+    """
+    try:
+        for batch in read_csv_batches(source, file_name, batch_size):
+            if cancelled is not None and cancelled.is_set():
+                break
+            queue.put(batch)
+    except Exception as error:
+        queue.put(ParseFailure(file_name, repr(error)))
+        raise
+    queue.put(None)
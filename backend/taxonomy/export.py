@@ -0,0 +1,170 @@
+"""
+Streaming export of the taxonomy in the Tabiya CSV layout read by import_csv.
+
+Rows are read with iterator(chunk_size=...) (a server-side cursor on
+PostgreSQL) and encoded one at a time, so memory use does not depend on the
+size of the export.
+"""
+import csv
+import json
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from .csv_format import CSV_COLUMNS
+from .models import (
+    ModelInfo, SkillGroup, Skill, OccupationGroup, Occupation,
+    SkillToSkillRelation, OccupationToSkillRelation,
+    SkillHierarchy, OccupationHierarchy
+)
+
+
+DEFAULT_CHUNK_SIZE = 2000
+# Encoded output is collected up to this many characters before it is
+# compressed and handed to the caller.
+FLUSH_SIZE = 64 * 1024
+FORMATS = ('csv', 'ndjson')
+
+ENTITY_FIELDS = {
+    'ID': 'id',
+    'ORIGINURI': 'origin_uri',
+    'UUIDHISTORY': 'uuid_history',
+    'PREFERREDLABEL': 'preferred_label',
+    'ALTLABELS': 'alt_labels',
+    'DESCRIPTION': 'description',
+    'DEFINITION': 'definition',
+    'SCOPENOTE': 'scope_note',
+    'CREATEDAT': 'created_at',
+    'UPDATEDAT': 'updated_at',
+}
+HIERARCHY_FIELDS = {
+    'PARENTOBJECTTYPE': 'parent_object_type',
+    'PARENTID': 'parent_id',
+    'CHILDID': 'child_id',
+    'CHILDOBJECTTYPE': 'child_object_type',
+    'CREATEDAT': 'created_at',
+    'UPDATEDAT': 'updated_at',
+}
+
+# Maps each Tabiya CSV file to its model and the model field (or lookup)
+# holding every CSV column.
+EXPORTS = {
+    'model_info.csv': (ModelInfo, {
+        'UUIDHISTORY': 'uuid_history',
+        'NAME': 'name',
+        'LOCALE': 'locale',
+        'DESCRIPTION': 'description',
+        'VERSION': 'version',
+        'RELEASED': 'released',
+        'RELEASENOTES': 'release_notes',
+        'CREATEDAT': 'created_at',
+        'UPDATEDAT': 'updated_at',
+    }),
+    'skill_groups.csv': (SkillGroup, {**ENTITY_FIELDS, 'CODE': 'code'}),
+    'skills.csv': (Skill, {
+        **ENTITY_FIELDS,
+        'SKILLTYPE': 'skill_type',
+        'REUSELEVEL': 'reuse_level',
+        'ISLOCALIZED': 'is_localized',
+    }),
+    'occupation_groups.csv': (OccupationGroup, {
+        **ENTITY_FIELDS, 'CODE': 'code', 'GROUPTYPE': 'group_type'
+    }),
+    'occupations.csv': (Occupation, {
+        **ENTITY_FIELDS,
+        'OCCUPATIONGROUPCODE': 'occupation_group_code',
+        'CODE': 'code',
+        'REGULATEDPROFESSIONNOTE': 'regulated_profession_note',
+        'OCCUPATIONTYPE': 'occupation_type',
+        'ISLOCALIZED': 'is_localized',
+    }),
+    'skill_hierarchy.csv': (SkillHierarchy, HIERARCHY_FIELDS),
+    'occupation_hierarchy.csv': (OccupationHierarchy, HIERARCHY_FIELDS),
+    'skill_to_skill_relations.csv': (SkillToSkillRelation, {
+        'REQUIRINGID': 'requiring_skill_id',
+        'RELATIONTYPE': 'relation_type',
+        'REQUIREDID': 'required_skill_id',
+        'CREATEDAT': 'created_at',
+        'UPDATEDAT': 'updated_at',
+    }),
+    'occupation_to_skill_relations.csv': (OccupationToSkillRelation, {
+        'OCCUPATIONTYPE': 'occupation__occupation_type',
+        'OCCUPATIONID': 'occupation_id',
+        'RELATIONTYPE': 'relation_type',
+        'SIGNALLINGVALUELABEL': 'signalling_value_label',
+        'SIGNALLINGVALUE': 'signalling_value',
+        'SKILLID': 'skill_id',
+        'CREATEDAT': 'created_at',
+        'UPDATEDAT': 'updated_at',
+    }),
+}
+
+
+def format_value(value):
+    """Render a database value the way it appears in the Tabiya CSV files"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def export_rows(file_name, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the rows of one export file as lists of strings, in CSV column order"""
+    model, fields = EXPORTS[file_name]
+    lookups = [fields[column] for column in CSV_COLUMNS[file_name]]
+    queryset = model.objects.order_by('pk').values_list(*lookups)
+    for values in queryset.iterator(chunk_size=chunk_size):
+        yield [format_value(value) for value in values]
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def encode_rows(file_name, output_format='csv', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield one export file as text lines, CSV (with header) or NDJSON"""
+    columns = CSV_COLUMNS[file_name]
+    rows = export_rows(file_name, chunk_size)
+    if output_format == 'ndjson':
+        for row in rows:
+            yield json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n'
+        return
+    writer = csv.writer(_Echo(), quoting=csv.QUOTE_ALL)
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_export(file_name, output_format='csv', compress=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield one export file as byte chunks, gzip-compressed on the fly if asked"""
+    # wbits=31 produces a gzip container rather than a raw zlib stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = []
+    buffered = 0
+    for line in encode_rows(file_name, output_format, chunk_size):
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= FLUSH_SIZE:
+            data = ''.join(buffer).encode('utf-8')
+            buffer, buffered = [], 0
+            data = compressor.compress(data) if compressor else data
+            if data:
+                yield data
+    data = ''.join(buffer).encode('utf-8')
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+def export_file_name(file_name, output_format='csv', compress=False):
+    """Name of the exported file, e.g. skills.ndjson.gz"""
+    name = file_name if output_format == 'csv' else file_name[:-len('.csv')] + '.ndjson'
+    return name + '.gz' if compress else name
@@ -0,0 +1,190 @@
+"""
+Find taxonomy skills mentioned in free text.
+
+An Aho-Corasick automaton over the words of every skill label (preferred and
+alternative, from SkillLabel) scans a text in a single linear pass. Working
+on words rather than characters keeps the automaton small and only matches
+whole words. Matches carry character offsets into the original text.
+"""
+import multiprocessing
+import re
+import threading
+import unicodedata
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from .models import SkillLabel
+from .versioning import taxonomy_version
+
+
+# Single-word labels shorter than this are ignored: they mostly match noise
+MIN_SINGLE_WORD_LENGTH = 3
+# Batches smaller than this are scanned in-process
+PARALLEL_THRESHOLD = 64
+
+_TOKEN = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def normalize_word(word):
+    word = unicodedata.normalize('NFKD', word)
+    return ''.join(char for char in word if not unicodedata.combining(char)).casefold()
+
+
+def tokenize(text):
+    """Yield (normalized word, start, end) for every word of a text"""
+    for match in _TOKEN.finditer(text or ''):
+        yield normalize_word(match.group()), match.start(), match.end()
+
+
+class SkillExtractor:
+    """Word-level Aho-Corasick automaton over skill labels"""
+
+    def __init__(self, labels):
+        # goto maps (state, word) to the next state; state 0 is the root
+        self.goto = {}
+        self.depth = array('H', [0])
+        outputs = {}
+        self.preferred_labels = {}
+
+        for skill_id, normalized_label, label, is_preferred in labels:
+            if is_preferred:
+                self.preferred_labels[skill_id] = label
+            words = normalized_label.split()
+            if not words or (len(words) == 1 and len(words[0]) < MIN_SINGLE_WORD_LENGTH):
+                continue
+            state = 0
+            for word in words:
+                next_state = self.goto.get((state, word))
+                if next_state is None:
+                    next_state = len(self.depth)
+                    self.goto[(state, word)] = next_state
+                    self.depth.append(self.depth[state] + 1)
+                state = next_state
+            outputs.setdefault(state, set()).add(skill_id)
+
+        self.outputs = {state: tuple(sorted(skill_ids)) for state, skill_ids in outputs.items()}
+        self._build_links()
+
+    def _build_links(self):
+        """Compute failure links, and output links to the nearest accepting suffix"""
+        state_count = len(self.depth)
+        self.fail = array('I', bytes(4 * state_count))
+        self.output_link = array('I', bytes(4 * state_count))
+        children = {}
+        for (state, word), child in self.goto.items():
+            children.setdefault(state, []).append((word, child))
+
+        queue = deque(child for _, child in children.get(0, []))
+        while queue:
+            state = queue.popleft()
+            for word, child in children.get(state, []):
+                fallback = self.fail[state]
+                while fallback and (fallback, word) not in self.goto:
+                    fallback = self.fail[fallback]
+                target = self.goto.get((fallback, word), 0)
+                self.fail[child] = target
+                failed = target
+                self.output_link[child] = failed if failed in self.outputs else self.output_link[failed]
+                queue.append(child)
+
+    def __len__(self):
+        return len(self.depth)
+
+    def scan(self, text):
+        """Return every match as (skill ID, start, end), including overlapping ones"""
+        matches = []
+        tokens = []
+        state = 0
+        for word, start, end in tokenize(text):
+            tokens.append(start)
+            while state and (state, word) not in self.goto:
+                state = self.fail[state]
+            state = self.goto.get((state, word), 0)
+            accepting = state if state in self.outputs else self.output_link[state]
+            while accepting:
+                first_token = len(tokens) - self.depth[accepting]
+                for skill_id in self.outputs[accepting]:
+                    matches.append((skill_id, tokens[first_token], end))
+                accepting = self.output_link[accepting]
+        return matches
+
+    def extract(self, text, overlapping=False):
+        """Return skill mentions as dicts with skill_id, label, text, start and end.
+
+        Unless `overlapping` is set, mentions inside a longer mention are
+        dropped ("project management" wins over "management").
+        """
+        matches = self.scan(text)
+        if not overlapping:
+            matches.sort(key=lambda match: (match[1], -match[2]))
+            kept = []
+            covered_until = -1
+            for skill_id, start, end in matches:
+                if kept and start == kept[-1][1] and end == kept[-1][2]:
+                    kept.append((skill_id, start, end))  # same span, another skill
+                elif start >= covered_until:
+                    kept.append((skill_id, start, end))
+                    covered_until = end
+            matches = kept
+        return [
+            {
+                'skill_id': skill_id,
+                'label': self.preferred_labels.get(skill_id, ''),
+                'text': text[start:end],
+                'start': start,
+                'end': end,
+            }
+            for skill_id, start, end in matches
+        ]
+
+
+_lock = threading.Lock()
+_extractor = None
+_extractor_version = None
+
+
+def get_extractor():
+    """Return the extractor of the current taxonomy version, compiling it once"""
+    global _extractor, _extractor_version
+    version = taxonomy_version()
+    if _extractor_version != version:
+        with _lock:
+            if _extractor_version != version:
+                labels = SkillLabel.objects.values_list(
+                    'skill_id', 'normalized_label', 'label', 'is_preferred'
+                ).iterator(chunk_size=5000)
+                _extractor = SkillExtractor(labels)
+                _extractor_version = version
+    return _extractor
+
+
+def extract_skills(text, overlapping=False):
+    """Return the skill mentions in one text"""
+    return get_extractor().extract(text, overlapping)
+
+
+_worker_extractor = None
+
+
+def _init_worker(extractor):
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+def _extract_in_worker(arguments):
+    text, overlapping = arguments
+    return _worker_extractor.extract(text, overlapping)
+
+
+def extract_skills_many(texts, overlapping=False, workers=None):
+    """Return the skill mentions of each text, scanning large batches in a process pool"""
+    extractor = get_extractor()
+    texts = list(texts)
+    if len(texts) < PARALLEL_THRESHOLD or workers == 1:
+        return [extractor.extract(text, overlapping) for text in texts]
+
+    # Forked workers inherit the compiled automaton without pickling it
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(extractor,)) as pool:
+        chunksize = max(1, len(texts) // ((workers or multiprocessing.cpu_count()) * 4))
+        return list(pool.map(_extract_in_worker, ((text, overlapping) for text in texts), chunksize=chunksize))
@@ -0,0 +1,163 @@
+"""
+Typo-tolerant matching of skill and occupation labels with trigrams.
+
+PostgreSQL uses pg_trgm with GIN trigram indexes (migration
+0006_trigram_index). Other databases use an in-process inverted index from
+trigrams to labels, built per taxonomy version. Both stop at a fixed latency budget and return what they found by
+then, so a misspelled query never slows search down noticeably.
+"""
+import heapq
+import threading
+import time
+from array import array
+from collections import defaultdict
+from django.db import DatabaseError, connection, transaction
+from .models import Skill, Occupation
+from .text import normalize_label, split_alt_labels
+from .versioning import taxonomy_version
+
+
+# Time allowed for one fuzzy lookup
+LATENCY_BUDGET_MS = 50
+# Candidates scoring below this trigram similarity are dropped
+MIN_SIMILARITY = 0.25
+# The in-process index checks the clock after this many postings
+BUDGET_CHECK_INTERVAL = 2000
+
+FUZZY_MODELS = {'skill': Skill, 'occupation': Occupation}
+
+
+def trigrams(text):
+    """Trigrams of each word padded like pg_trgm: two spaces before, one after"""
+    grams = set()
+    for word in normalize_label(text).split():
+        padded = f'  {word} '
+        grams.update(padded[position:position + 3] for position in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Inverted index from trigrams to the labels of one entity type"""
+
+    def __init__(self, rows):
+        self.entity_ids = []
+        self.gram_counts = array('H')
+        postings = defaultdict(lambda: array('I'))
+        for entity_id, preferred_label, alt_labels in rows:
+            labels = [preferred_label, *split_alt_labels(alt_labels)]
+            # Single words are entries too, so that a misspelled word still
+            # scores high against a long label containing it
+            words = {word for label in labels for word in normalize_label(label).split() if len(word) > 3}
+            for label in [*labels, *words]:
+                grams = trigrams(label)
+                if not grams:
+                    continue
+                entry = len(self.entity_ids)
+                self.entity_ids.append(entity_id)
+                self.gram_counts.append(min(len(grams), 65535))
+                for gram in grams:
+                    postings[gram].append(entry)
+        self.postings = dict(postings)
+
+    def search(self, query, limit, deadline):
+        """Return [(similarity, entity id)], best first, found before `deadline`"""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        # Rare trigrams first, so the candidates found within the budget are
+        # the most selective ones
+        lists = sorted(
+            (self.postings[gram] for gram in query_grams if gram in self.postings), key=len
+        )
+        shared = defaultdict(int)
+        seen = 0
+        for entries in lists:
+            for entry in entries:
+                shared[entry] += 1
+            seen += len(entries)
+            if seen >= BUDGET_CHECK_INTERVAL and time.perf_counter() > deadline:
+                break
+            seen %= BUDGET_CHECK_INTERVAL
+
+        best = {}
+        query_count = len(query_grams)
+        for entry, count in shared.items():
+            # Same similarity as pg_trgm: shared / (union of both trigram sets)
+            similarity = count / (query_count + self.gram_counts[entry] - count)
+            if similarity >= MIN_SIMILARITY:
+                entity_id = self.entity_ids[entry]
+                if similarity > best.get(entity_id, 0):
+                    best[entity_id] = similarity
+        return heapq.nlargest(limit, ((score, entity_id) for entity_id, score in best.items()))
+
+
+_lock = threading.Lock()
+_indexes = None
+_indexes_version = None
+
+
+def get_indexes():
+    """Return the in-process trigram indexes of the current taxonomy version"""
+    global _indexes, _indexes_version
+    version = taxonomy_version()
+    if _indexes_version != version:
+        with _lock:
+            if _indexes_version != version:
+                _indexes = {
+                    name: TrigramIndex(
+                        model.objects.values_list('id', 'preferred_label', 'alt_labels')
+                        .iterator(chunk_size=5000)
+                    )
+                    for name, model in FUZZY_MODELS.items()
+                }
+                _indexes_version = version
+    return _indexes
+
+
+def warm_indexes():
+    """Build the in-process indexes, unless PostgreSQL serves fuzzy_search with pg_trgm"""
+    if connection.vendor != 'postgresql':
+        get_indexes()
+
+
+def postgresql_search(model, query, limit):
+    table = model._meta.db_table
+    sql = (
+        f'SELECT id, GREATEST(word_similarity(%s, preferred_label), word_similarity(%s, alt_labels)) AS score '
+        f'FROM {table} WHERE %s <%% preferred_label OR %s <%% alt_labels '
+        f'ORDER BY score DESC LIMIT %s'
+    )
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"SET LOCAL statement_timeout = '{LATENCY_BUDGET_MS}ms'")
+            cursor.execute(f'SET LOCAL pg_trgm.word_similarity_threshold = {MIN_SIMILARITY}')
+            cursor.execute(sql, [query, query, query, query, limit])
+            return [(score, entity_id) for entity_id, score in cursor.fetchall()]
+    except DatabaseError:
+        # Over the latency budget: fuzzy matches are optional
+        return []
+
+
+def fuzzy_search(query, entity_type, limit=10):
+    """Return [(similarity, id)] of the labels closest to a possibly misspelled query"""
+    model = FUZZY_MODELS[entity_type]
+    if connection.vendor == 'postgresql':
+        return postgresql_search(model, query, limit)
+    deadline = time.perf_counter() + LATENCY_BUDGET_MS / 1000
+    return get_indexes()[entity_type].search(query, limit, deadline)
+
+
+def with_fuzzy_matches(results, query, entity_type, limit=10):
+    """Top up a list of exact search results with fuzzy matches, up to `limit`"""
+    results = list(results)
+    missing = limit - len(results)
+    if missing <= 0:
+        return results
+    seen = {result.pk for result in results}
+    candidates = [
+        entity_id for _, entity_id in fuzzy_search(query, entity_type, limit)
+        if entity_id not in seen
+    ][:missing]
+    found = FUZZY_MODELS[entity_type].objects.in_bulk(candidates)
+    return results + [found[entity_id] for entity_id in candidates if entity_id in found]
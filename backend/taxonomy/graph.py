@@ -0,0 +1,166 @@
+"""
+Multi-hop neighbourhoods of the taxonomy graph for the skill mapping view.
+
+A breadth-first search over the CSR arrays of the mmapped snapshot, so a
+depth-3 neighbourhood is read from memory without touching the database.
+Occupation-to-skill edges weaker than `min_signalling` are pruned, each node
+expands its strongest edges first, and the search stops at `max_nodes`.
+Skills added since the snapshot was built fall back to their direct
+neighbours read from the database.
+"""
+from collections import deque
+from django.db.models import F
+from .models import SkillToSkillRelation, OccupationToSkillRelation
+from .snapshot import RELATION_CODES, RELATION_TYPES, get_snapshot
+
+
+MAX_DEPTH = 3
+MAX_NODES = 500
+DEFAULT_MAX_NODES = 50
+
+
+def _expansions(snapshot, node, kind, min_signalling):
+    """Yield (neighbour, edge) for the edges leaving a node, strongest first"""
+    if kind == 'skill':
+        targets, codes, _ = snapshot.neighbours('skill_requires', node)
+        # Essential requirements before optional ones
+        for target, code in sorted(zip(targets, codes), key=lambda edge: edge[1] != RELATION_CODES['essential']):
+            yield target, (node, target, 'skill_relation', code, None)
+        graph = 'skill_occupations'
+    elif kind == 'occupation':
+        graph = 'occupation_skills'
+    else:
+        return
+
+    targets, codes, weights = snapshot.neighbours(graph, node)
+    edges = sorted(zip(targets, codes, weights), key=lambda edge: -edge[2])
+    for target, code, weight in edges:
+        if min_signalling is not None and weight < min_signalling:
+            break
+        occupation, skill = (target, node) if kind == 'skill' else (node, target)
+        yield target, (occupation, skill, 'occupation_skill_relation', code, weight)
+
+
+def neighbourhood(center_id, depth=1, max_nodes=DEFAULT_MAX_NODES, min_signalling=None, snapshot=None):
+    """Return (nodes, edges) around a skill or occupation, or None if the ID is unknown.
+
+    Nodes are dicts with id, label, type, group and depth; edges use the
+    `from`/`to` shape of the skill mapping visualization.
+    """
+    snapshot = snapshot or get_snapshot()
+    center = snapshot.index_of(center_id)
+    if center is None:
+        return None
+    depth = max(0, min(depth, MAX_DEPTH))
+    max_nodes = max(1, min(max_nodes, MAX_NODES))
+
+    depths = {center: 0}
+    queue = deque([center])
+    edges = {}
+    while queue:
+        node = queue.popleft()
+        if depths[node] >= depth:
+            continue
+        for target, edge in _expansions(snapshot, node, snapshot.kind(node), min_signalling):
+            if target not in depths:
+                if len(depths) >= max_nodes:
+                    continue
+                depths[target] = depths[node] + 1
+                queue.append(target)
+            edges.setdefault(edge[:3], edge)
+
+    nodes = []
+    for node, node_depth in depths.items():
+        kind = snapshot.kind(node)
+        data = {
+            'id': snapshot.node_id(node),
+            'label': snapshot.label(node),
+            'type': kind,
+            'group': 'central' if node == center else f'related_{kind}',
+            'depth': node_depth,
+        }
+        if kind == 'skill':
+            data['skill_type'] = snapshot.node_type(node)
+            data['reuse_level'] = snapshot.reuse_level(node)
+        elif kind == 'occupation':
+            data['occupation_type'] = snapshot.node_type(node)
+        nodes.append(data)
+
+    edge_list = []
+    for source, target, edge_type, code, weight in edges.values():
+        edge = {
+            'from': snapshot.node_id(source),
+            'to': snapshot.node_id(target),
+            'label': RELATION_TYPES[code],
+            'type': edge_type,
+        }
+        if edge_type == 'occupation_skill_relation':
+            edge['signalling_value'] = signalling_label(weight)
+        edge_list.append(edge)
+    return nodes, edge_list
+
+
+def signalling_label(weight):
+    return f'{weight:.2f}' if weight is not None and weight > 0 else None
+
+
+def database_neighbourhood(skill, max_nodes=DEFAULT_MAX_NODES, min_signalling=None):
+    """Return (nodes, edges) of a skill's direct neighbours, read from the database.
+
+    `skill` is a dict with id, preferred_label, skill_type and reuse_level.
+    Used for skills that are not in the snapshot yet; the result has the
+    shape of neighbourhood() at depth 1.
+    """
+    max_nodes = max(1, min(max_nodes, MAX_NODES))
+    nodes = [{
+        'id': skill['id'],
+        'label': skill['preferred_label'],
+        'type': 'skill',
+        'group': 'central',
+        'depth': 0,
+        'skill_type': skill['skill_type'],
+        'reuse_level': skill['reuse_level'],
+    }]
+    edges = []
+    seen = {skill['id']}
+
+    required = SkillToSkillRelation.objects.filter(requiring_skill_id=skill['id']).values_list(
+        'required_skill_id', 'required_skill__preferred_label', 'required_skill__skill_type',
+        'required_skill__reuse_level', 'relation_type'
+    ).order_by('id')
+    # Essential requirements before optional ones
+    for skill_id, label, skill_type, reuse_level, relation_type in sorted(required, key=lambda row: row[4] != 'essential'):
+        if skill_id not in seen:
+            if len(seen) >= max_nodes:
+                continue
+            seen.add(skill_id)
+            nodes.append({
+                'id': skill_id, 'label': label, 'type': 'skill', 'group': 'related_skill', 'depth': 1,
+                'skill_type': skill_type, 'reuse_level': reuse_level,
+            })
+        edges.append({'from': skill['id'], 'to': skill_id, 'label': relation_type, 'type': 'skill_relation'})
+
+    occupations = OccupationToSkillRelation.objects.filter(skill_id=skill['id'])
+    if min_signalling is not None:
+        occupations = occupations.filter(signalling_value__gte=min_signalling)
+    occupations = occupations.values_list(
+        'occupation_id', 'occupation__preferred_label', 'occupation__occupation_type',
+        'relation_type', 'signalling_value'
+    ).order_by(F('signalling_value').desc(nulls_last=True), 'id')
+    for occupation_id, label, occupation_type, relation_type, signalling_value in occupations:
+        if occupation_id not in seen:
+            if len(seen) >= max_nodes:
+                break
+            seen.add(occupation_id)
+            nodes.append({
+                'id': occupation_id, 'label': label, 'type': 'occupation', 'group': 'related_occupation',
+                'depth': 1, 'occupation_type': occupation_type,
+            })
+        edges.append({
+            'from': occupation_id,
+            'to': skill['id'],
+            'label': relation_type,
+            'type': 'occupation_skill_relation',
+            'signalling_value': signalling_label(signalling_value),
+        })
+    return nodes, edges
@@ -0,0 +1,114 @@
+"""
+Exact resolution of skill and occupation names through the normalized
+SkillLabel and OccupationLabel tables.
+"""
+from .models import Skill, Occupation, SkillLabel, OccupationLabel
+from .text import normalize_label, split_alt_labels
+
+
+# Names looked up per query, well below the SQLite parameter limit
+RESOLVE_CHUNK_SIZE = 500
+
+LABEL_TABLES = (
+    (Skill, SkillLabel, 'skill_id'),
+    (Occupation, OccupationLabel, 'occupation_id'),
+)
+
+
+def entity_labels(preferred_label, alt_labels):
+    """Yield (normalized label, label, is preferred) once per normalized label"""
+    seen = set()
+    for label, is_preferred in [(preferred_label, True)] + [
+        (alt_label, False) for alt_label in split_alt_labels(alt_labels)
+    ]:
+        normalized = normalize_label(label)
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            yield normalized, label, is_preferred
+
+
+def sync_labels(model, label_model, fk_name, batch_size=5000):
+    """Bring one label table in line with its entities; returns (inserted, deleted)"""
+    wanted = {}
+    rows = model.objects.values_list('id', 'preferred_label', 'alt_labels')
+    for entity_id, preferred_label, alt_labels in rows.iterator(chunk_size=batch_size):
+        for normalized, label, is_preferred in entity_labels(preferred_label, alt_labels):
+            wanted[(entity_id, normalized)] = (label, is_preferred)
+
+    stale = []
+    existing = label_model.objects.values_list('pk', fk_name, 'normalized_label', 'label', 'is_preferred')
+    for pk, entity_id, normalized, label, is_preferred in existing.iterator(chunk_size=batch_size):
+        if wanted.get((entity_id, normalized)) == (label, is_preferred):
+            del wanted[(entity_id, normalized)]
+        else:
+            stale.append(pk)
+
+    for start in range(0, len(stale), batch_size):
+        label_model.objects.filter(pk__in=stale[start:start + batch_size]).delete()
+    label_model.objects.bulk_create(
+        (
+            label_model(**{fk_name: entity_id}, normalized_label=normalized, label=label, is_preferred=is_preferred)
+            for (entity_id, normalized), (label, is_preferred) in wanted.items()
+        ),
+        batch_size=batch_size
+    )
+    return len(wanted), len(stale)
+
+
+def rebuild_labels(batch_size=5000):
+    """Sync SkillLabel and OccupationLabel with the imported taxonomy"""
+    return {
+        label_model.__name__: sync_labels(model, label_model, fk_name, batch_size)
+        for model, label_model, fk_name in LABEL_TABLES
+    }
+
+
+def _resolve(label_model, fk_name, names):
+    by_normalized = {}
+    for name in names:
+        normalized = normalize_label(name)
+        if normalized:
+            by_normalized.setdefault(normalized, []).append(name)
+
+    matches = {}
+    keys = list(by_normalized)
+    for start in range(0, len(keys), RESOLVE_CHUNK_SIZE):
+        rows = label_model.objects.filter(
+            normalized_label__in=keys[start:start + RESOLVE_CHUNK_SIZE]
+        ).values_list('normalized_label', fk_name, 'is_preferred')
+        for normalized, entity_id, is_preferred in rows:
+            # Prefer a preferred-label match, then the lowest ID, so that a
+            # label shared by several entities resolves deterministically
+            candidate = (not is_preferred, entity_id)
+            if normalized not in matches or candidate < matches[normalized]:
+                matches[normalized] = candidate
+
+    return {
+        name: matches[normalized][1]
+        for normalized, original_names in by_normalized.items() if normalized in matches
+        for name in original_names
+    }
+
+
+def resolve(names):
+    """Map skill names (preferred or alternative labels, any case or accents) to skill IDs.
+
+    Names without a matching skill are left out of the result.
+    """
+    return _resolve(SkillLabel, 'skill_id', names)
+
+
+def resolve_occupations(names):
+    """Map occupation names to occupation IDs, like resolve()"""
+    return _resolve(OccupationLabel, 'occupation_id', names)
+
+
+def refresh_labels(instance):
+    """Rewrite the label rows of one saved skill or occupation"""
+    for model, label_model, fk_name in LABEL_TABLES:
+        if isinstance(instance, model):
+            label_model.objects.filter(**{fk_name: instance.pk}).delete()
+            label_model.objects.bulk_create([
+                label_model(**{fk_name: instance.pk}, normalized_label=normalized, label=label, is_preferred=is_preferred)
+                for normalized, label, is_preferred in entity_labels(instance.preferred_label, instance.alt_labels)
+            ])
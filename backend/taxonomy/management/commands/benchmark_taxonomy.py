@@ -0,0 +1,200 @@
+import io
+import json
+import os
+import statistics
+import tempfile
+import time
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from taxonomy.models import Skill, Occupation
+
+
+# Endpoints timed by the benchmark. URLs are formatted with the sample IDs
+# and search term picked from the imported data.
+ENDPOINTS = [
+    ('skill_list', '/api/taxonomy/skills/'),
+    ('skill_list_search', '/api/taxonomy/skills/?search={term}'),
+    ('skill_detail', '/api/taxonomy/skills/{skill_id}/'),
+    ('occupation_list', '/api/taxonomy/occupations/'),
+    ('occupation_detail', '/api/taxonomy/occupations/{occupation_id}/'),
+    ('occupation_skill_relations', '/api/taxonomy/occupation-skill-relations/'),
+    ('search', '/api/taxonomy/search/?q={term}'),
+    ('skill_mapping', '/api/taxonomy/skill-mapping/?skill_id={skill_id}'),
+    ('skill_mapping_depth_3', '/api/taxonomy/skill-mapping/?skill_id={skill_id}&depth=3&max_nodes=500'),
+    ('stats', '/api/taxonomy/stats/'),
+    ('popular_skills', '/api/taxonomy/popular-skills/'),
+    ('skill_suggestions', '/api/taxonomy/skill-suggestions/?skill_id={skill_id}'),
+]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the CSV import and the main taxonomy endpoints on a throwaway database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'csv_directory', nargs='?',
+            help='Taxonomy bundle to import (directory or archive). Generated when omitted'
+        )
+        parser.add_argument('--skills', type=int, default=13000, help='Skills to generate (default: 13000)')
+        parser.add_argument('--occupations', type=int, default=3000, help='Occupations to generate (default: 3000)')
+        parser.add_argument(
+            '--skills-per-occupation', type=int, default=40,
+            help='Average occupation-to-skill relations per occupation (default: 40)'
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated bundle')
+        parser.add_argument('--workers', type=int, default=1, help='Passed on to import_csv')
+        parser.add_argument('--batch-size', type=int, default=None, help='Passed on to import_csv')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed requests per endpoint (default: 5)')
+        parser.add_argument('--output', metavar='PATH', help='Write the results as JSON to PATH')
+        parser.add_argument('--baseline', metavar='PATH', help='Compare against a previous JSON result')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Allowed slowdown against the baseline before failing (default: 0.2 = 20%%)'
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+
+        with tempfile.TemporaryDirectory() as scratch:
+            bundle = options['csv_directory']
+            generated = None
+            if not bundle:
+                bundle = os.path.join(scratch, 'bundle')
+                generated = {
+                    'skills': options['skills'],
+                    'occupations': options['occupations'],
+                    'skills_per_occupation': options['skills_per_occupation'],
+                    'seed': options['seed'],
+                }
+                self.stdout.write(f'Generating taxonomy bundle ({options["skills"]:,} skills)...')
+                call_command('generate_taxonomy', bundle, stdout=io.StringIO(), **generated)
+
+            # Never benchmark against the real database: the import clears
+            # and rewrites every taxonomy table.
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                results = {
+                    'created_at': timezone.now().isoformat(),
+                    'database_vendor': connection.vendor,
+                    'source': generated or os.path.abspath(bundle),
+                    'import': self.benchmark_import(bundle, scratch, options),
+                    'endpoints': self.benchmark_endpoints(options['repeat']),
+                }
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        payload = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(payload + '\n')
+            self.stdout.write(f'Wrote benchmark results to {options["output"]}')
+        else:
+            self.stdout.write(payload)
+
+        if baseline:
+            self.compare(baseline, results, options['tolerance'])
+
+    def benchmark_import(self, bundle, scratch, options):
+        """Time a full import followed by a no-op incremental re-import"""
+        import_options = {'workers': options['workers']}
+        if options['batch_size']:
+            import_options['batch_size'] = options['batch_size']
+
+        runs = {}
+        for mode, extra in (('full', {}), ('incremental_unchanged', {'incremental': True})):
+            self.stdout.write(f'Timing {mode} import...')
+            summary_path = os.path.join(scratch, f'{mode}.json')
+            call_command(
+                'import_csv', bundle, json_summary=summary_path,
+                stdout=io.StringIO(), **import_options, **extra
+            )
+            with open(summary_path, encoding='utf-8') as file:
+                summary = json.load(file)
+            runs[mode] = {
+                'elapsed_seconds': summary['elapsed_seconds'],
+                'peak_memory_kb': summary['peak_memory_kb'],
+                'stages': {
+                    entry['file']: {
+                        'rows': entry['rows'],
+                        'elapsed_seconds': entry['elapsed_seconds'],
+                        'rows_per_second': entry['rows_per_second'],
+                    }
+                    for entry in summary['files']
+                },
+            }
+        return runs
+
+    def benchmark_endpoints(self, repeat):
+        """Time each endpoint with the test client and count its queries"""
+        skill = Skill.objects.order_by('id').first()
+        occupation = Occupation.objects.order_by('id').first()
+        if skill is None or occupation is None:
+            raise CommandError('The imported bundle contains no skills or occupations')
+        context = {
+            'skill_id': skill.id,
+            'occupation_id': occupation.id,
+            'term': skill.preferred_label.split()[0],
+        }
+
+        client = Client()
+        results = {}
+        for name, template in ENDPOINTS:
+            url = template.format(**context)
+            client.get(url)  # warm up caches and lazily built indexes
+            timings = []
+            for _ in range(max(repeat, 1)):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+            results[name] = {
+                'url': url,
+                'status': response.status_code,
+                'queries': len(queries),
+                'median_ms': round(statistics.median(timings), 2),
+                'p95_ms': round(percentile(timings, 0.95), 2),
+            }
+            self.stdout.write(
+                f'  {name}: {results[name]["median_ms"]:.1f} ms median, '
+                f'{len(queries)} queries'
+            )
+        return results
+
+    def compare(self, baseline, results, tolerance):
+        """Report timings that slowed down by more than `tolerance` against `baseline`"""
+        pairs = [
+            (f'import.{mode}', baseline['import'][mode]['elapsed_seconds'], run['elapsed_seconds'])
+            for mode, run in results['import'].items() if mode in baseline.get('import', {})
+        ] + [
+            (f'endpoints.{name}', baseline['endpoints'][name]['median_ms'], endpoint['median_ms'])
+            for name, endpoint in results['endpoints'].items() if name in baseline.get('endpoints', {})
+        ]
+
+        regressions = []
+        for key, before, after in pairs:
+            change = (after - before) / before if before else 0.0
+            line = f'  {key}: {before} -> {after} ({change:+.0%})'
+            if change > tolerance:
+                regressions.append(key)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if regressions:
+            raise CommandError(
+                f'{len(regressions)} benchmark(s) regressed by more than {tolerance:.0%}: '
+                + ', '.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
@@ -0,0 +1,36 @@
+import os
+import time
+from django.core.management.base import BaseCommand
+from taxonomy.snapshot import GRAPHS, KINDS, Snapshot, build_snapshot, snapshot_path
+from taxonomy.versioning import clear_version_cache, taxonomy_version
+
+
+class Command(BaseCommand):
+    help = 'Build the binary taxonomy snapshot for the imported taxonomy version'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild the snapshot even if one exists for this version'
+        )
+
+    def handle(self, *args, **options):
+        clear_version_cache()
+        version = taxonomy_version()
+        path = snapshot_path(version)
+        if os.path.exists(path) and not options['force']:
+            self.stdout.write(f'Snapshot for version {version} already exists: {path}')
+            return
+
+        started = time.perf_counter()
+        build_snapshot(version, prune=True)
+        snapshot = Snapshot(path)
+        for kind in KINDS:
+            self.stdout.write(f'  {kind}: {len(snapshot.nodes(kind)):,} nodes')
+        for graph in GRAPHS:
+            self.stdout.write(f'  {graph}: {snapshot.edge_count(graph):,} edges')
+        self.stdout.write(self.style.SUCCESS(
+            f'Built snapshot for version {version} in {time.perf_counter() - started:.2f}s '
+            f'({os.path.getsize(path):,} bytes): {path}'
+        ))
@@ -0,0 +1,63 @@
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from taxonomy.export import (
+    DEFAULT_CHUNK_SIZE, EXPORTS, FORMATS, export_file_name, stream_export
+)
+
+
+class Command(BaseCommand):
+    help = 'Export the taxonomy as Tabiya CSV (the layout import_csv reads) or NDJSON files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_directory', type=str, help='Directory to write the files to')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default='csv',
+            dest='output_format',
+            help='Output format (default: csv)'
+        )
+        parser.add_argument('--gzip', action='store_true', help='Gzip-compress the files while writing')
+        parser.add_argument(
+            '--files',
+            nargs='+',
+            metavar='FILE',
+            help='Only export these files, e.g. skills.csv occupations.csv'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows fetched from the database cursor at a time (default: {DEFAULT_CHUNK_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_directory']
+        files = options['files'] or list(EXPORTS)
+        unknown = sorted(set(files) - set(EXPORTS))
+        if unknown:
+            raise CommandError(f'Unknown export file(s): {", ".join(unknown)}')
+
+        os.makedirs(output_dir, exist_ok=True)
+        started = time.perf_counter()
+        for file_name in files:
+            file_started = time.perf_counter()
+            path = os.path.join(
+                output_dir, export_file_name(file_name, options['output_format'], options['gzip'])
+            )
+            written = 0
+            with open(path, 'wb') as file:
+                for data in stream_export(
+                    file_name, options['output_format'], options['gzip'], max(options['chunk_size'], 1)
+                ):
+                    file.write(data)
+                    written += len(data)
+            self.stdout.write(
+                f'  {os.path.basename(path)}: {written:,} bytes in '
+                f'{time.perf_counter() - file_started:.2f}s'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {len(files)} file(s) to {output_dir} in {time.perf_counter() - started:.2f}s'
+        ))
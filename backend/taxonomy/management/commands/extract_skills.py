@@ -0,0 +1,81 @@
+import json
+import sys
+import time
+from django.core.management.base import BaseCommand, CommandError
+from taxonomy.csv_format import chunked
+from taxonomy.extraction import extract_skills_many
+
+
+# Texts handed to the worker pool at a time
+CHUNK_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = 'Find the taxonomy skills mentioned in a file of texts, scanning them in a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input',
+            help='File with one text per line, or JSON Lines with a "text" field ("-" for stdin)'
+        )
+        parser.add_argument(
+            '--jsonl',
+            action='store_true',
+            help='Read the input as JSON Lines; other fields of each object are copied to the output'
+        )
+        parser.add_argument(
+            '--output',
+            metavar='PATH',
+            help='Write one JSON object per input line to PATH instead of stdout'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of worker processes (default: one per CPU)'
+        )
+        parser.add_argument(
+            '--overlapping',
+            action='store_true',
+            help='Keep mentions that lie inside a longer mention'
+        )
+
+    def records(self, file, jsonl):
+        for line_number, line in enumerate(file, 1):
+            line = line.rstrip('\n')
+            if not jsonl:
+                yield {'line': line_number, 'text': line}
+                continue
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                raise CommandError(f'Line {line_number} is not valid JSON: {error}')
+            if not isinstance(record, dict) or not isinstance(record.get('text'), str):
+                raise CommandError(f'Line {line_number} has no "text" string')
+            yield record
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        source = sys.stdin if options['input'] == '-' else open(options['input'], encoding='utf-8')
+        output = open(options['output'], 'w', encoding='utf-8') if options['output'] else self.stdout
+        count = 0
+        try:
+            for records in chunked(self.records(source, options['jsonl']), CHUNK_SIZE):
+                texts = [record.pop('text') for record in records]
+                results = extract_skills_many(texts, options['overlapping'], options['workers'])
+                for record, matches in zip(records, results):
+                    record['matches'] = matches
+                    output.write(json.dumps(record, ensure_ascii=False) + '\n')
+                count += len(records)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if output is not self.stdout:
+                output.close()
+
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Scanned {count:,} texts in {time.perf_counter() - started:.2f}s: {options["output"]}'
+            ))
@@ -0,0 +1,235 @@
+import csv
+import gzip
+import os
+import random
+import time
+from django.core.management.base import BaseCommand, CommandError
+from taxonomy.csv_format import CSV_COLUMNS
+
+
+VERBS = [
+    'manage', 'operate', 'design', 'maintain', 'analyse', 'repair', 'install', 'teach',
+    'monitor', 'develop', 'inspect', 'plan', 'coordinate', 'assess', 'prepare', 'test',
+    'negotiate', 'programme', 'supervise', 'calibrate',
+]
+OBJECTS = [
+    'software', 'machinery', 'budgets', 'networks', 'patients', 'vehicles', 'crops',
+    'contracts', 'databases', 'circuits', 'textiles', 'recipes', 'buildings', 'accounts',
+    'experiments', 'shipments', 'campaigns', 'pipelines', 'classrooms', 'turbines',
+]
+DOMAINS = [
+    'agriculture', 'aviation', 'banking', 'construction', 'education', 'energy',
+    'fashion', 'finance', 'healthcare', 'hospitality', 'logistics', 'manufacturing',
+    'media', 'mining', 'retail', 'security', 'telecommunications', 'tourism',
+    'transport', 'water supply',
+]
+ROLES = [
+    'technician', 'engineer', 'manager', 'assistant', 'specialist', 'operator',
+    'analyst', 'inspector', 'consultant', 'officer', 'coordinator', 'supervisor',
+]
+SKILL_TYPES = ['skill/competence', 'knowledge', 'language', 'attitude']
+REUSE_LEVELS = ['sector-specific', 'occupation-specific', 'cross-sector', 'transversal']
+SIGNALLING_LABELS = [('low', '0.25'), ('medium', '0.50'), ('high', '0.90'), ('', '')]
+TIMESTAMP = '2025-01-01T00:00:00.000Z'
+
+
+def object_id(prefix, index):
+    """Deterministic 24 character hex ID, shaped like the Tabiya IDs"""
+    return f'{prefix:02x}{index:022x}'
+
+
+def combination(index, *vocabularies):
+    """Pick one word per vocabulary so that consecutive indexes differ"""
+    words = []
+    for vocabulary in vocabularies:
+        index, position = divmod(index, len(vocabulary))
+        words.append(vocabulary[position])
+    return words, index
+
+
+def unique_label(index, *vocabularies):
+    words, overflow = combination(index, *vocabularies)
+    label = ' '.join(words)
+    return f'{label} {overflow + 1}' if overflow else label
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic Tabiya CSV bundle for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_directory', type=str, help='Directory to write the CSV files to')
+        parser.add_argument('--skills', type=int, default=13000, help='Number of skills (default: 13000)')
+        parser.add_argument('--occupations', type=int, default=3000, help='Number of occupations (default: 3000)')
+        parser.add_argument(
+            '--skills-per-occupation', type=int, default=40,
+            help='Average occupation-to-skill relations per occupation (default: 40)'
+        )
+        parser.add_argument(
+            '--relations-per-skill', type=int, default=1,
+            help='Average skill-to-skill relations per skill (default: 1)'
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument('--gzip', action='store_true', help='Write gzip-compressed .csv.gz files')
+
+    def handle(self, *args, **options):
+        self.output = options['output_directory']
+        self.gzip = options['gzip']
+        self.rng = random.Random(options['seed'])
+        skills = options['skills']
+        occupations = options['occupations']
+        if skills < 1 or occupations < 1:
+            raise CommandError('--skills and --occupations must be positive')
+
+        os.makedirs(self.output, exist_ok=True)
+        started = time.perf_counter()
+
+        skill_groups = max(skills // 20, 1)
+        occupation_groups = max(occupations // 5, 1)
+        self.write_model_info(options['seed'])
+        self.write_skill_groups(skill_groups)
+        self.write_skills(skills)
+        self.write_skill_hierarchy(skills, skill_groups)
+        self.write_skill_relations(skills, options['relations_per_skill'])
+        self.write_occupation_groups(occupation_groups)
+        self.write_occupations(occupations, occupation_groups)
+        self.write_occupation_hierarchy(occupations, occupation_groups)
+        self.write_occupation_skill_relations(
+            occupations, skills, options['skills_per_occupation']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated taxonomy bundle in {self.output} '
+            f'({time.perf_counter() - started:.2f}s)'
+        ))
+
+    def write_rows(self, file_name, rows):
+        """Stream rows into a CSV file without holding them in memory"""
+        path = os.path.join(self.output, file_name + ('.gz' if self.gzip else ''))
+        opener = gzip.open if self.gzip else open
+        count = 0
+        with opener(path, 'wt', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file, quoting=csv.QUOTE_ALL)
+            writer.writerow(CSV_COLUMNS[file_name])
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        self.stdout.write(f'  {file_name}: {count:,} rows')
+
+    def write_model_info(self, seed):
+        self.write_rows('model_info.csv', [[
+            f'synthetic-{seed}', 'Synthetic Tabiya', 'en', 'Synthetic taxonomy for benchmarks',
+            f'synthetic-{seed}', 'true', '', TIMESTAMP, TIMESTAMP
+        ]])
+
+    def write_skill_groups(self, count):
+        def rows():
+            for index in range(count):
+                group_id = object_id(1, index)
+                label = unique_label(index, OBJECTS, DOMAINS)
+                yield [
+                    group_id, f'http://example.org/skill-group/{group_id}', f'sg-{index}',
+                    f'S{index}', '', label, '', f'Skills related to {label}', TIMESTAMP, TIMESTAMP
+                ]
+        self.write_rows('skill_groups.csv', rows())
+
+    def write_skills(self, count):
+        def rows():
+            for index in range(count):
+                skill_id = object_id(2, index)
+                label = unique_label(index, VERBS, OBJECTS, DOMAINS)
+                verb, obj = label.split(' ')[:2]
+                yield [
+                    skill_id, f'http://example.org/skill/{skill_id}', f'skill-{index}',
+                    self.rng.choice(SKILL_TYPES), self.rng.choice(REUSE_LEVELS), label,
+                    f'{verb} {obj}\n{label} skills', f'Ability to {label}.', '', '', 'false',
+                    TIMESTAMP, TIMESTAMP
+                ]
+        self.write_rows('skills.csv', rows())
+
+    def write_skill_hierarchy(self, skills, groups):
+        def rows():
+            # Groups form a tree with ten children per group, skills hang off the groups
+            for index in range(1, groups):
+                yield [
+                    'skillgroup', object_id(1, (index - 1) // 10),
+                    object_id(1, index), 'skillgroup', TIMESTAMP, TIMESTAMP
+                ]
+            for index in range(skills):
+                yield [
+                    'skillgroup', object_id(1, index % groups),
+                    object_id(2, index), 'skill', TIMESTAMP, TIMESTAMP
+                ]
+        self.write_rows('skill_hierarchy.csv', rows())
+
+    def write_skill_relations(self, skills, per_skill):
+        def rows():
+            for index in range(skills):
+                targets = set()
+                for _ in range(self.rng.randint(0, 2 * per_skill)):
+                    target = self.rng.randrange(skills)
+                    if target != index:
+                        targets.add(target)
+                for target in sorted(targets):
+                    yield [
+                        object_id(2, index), self.rng.choice(['essential', 'optional']),
+                        object_id(2, target), TIMESTAMP, TIMESTAMP
+                    ]
+        self.write_rows('skill_to_skill_relations.csv', rows())
+
+    def write_occupation_groups(self, count):
+        def rows():
+            for index in range(count):
+                group_id = object_id(3, index)
+                label = unique_label(index, DOMAINS, ROLES)
+                yield [
+                    group_id, f'http://example.org/isco/{group_id}', f'og-{index}',
+                    f'G{index}', 'iscogroup', f'{label}s', '', f'Occupations in {label}',
+                    TIMESTAMP, TIMESTAMP
+                ]
+        self.write_rows('occupation_groups.csv', rows())
+
+    def write_occupations(self, count, groups):
+        def rows():
+            for index in range(count):
+                occupation_id = object_id(4, index)
+                group = index % groups
+                label = unique_label(index, DOMAINS, OBJECTS, ROLES)
+                yield [
+                    occupation_id, f'http://example.org/occupation/{occupation_id}',
+                    f'occupation-{index}', f'G{group}', f'G{group}.{index}', '', '', '',
+                    'escooccupation', 'false', label, f'{label.split(" ")[-1]} ({label})',
+                    f'A {label} works with {label.split(" ")[1]}.', TIMESTAMP, TIMESTAMP
+                ]
+        self.write_rows('occupations.csv', rows())
+
+    def write_occupation_hierarchy(self, occupations, groups):
+        def rows():
+            for index in range(1, groups):
+                yield [
+                    'iscogroup', object_id(3, (index - 1) // 10),
+                    object_id(3, index), 'iscogroup', TIMESTAMP, TIMESTAMP
+                ]
+            for index in range(occupations):
+                yield [
+                    'iscogroup', object_id(3, index % groups),
+                    object_id(4, index), 'escooccupation', TIMESTAMP, TIMESTAMP
+                ]
+        self.write_rows('occupation_hierarchy.csv', rows())
+
+    def write_occupation_skill_relations(self, occupations, skills, per_occupation):
+        def rows():
+            for index in range(occupations):
+                wanted = min(self.rng.randint(per_occupation // 2, per_occupation * 3 // 2), skills)
+                chosen = set()
+                while len(chosen) < wanted:
+                    # Skew towards low indexes so that some skills are far more
+                    # popular than others, as in ESCO
+                    chosen.add(int(skills * self.rng.random() ** 2))
+                for skill in sorted(chosen):
+                    label, value = self.rng.choice(SIGNALLING_LABELS)
+                    yield [
+                        'escooccupation', object_id(4, index),
+                        self.rng.choice(['essential', 'optional']), label, value,
+                        object_id(2, skill), TIMESTAMP, TIMESTAMP
+                    ]
+        self.write_rows('occupation_to_skill_relations.csv', rows())
@@ -1,12 +1,338 @@
-import csv
+import hashlib
+import io
+import json
+import multiprocessing
 import os
-from django.core.management.base import BaseCommand
-from django.db import transaction
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from graphlib import TopologicalSorter
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.utils import timezone
 from taxonomy.models import (
     ModelInfo, SkillGroup, Skill, OccupationGroup, Occupation,
-    SkillToSkillRelation, OccupationToSkillRelation, 
-    SkillHierarchy, OccupationHierarchy
+    SkillToSkillRelation, OccupationToSkillRelation,
+    SkillHierarchy, OccupationHierarchy, ImportCheckpoint,
+    SkillLabel, OccupationLabel
 )
+from taxonomy.csv_format import (
+    ParseFailure, chunked, open_source, parse_into_queue, read_csv_batches
+)
+from taxonomy.closure import rebuild_closures
+from taxonomy.cooccurrence import RELATION_TYPE_WEIGHTS, rebuild_neighbours
+from taxonomy.counters import recount_skills
+from taxonomy.labels import rebuild_labels
+from taxonomy.signals import deferred_skill_counts
+from taxonomy.snapshot import build_snapshot
+from taxonomy.versioning import bump_generation
+from taxonomy.warmup import warm_caches
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Batches a parse worker may queue ahead of the writer consuming its file
+PARSE_QUEUE_DEPTH = 4
+
+# Minimum number of seconds between two progress lines for the same file
+PROGRESS_INTERVAL = 1.0
+
+# Import steps and the steps whose rows they reference. Each step imports
+# <step>.csv through the matching import_<step> method.
+IMPORT_STEPS = {
+    'model_info': [],
+    'skill_groups': [],
+    'skills': [],
+    'occupation_groups': [],
+    'occupations': [],
+    'skill_hierarchy': ['skill_groups', 'skills'],
+    'occupation_hierarchy': ['occupation_groups', 'occupations'],
+    'skill_to_skill_relations': ['skills'],
+    'occupation_to_skill_relations': ['skills', 'occupations'],
+}
+
+# Fields that identify a row across taxonomy releases. Rows are upserted on
+# these keys by --incremental imports; models without a key are replaced.
+UPSERT_KEYS = {
+    SkillGroup: ['id'],
+    Skill: ['id'],
+    OccupationGroup: ['id'],
+    Occupation: ['id'],
+    SkillToSkillRelation: ['requiring_skill', 'required_skill'],
+    OccupationToSkillRelation: ['occupation', 'skill'],
+    SkillHierarchy: ['parent_object_type', 'parent_id', 'child_object_type', 'child_id'],
+    OccupationHierarchy: ['parent_object_type', 'parent_id', 'child_object_type', 'child_id'],
+}
+
+# Columns computed after the import rather than read from the CSV files
+DERIVED_FIELDS = {'occupation_count', 'essential_count'}
+
+FINGERPRINT_EXCLUDE = {'fingerprint', 'created_at', 'updated_at'} | DERIVED_FIELDS
+
+
+def fingerprint_fields(model):
+    """Return the attnames that make up a row fingerprint, or [] if unsupported"""
+    field_names = {field.name for field in model._meta.concrete_fields}
+    if 'fingerprint' not in field_names:
+        return []
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if field.name not in FINGERPRINT_EXCLUDE and not isinstance(field, models.AutoField)
+    ]
+
+
+def row_fingerprint(instance, attnames):
+    """Hash the imported column values of an unsaved instance"""
+    payload = '\x1f'.join(str(getattr(instance, attname)) for attname in attnames)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def peak_memory_kb():
+    """Peak resident memory of this process in KiB, if the platform reports it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def copy_value(value):
+    """Encode a Python value for PostgreSQL's COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def copy_instances(model, instances):
+    """Write unsaved model instances with a single COPY ... FROM STDIN"""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not isinstance(field, models.AutoField)
+    ]
+    buffer = io.StringIO()
+    for instance in instances:
+        values = [
+            field.get_db_prep_save(field.pre_save(instance, True), connection)
+            for field in fields
+        ]
+        buffer.write('\t'.join(copy_value(value) for value in values))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    sql = 'COPY {} ({}) FROM STDIN'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields)
+    )
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+        if hasattr(raw_cursor, 'copy_expert'):
+            # psycopg2
+            raw_cursor.copy_expert(sql, buffer)
+        else:
+            # psycopg 3
+            with raw_cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+class IncrementalSync:
+    """Upserts the changed rows of one model and deletes rows missing from the CSV.
+
+    Stored rows are matched on UPSERT_KEYS and compared by fingerprint, so
+    unchanged rows are never written. Models without a key are replaced.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.counts = Counter(inserted=0, updated=0, deleted=0, unchanged=0)
+        self.key_fields = UPSERT_KEYS.get(model)
+        self.replaced = False
+        if self.key_fields is None:
+            return
+
+        self.key_attnames = [model._meta.get_field(name).attname for name in self.key_fields]
+        self.has_fingerprint = bool(fingerprint_fields(model))
+        columns = self.key_attnames + ['pk'] + (['fingerprint'] if self.has_fingerprint else [])
+        width = len(self.key_attnames)
+        self.stored = {
+            row[:width]: row[width:]
+            for row in model.objects.values_list(*columns).iterator()
+        }
+        self.update_fields = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key and field.name not in self.key_fields
+            and field.name != 'created_at' and field.name not in DERIVED_FIELDS
+        ]
+
+    def write(self, instances):
+        """Write the new and changed rows of one batch"""
+        if self.key_fields is None:
+            self.replace_all()
+            self.model.objects.bulk_create(instances)
+            self.counts['inserted'] += len(instances)
+            return
+
+        changed = []
+        for instance in instances:
+            key = tuple(getattr(instance, attname) for attname in self.key_attnames)
+            existing = self.stored.pop(key, None)
+            if existing is None:
+                self.counts['inserted'] += 1
+                changed.append(instance)
+            elif self.has_fingerprint and existing[1] != instance.fingerprint:
+                self.counts['updated'] += 1
+                changed.append(instance)
+            else:
+                self.counts['unchanged'] += 1
+
+        if not changed:
+            return
+        if self.has_fingerprint:
+            self.model.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=self.key_fields,
+                update_fields=self.update_fields
+            )
+        else:
+            self.model.objects.bulk_create(changed, ignore_conflicts=True)
+
+    def replace_all(self):
+        if not self.replaced:
+            self.counts['deleted'], _ = self.model.objects.all().delete()
+            self.replaced = True
+
+    def finish(self, batch_size):
+        """Delete the stored rows that were not in the CSV"""
+        if self.key_fields is None:
+            self.replace_all()
+            return
+        stale_pks = [existing[0] for existing in self.stored.values()]
+        for chunk in chunked(stale_pks, batch_size):
+            self.model.objects.filter(pk__in=chunk).delete()
+        self.counts['deleted'] = len(stale_pks)
+
+
+class FileProgress:
+    """Throughput, ETA and memory telemetry for one imported file"""
+
+    def __init__(self, file_name, total_bytes, resumed_from=0):
+        self.file_name = file_name
+        self.total_bytes = total_bytes
+        self.resumed_from = resumed_from
+        self.rows = 0
+        self.written = 0
+        self.started = time.perf_counter()
+        self.start_bytes = 0
+        self.bytes_read = 0
+        self.last_report = self.started
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed else 0
+
+    def skip(self, bytes_read):
+        """Record a batch that was committed by an earlier run"""
+        self.start_bytes = self.bytes_read = bytes_read
+
+    def advance(self, rows, written, bytes_read):
+        self.rows += rows
+        self.written += written
+        self.bytes_read = bytes_read
+
+    def eta(self):
+        done = self.bytes_read - self.start_bytes
+        if done <= 0 or not self.total_bytes:
+            return None
+        return self.elapsed * max(self.total_bytes - self.bytes_read, 0) / done
+
+    def due(self):
+        """Whether enough time has passed since the last progress line"""
+        now = time.perf_counter()
+        if now - self.last_report < PROGRESS_INTERVAL:
+            return False
+        self.last_report = now
+        return True
+
+    def progress_line(self):
+        percent_text = ''
+        if self.total_bytes:
+            percent_text = f' ({100 * self.bytes_read / self.total_bytes:.0f}%)'
+        eta = self.eta()
+        eta_text = f', ETA {eta:.0f}s' if eta is not None else ''
+        return (
+            f'  {self.file_name}: {self.resumed_from + self.rows:,} rows{percent_text}, '
+            f'{self.rate:,.0f} rows/sec{eta_text}'
+        )
+
+    def as_dict(self):
+        return {
+            'file': self.file_name,
+            'rows': self.rows,
+            'rows_written': self.written,
+            'resumed_from_row': self.resumed_from,
+            'bytes': self.total_bytes,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rate, 1),
+            'peak_memory_kb': peak_memory_kb(),
+        }
+
+
+class UnresolvedReport:
+    """Collects relation rows whose endpoints or relation type are unknown"""
+
+    def __init__(self, file_name, max_samples=5):
+        self.file_name = file_name
+        self.max_samples = max_samples
+        self.counts = Counter()
+        self.missing_ids = set()
+        self.samples = []
+
+    def add(self, row_number, reason, missing_id):
+        self.counts[reason] += 1
+        self.missing_ids.add(missing_id)
+        if len(self.samples) < self.max_samples:
+            self.samples.append(f'row {row_number}: {reason} {missing_id!r}')
+
+    def __bool__(self):
+        return bool(self.counts)
+
+    def lines(self):
+        total = sum(self.counts.values())
+        yield (
+            f'  {total} rows in {self.file_name} skipped, '
+            f'{len(self.missing_ids)} distinct unknown IDs'
+        )
+        for reason, count in self.counts.most_common():
+            yield f'    {reason}: {count}'
+        for sample in self.samples:
+            yield f'    e.g. {sample}'
+
+    def as_dict(self):
+        return {
+            'skipped': sum(self.counts.values()),
+            'reasons': dict(self.counts),
+            'distinct_unknown_ids': len(self.missing_ids),
+        }
 
 
 class Command(BaseCommand):
@@ -16,46 +342,129 @@ class Command(BaseCommand):
         parser.add_argument(
             'csv_directory',
             type=str,
-            help='Path to the directory containing the CSV files'
+            help='Path to the directory containing the CSV files, or to a .zip/.tar.gz archive of them'
         )
         parser.add_argument(
             '--clear',
             action='store_true',
             help='Clear existing data before importing'
         )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only insert, update or delete rows that changed since the last import'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Number of rows written per batch (default: {DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Parse CSV files in this many processes and import independent files concurrently'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue an interrupted import from the last committed batch of each file'
+        )
+        parser.add_argument(
+            '--json-summary',
+            metavar='PATH',
+            help='Write per-file telemetry as JSON to PATH ("-" for stdout)'
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Use bulk_create instead of COPY on PostgreSQL'
+        )
 
     def handle(self, *args, **options):
         csv_dir = options['csv_directory']
         clear_data = options['clear']
+        self.batch_size = max(options['batch_size'], 1)
+        self.use_copy = connection.vendor == 'postgresql' and not options['no_copy']
+        self.incremental = options['incremental']
+        self.workers = max(options['workers'], 1)
+        self.resume = options['resume']
+        self.parse_queues = {}
+        self.file_summaries = []
+
+        if clear_data and self.incremental:
+            raise CommandError('--clear and --incremental cannot be combined')
+        if clear_data and self.resume:
+            raise CommandError('--clear and --resume cannot be combined')
 
         if not os.path.exists(csv_dir):
             self.stdout.write(
-                self.style.ERROR(f'Directory {csv_dir} does not exist')
+                self.style.ERROR(f'Path {csv_dir} does not exist')
             )
             return
+        try:
+            source = open_source(csv_dir)
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        started_at = timezone.now()
+        started = time.perf_counter()
 
-        if clear_data:
-            self.stdout.write('Clearing existing data...')
-            self.clear_data()
-
-        # Import order matters due to foreign key relationships
-        self.import_model_info(csv_dir)
-        self.import_skill_groups(csv_dir)
-        self.import_skills(csv_dir)
-        self.import_occupation_groups(csv_dir)
-        self.import_occupations(csv_dir)
-        self.import_skill_hierarchy(csv_dir)
-        self.import_occupation_hierarchy(csv_dir)
-        self.import_skill_to_skill_relations(csv_dir)
-        self.import_occupation_to_skill_relations(csv_dir)
+        if not self.resume:
+            ImportCheckpoint.objects.all().delete()
 
+        # Counters are recounted once by rebuild_derived_tables, so deletes
+        # stay single DELETE statements
+        with deferred_skill_counts():
+            if clear_data:
+                self.stdout.write('Clearing existing data...')
+                self.clear_data()
+
+            if self.workers > 1:
+                self.run_parallel(source)
+            else:
+                for step in self.import_order():
+                    getattr(self, f'import_{step}')(source)
+            self.rebuild_derived_tables()
+        bump_generation()
+        self.build_snapshot()
+        self.warm_caches()
+
+        elapsed = time.perf_counter() - started
         self.stdout.write(
-            self.style.SUCCESS('Successfully imported all CSV files')
+            self.style.SUCCESS(f'Successfully imported all CSV files in {elapsed:.2f}s')
         )
 
+        if options['json_summary']:
+            self.write_summary(options['json_summary'], {
+                'source': os.path.abspath(csv_dir),
+                'started_at': started_at.isoformat(),
+                'elapsed_seconds': round(elapsed, 3),
+                'mode': 'incremental' if self.incremental else 'full',
+                'resumed': self.resume,
+                'workers': self.workers,
+                'batch_size': self.batch_size,
+                'database_vendor': connection.vendor,
+                'peak_memory_kb': peak_memory_kb(),
+                'files': sorted(self.file_summaries, key=lambda summary: summary['file']),
+            })
+
+    def write_summary(self, path, summary):
+        """Write the machine-readable import summary"""
+        payload = json.dumps(summary, indent=2)
+        if path == '-':
+            self.stdout.write(payload)
+            return
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(payload + '\n')
+        self.stdout.write(f'Wrote import summary to {path}')
+
     def clear_data(self):
         """Clear all taxonomy data"""
         with transaction.atomic():
+            OccupationLabel.objects.all().delete()
+            SkillLabel.objects.all().delete()
             OccupationToSkillRelation.objects.all().delete()
             SkillToSkillRelation.objects.all().delete()
             OccupationHierarchy.objects.all().delete()
@@ -66,223 +475,321 @@ class Command(BaseCommand):
             SkillGroup.objects.all().delete()
             ModelInfo.objects.all().delete()
 
-    def import_model_info(self, csv_dir):
-        """Import model_info.csv"""
-        file_path = os.path.join(csv_dir, 'model_info.csv')
-        if not os.path.exists(file_path):
-            self.stdout.write(f'Skipping model_info.csv - file not found')
+    def rebuild_derived_tables(self):
+        """Refresh the lookup tables derived from the imported rows"""
+        started = time.perf_counter()
+        with transaction.atomic():
+            table_counts = rebuild_labels(self.batch_size)
+            recounted = recount_skills()
+            table_counts['SkillNeighbour'] = rebuild_neighbours(self.batch_size)
+            table_counts.update(rebuild_closures(self.batch_size))
+        for table, (inserted, deleted) in table_counts.items():
+            self.stdout.write(f'  {table}: {inserted} inserted, {deleted} deleted')
+        self.stdout.write(f'  Skill counters: {recounted} skills recounted')
+        self.stdout.write(f'Rebuilt derived tables in {time.perf_counter() - started:.2f}s')
+
+    def build_snapshot(self):
+        """Build the snapshot of the new version so that workers load it instead of building it"""
+        started = time.perf_counter()
+        path = build_snapshot(prune=True)
+        self.stdout.write(f'Built taxonomy snapshot in {time.perf_counter() - started:.2f}s: {path}')
+
+    def warm_caches(self):
+        """Build this process's caches of the new version, e.g. for the requests benchmark_taxonomy times"""
+        for name, elapsed in warm_caches().items():
+            self.stdout.write(f'Built {name} in {elapsed:.2f}s')
+
+    def import_order(self):
+        """Return the import steps sorted so that dependencies come first"""
+        return list(TopologicalSorter(IMPORT_STEPS).static_order())
+
+    def run_parallel(self, source):
+        """Parse every CSV in a process pool and write the steps in DAG order.
+
+        Workers feed bounded queues, so parsing runs ahead of the writers by
+        at most PARSE_QUEUE_DEPTH batches per file. Steps whose dependencies
+        are written run concurrently, each writer thread holding its own
+        database connection. SQLite allows a single writer only.
+        """
+        order = self.import_order()
+        position = {step: index for index, step in enumerate(order)}
+        writers = 1 if connection.vendor == 'sqlite' else self.workers
+        context = multiprocessing.get_context()
+        completed = self.completed_files(source)
+
+        # The pool shuts down first: its workers put into manager queues
+        with context.Manager() as manager:
+            cancelled = manager.Event()
+            with ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+                parse_tasks = {}
+                try:
+                    # Submitted in import order: the pool starts tasks FIFO, so
+                    # the file a writer waits on is always parsing already.
+                    for step in order:
+                        file_name = f'{step}.csv'
+                        if source.exists(file_name) and file_name not in completed:
+                            queue = manager.Queue(maxsize=PARSE_QUEUE_DEPTH)
+                            self.parse_queues[file_name] = queue
+                            parse_tasks[file_name] = pool.submit(
+                                parse_into_queue, source, file_name, queue, self.batch_size, cancelled
+                            )
+                    self.write_steps(source, writers, position)
+                finally:
+                    # Files a writer did not read to the end (an error, or a
+                    # step that returned early) still have workers blocked on
+                    # their full queues
+                    cancelled.set()
+                    for file_name in list(self.parse_queues):
+                        if not parse_tasks[file_name].cancel():
+                            self.drain_queue(file_name)
+
+    def write_steps(self, source, writers, position):
+        """Run the import steps on `writers` threads, each once its dependencies are written"""
+        sorter = TopologicalSorter(IMPORT_STEPS)
+        sorter.prepare()
+        with ThreadPoolExecutor(writers) as executor:
+            running = {}
+            while sorter.is_active():
+                for step in sorted(sorter.get_ready(), key=position.get):
+                    future = executor.submit(self.run_step, source, step)
+                    running[future] = step
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+                    sorter.done(running.pop(future))
+
+    def completed_files(self, source):
+        """Files that --resume skips because an earlier run imported them completely"""
+        if not self.resume:
+            return set()
+        return {
+            checkpoint.file_name
+            for checkpoint in ImportCheckpoint.objects.filter(completed=True)
+            if source.exists(checkpoint.file_name)
+            and checkpoint.source_signature == source.signature(checkpoint.file_name)
+        }
+
+    def drain_queue(self, file_name):
+        """Discard the batches left in a parse queue until its worker has finished"""
+        queue = self.parse_queues.pop(file_name)
+        while True:
+            batch = queue.get()
+            if batch is None or isinstance(batch, ParseFailure):
+                return
+
+    def run_step(self, source, step):
+        """Run one import step on the calling thread's database connection"""
+        try:
+            getattr(self, f'import_{step}')(source)
+        finally:
+            connection.close()
+
+    def parsed_batches(self, source, file_name):
+        """Yield (field dicts, bytes read) batches, from a parse worker if one was started"""
+        queue = self.parse_queues.get(file_name)
+        if queue is None:
+            yield from read_csv_batches(source, file_name, self.batch_size)
             return
 
-        self.stdout.write('Importing model_info.csv...')
-        with open(file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
+        while True:
+            batch = queue.get()
+            if batch is None:
+                del self.parse_queues[file_name]
+                return
+            if isinstance(batch, ParseFailure):
+                del self.parse_queues[file_name]
+                raise CommandError(f'Could not parse {batch.file_name}: {batch.error}')
+            yield batch
+
+    def load_checkpoint(self, source, file_name):
+        """Return the checkpoint of a file, resetting it if the file changed"""
+        signature = source.signature(file_name)
+        checkpoint, created = ImportCheckpoint.objects.get_or_create(
+            file_name=file_name,
+            defaults={'source_signature': signature}
+        )
+        if not created and checkpoint.source_signature != signature:
+            if checkpoint.rows_committed and not self.incremental:
+                raise CommandError(
+                    f'{file_name} changed since it was partially imported; '
+                    'rerun with --clear or --incremental'
+                )
+            checkpoint.source_signature = signature
+            checkpoint.rows_committed = 0
+            checkpoint.batch_id = 0
+            checkpoint.completed = False
+            checkpoint.save()
+        return checkpoint
+
+    def bulk_import(self, source, file_name, model, build_instance=None, report=None):
+        """Stream a CSV file into `model`, committing one batch at a time.
+
+        Rows are mapped to field values by ROW_PARSERS. `build_instance`
+        turns those values and the 1-based row number into an unsaved model
+        instance, or returns None to skip the row. Every commit also records
+        the number of rows consumed in the file's ImportCheckpoint, which
+        --resume uses to skip the rows that are already stored.
+        """
+        if build_instance is None:
+            build_instance = lambda fields, row_number: model(**fields)
+
+        if not source.exists(file_name):
+            self.stdout.write(f'Skipping {file_name} - file not found')
+            return 0
+
+        checkpoint = self.load_checkpoint(source, file_name)
+        if checkpoint.completed:
+            self.stdout.write(f'Skipping {file_name} - already imported')
+            return 0
+
+        # Incremental syncs are idempotent, so they restart interrupted files
+        # to see every key before deleting stale rows.
+        resume_from = 0 if self.incremental else checkpoint.rows_committed
+        if resume_from:
+            self.stdout.write(f'Resuming {file_name} after row {resume_from:,}...')
+        else:
+            self.stdout.write(f'Importing {file_name}...')
+            checkpoint.rows_committed = 0
+
+        progress = FileProgress(file_name, source.size(file_name), resume_from)
+        sync = IncrementalSync(model) if self.incremental else None
+        fingerprint_attnames = fingerprint_fields(model)
+        row_number = 0
+
+        for batch, bytes_read in self.parsed_batches(source, file_name):
+            first_row = row_number + 1
+            row_number += len(batch)
+            if row_number <= resume_from:
+                progress.skip(bytes_read)
+                continue
+            if first_row <= resume_from:
+                batch = batch[resume_from - first_row + 1:]
+                first_row = resume_from + 1
+
+            instances = []
+            for offset, fields in enumerate(batch):
+                instance = build_instance(fields, first_row + offset)
+                if instance is not None:
+                    if fingerprint_attnames:
+                        instance.fingerprint = row_fingerprint(instance, fingerprint_attnames)
+                    instances.append(instance)
+
             with transaction.atomic():
-                for row in reader:
-                    ModelInfo.objects.create(
-                        uuid_history=row.get('UUIDHISTORY', ''),
-                        name=row.get('NAME', ''),
-                        locale=row.get('LOCALE', ''),
-                        description=row.get('DESCRIPTION', ''),
-                        version=row.get('VERSION', ''),
-                        released=row.get('RELEASED', '').lower() == 'true',
-                        release_notes=row.get('RELEASENOTES', '')
-                    )
-
-    def import_skill_groups(self, csv_dir):
+                if sync is not None:
+                    sync.write(instances)
+                elif instances:
+                    self.write_batch(model, instances)
+                checkpoint.rows_committed = row_number
+                checkpoint.batch_id += 1
+                checkpoint.save(update_fields=['rows_committed', 'batch_id', 'updated_at'])
+
+            progress.advance(len(batch), len(instances), bytes_read)
+            if progress.due():
+                self.stdout.write(progress.progress_line())
+
+        with transaction.atomic():
+            if sync is not None:
+                sync.finish(self.batch_size)
+            checkpoint.completed = True
+            checkpoint.save(update_fields=['completed', 'updated_at'])
+
+        summary = progress.as_dict()
+        self.stdout.write(
+            f'  {file_name}: {progress.rows} rows in {progress.elapsed:.2f}s '
+            f'({progress.rate:,.0f} rows/sec, peak memory {summary["peak_memory_kb"] or "?"} KiB)'
+        )
+        if sync is not None:
+            counts = sync.counts
+            summary.update(counts)
+            self.stdout.write(
+                f"  {file_name}: {counts['inserted']} inserted, {counts['updated']} updated, "
+                f"{counts['deleted']} deleted, {counts['unchanged']} unchanged"
+            )
+        if report is not None:
+            summary['unresolved'] = report.as_dict()
+            if report:
+                for line in report.lines():
+                    self.stdout.write(self.style.WARNING(line))
+        self.file_summaries.append(summary)
+        return progress.rows
+
+    def write_batch(self, model, instances):
+        """Write a batch of unsaved instances with COPY or bulk_create"""
+        if self.use_copy:
+            copy_instances(model, instances)
+        else:
+            model.objects.bulk_create(instances)
+
+    def import_model_info(self, source):
+        """Import model_info.csv"""
+        self.bulk_import(source, 'model_info.csv', ModelInfo)
+
+    def import_skill_groups(self, source):
         """Import skill_groups.csv"""
-        file_path = os.path.join(csv_dir, 'skill_groups.csv')
-        if not os.path.exists(file_path):
-            self.stdout.write(f'Skipping skill_groups.csv - file not found')
-            return
+        self.bulk_import(source, 'skill_groups.csv', SkillGroup)
 
-        self.stdout.write('Importing skill_groups.csv...')
-        with open(file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            with transaction.atomic():
-                for row in reader:
-                    SkillGroup.objects.create(
-                        id=row.get('ID', ''),
-                        uuid_history=row.get('UUIDHISTORY', ''),
-                        origin_uri=row.get('ORIGINURI', ''),
-                        code = row.get('CODE') or None,
-                        preferred_label=row.get('PREFERREDLABEL', ''),
-                        alt_labels=row.get('ALTLABELS', ''),
-                        description=row.get('DESCRIPTION', ''),
-                        scope_note=row.get('SCOPENOTE', '')
-                    )
-
-    def import_skills(self, csv_dir):
+    def import_skills(self, source):
         """Import skills.csv"""
-        file_path = os.path.join(csv_dir, 'skills.csv')
-        if not os.path.exists(file_path):
-            self.stdout.write(f'Skipping skills.csv - file not found')
-            return
+        self.bulk_import(source, 'skills.csv', Skill)
 
-        self.stdout.write('Importing skills.csv...')
-        with open(file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            with transaction.atomic():
-                for row in reader:
-                    Skill.objects.create(
-                        id=row.get('ID', ''),
-                        uuid_history=row.get('UUIDHISTORY', ''),
-                        origin_uri=row.get('ORIGINURI', ''),
-                        skill_type=row.get('SKILLTYPE', ''),
-                        reuse_level=row.get('REUSELEVEL', ''),
-                        preferred_label=row.get('PREFERREDLABEL', ''),
-                        alt_labels=row.get('ALTLABELS', ''),
-                        description=row.get('DESCRIPTION', ''),
-                        definition=row.get('DEFINITION', ''),
-                        scope_note=row.get('SCOPENOTE', ''),
-                        is_localized=row.get('ISLOCALIZED', '').lower() == 'true'
-                    )
-
-    def import_occupation_groups(self, csv_dir):
+    def import_occupation_groups(self, source):
         """Import occupation_groups.csv"""
-        file_path = os.path.join(csv_dir, 'occupation_groups.csv')
-        if not os.path.exists(file_path):
-            self.stdout.write(f'Skipping occupation_groups.csv - file not found')
-            return
+        self.bulk_import(source, 'occupation_groups.csv', OccupationGroup)
 
-        self.stdout.write('Importing occupation_groups.csv...')
-        with open(file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            with transaction.atomic():
-                for row in reader:
-                    OccupationGroup.objects.create(
-                        id=row.get('ID', ''),
-                        uuid_history=row.get('UUIDHISTORY', ''),
-                        origin_uri=row.get('ORIGINURI', ''),
-                        code=row.get('CODE', ''),
-                        group_type=row.get('GROUPTYPE', ''),
-                        preferred_label=row.get('PREFERREDLABEL', ''),
-                        alt_labels=row.get('ALTLABELS', ''),
-                        description=row.get('DESCRIPTION', '')
-                    )
-
-    def import_occupations(self, csv_dir):
+    def import_occupations(self, source):
         """Import occupations.csv"""
-        file_path = os.path.join(csv_dir, 'occupations.csv')
-        if not os.path.exists(file_path):
-            self.stdout.write(f'Skipping occupations.csv - file not found')
-            return
+        self.bulk_import(source, 'occupations.csv', Occupation)
 
-        self.stdout.write('Importing occupations.csv...')
-        with open(file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            with transaction.atomic():
-                for row in reader:
-                    Occupation.objects.create(
-                        id=row.get('ID', ''),
-                        uuid_history=row.get('UUIDHISTORY', ''),
-                        origin_uri=row.get('ORIGINURI', ''),
-                        occupation_group_code=row.get('OCCUPATIONGROUPCODE', ''),
-                        code=row.get('CODE', ''),
-                        preferred_label=row.get('PREFERREDLABEL', ''),
-                        alt_labels=row.get('ALTLABELS', ''),
-                        description=row.get('DESCRIPTION', ''),
-                        definition=row.get('DEFINITION', ''),
-                        scope_note=row.get('SCOPENOTE', ''),
-                        regulated_profession_note=row.get('REGULATEDPROFESSIONNOTE', ''),
-                        occupation_type=row.get('OCCUPATIONTYPE', ''),
-                        is_localized=row.get('ISLOCALIZED', '').lower() == 'true'
-                    )
-
-    def import_skill_hierarchy(self, csv_dir):
+    def import_skill_hierarchy(self, source):
         """Import skill_hierarchy.csv"""
-        file_path = os.path.join(csv_dir, 'skill_hierarchy.csv')
-        if not os.path.exists(file_path):
-            self.stdout.write(f'Skipping skill_hierarchy.csv - file not found')
-            return
+        self.bulk_import(source, 'skill_hierarchy.csv', SkillHierarchy)
 
-        self.stdout.write('Importing skill_hierarchy.csv...')
-        with open(file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            with transaction.atomic():
-                for row in reader:
-                    SkillHierarchy.objects.create(
-                        parent_object_type=row.get('PARENTOBJECTTYPE', ''),
-                        parent_id=row.get('PARENTID', ''),
-                        child_object_type=row.get('CHILDOBJECTTYPE', ''),
-                        child_id=row.get('CHILDID', '')
-                    )
-
-    def import_occupation_hierarchy(self, csv_dir):
+    def import_occupation_hierarchy(self, source):
         """Import occupation_hierarchy.csv"""
-        file_path = os.path.join(csv_dir, 'occupation_hierarchy.csv')
-        if not os.path.exists(file_path):
-            self.stdout.write(f'Skipping occupation_hierarchy.csv - file not found')
-            return
+        self.bulk_import(source, 'occupation_hierarchy.csv', OccupationHierarchy)
 
-        self.stdout.write('Importing occupation_hierarchy.csv...')
-        with open(file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            with transaction.atomic():
-                for row in reader:
-                    OccupationHierarchy.objects.create(
-                        parent_object_type=row.get('PARENTOBJECTTYPE', ''),
-                        parent_id=row.get('PARENTID', ''),
-                        child_object_type=row.get('CHILDOBJECTTYPE', ''),
-                        child_id=row.get('CHILDID', '')
-                    )
-
-    def import_skill_to_skill_relations(self, csv_dir):
+    def load_ids(self, model):
+        """Load every primary key of `model` into an in-memory set"""
+        return set(model.objects.values_list('id', flat=True).iterator())
+
+    def import_skill_to_skill_relations(self, source):
         """Import skill_to_skill_relations.csv"""
-        file_path = os.path.join(csv_dir, 'skill_to_skill_relations.csv')
-        if not os.path.exists(file_path):
-            self.stdout.write(f'Skipping skill_to_skill_relations.csv - file not found')
-            return
+        skill_ids = self.load_ids(Skill)
+        report = UnresolvedReport('skill_to_skill_relations.csv')
 
-        self.stdout.write('Importing skill_to_skill_relations.csv...')
-        with open(file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            with transaction.atomic():
-                for row in reader:
-                    try:
-                        requiring_skill = Skill.objects.get(id=row.get('REQUIRINGID', ''))
-                        required_skill = Skill.objects.get(id=row.get('REQUIREDID', ''))
-                        
-                        SkillToSkillRelation.objects.create(
-                            requiring_skill=requiring_skill,
-                            required_skill=required_skill,
-                            relation_type=row.get('RELATIONTYPE', '')
-                        )
-                    except Skill.DoesNotExist:
-                        self.stdout.write(f'Skill not found for relation: {row}')
-                        continue
-
-    def import_occupation_to_skill_relations(self, csv_dir):
+        def build_relation(fields, row_number):
+            if fields['requiring_skill_id'] not in skill_ids:
+                report.add(row_number, 'unknown requiring skill', fields['requiring_skill_id'])
+                return None
+            if fields['required_skill_id'] not in skill_ids:
+                report.add(row_number, 'unknown required skill', fields['required_skill_id'])
+                return None
+            return SkillToSkillRelation(**fields)
+
+        self.bulk_import(
+            source, 'skill_to_skill_relations.csv', SkillToSkillRelation,
+            build_relation, report
+        )
+
+    def import_occupation_to_skill_relations(self, source):
         """Import occupation_to_skill_relations.csv"""
-        file_path = os.path.join(csv_dir, 'occupation_to_skill_relations.csv')
-        if not os.path.exists(file_path):
-            self.stdout.write(f'Skipping occupation_to_skill_relations.csv - file not found')
-            return
+        occupation_ids = self.load_ids(Occupation)
+        skill_ids = self.load_ids(Skill)
+        report = UnresolvedReport('occupation_to_skill_relations.csv')
 
-        self.stdout.write('Importing occupation_to_skill_relations.csv...')
-        with open(file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            with transaction.atomic():
-                for row in reader:
-                    try:
-                        occupation = Occupation.objects.get(id=row.get('OCCUPATIONID', ''))
-                        skill = Skill.objects.get(id=row.get('SKILLID', ''))
-                        
-                        signalling_value = row.get('SIGNALLINGVALUE', '')
-                        if signalling_value:
-                            try:
-                                signalling_value = float(signalling_value)
-                            except ValueError:
-                                signalling_value = None
-                        else:
-                            signalling_value = None
-
-                        OccupationToSkillRelation.objects.create(
-                            occupation=occupation,
-                            skill=skill,
-                            relation_type=row.get('RELATIONTYPE', ''),
-                            signalling_value_label=row.get('SIGNALLINGVALUELABEL', ''),
-                            signalling_value=signalling_value
-                        )
-                    except (Occupation.DoesNotExist, Skill.DoesNotExist):
-                        self.stdout.write(f'Occupation or Skill not found for relation: {row}')
-                        continue
+        def build_relation(fields, row_number):
+            if fields['occupation_id'] not in occupation_ids:
+                report.add(row_number, 'unknown occupation', fields['occupation_id'])
+                return None
+            if fields['skill_id'] not in skill_ids:
+                report.add(row_number, 'unknown skill', fields['skill_id'])
+                return None
+            if fields['relation_type'] not in RELATION_TYPE_WEIGHTS:
+                report.add(row_number, 'unknown relation type', fields['relation_type'])
+                return None
+            return OccupationToSkillRelation(**fields)
+
+        self.bulk_import(
+            source, 'occupation_to_skill_relations.csv', OccupationToSkillRelation,
+            build_relation, report
+        )
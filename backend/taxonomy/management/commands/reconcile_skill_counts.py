@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from taxonomy.counters import drifted_skills, recount_skills
+from taxonomy.versioning import bump_generation
+
+
+class Command(BaseCommand):
+    help = 'Repair Skill.occupation_count and essential_count where they drifted from the relations'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the skills whose counters are off'
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(drifted_skills().values_list('id', 'preferred_label')[:20])
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All skill counters match their relations'))
+            return
+
+        for skill_id, label in drifted:
+            self.stdout.write(f'  {skill_id}  {label}')
+        if options['dry_run']:
+            self.stdout.write(f'{drifted_skills().count()} skills have drifted counters (dry run)')
+            return
+
+        fixed = recount_skills()
+        # Cached responses carry the old counters
+        bump_generation()
+        self.stdout.write(self.style.SUCCESS(f'Recounted {fixed} skills'))
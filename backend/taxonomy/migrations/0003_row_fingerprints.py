@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0002_alter_skillgroup_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='occupation',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the imported CSV columns, used by incremental imports', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='occupationgroup',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the imported CSV columns, used by incremental imports', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='occupationtoskillrelation',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the imported CSV columns, used by incremental imports', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the imported CSV columns, used by incremental imports', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='skillgroup',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the imported CSV columns, used by incremental imports', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='skilltoskillrelation',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the imported CSV columns, used by incremental imports', max_length=40),
+        ),
+    ]
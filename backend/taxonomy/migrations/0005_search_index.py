@@ -0,0 +1,70 @@
+from django.db import migrations
+
+# The DDL is frozen here rather than imported from taxonomy.search, so that
+# later changes to that module never alter what this migration does.
+# taxonomy.search.sqlite_index_sql must keep producing the same SQLite objects.
+TABLES = ('taxonomy_skill', 'taxonomy_occupation')
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5("
+    "preferred_label, alt_labels, description, content='{table}', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {table}_fts(rowid, preferred_label, alt_labels, description) "
+    "VALUES (new.rowid, new.preferred_label, new.alt_labels, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {table}_fts({table}_fts, rowid, preferred_label, alt_labels, description) "
+    "VALUES ('delete', old.rowid, old.preferred_label, old.alt_labels, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE ON {table} BEGIN "
+    "INSERT INTO {table}_fts({table}_fts, rowid, preferred_label, alt_labels, description) "
+    "VALUES ('delete', old.rowid, old.preferred_label, old.alt_labels, old.description); "
+    "INSERT INTO {table}_fts(rowid, preferred_label, alt_labels, description) "
+    "VALUES (new.rowid, new.preferred_label, new.alt_labels, new.description); END",
+    "INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS {table}_fts_insert',
+    'DROP TRIGGER IF EXISTS {table}_fts_delete',
+    'DROP TRIGGER IF EXISTS {table}_fts_update',
+    'DROP TABLE IF EXISTS {table}_fts',
+]
+
+POSTGRESQL_CREATE = [
+    "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(preferred_label, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(alt_labels, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED",
+    'CREATE INDEX IF NOT EXISTS {table}_search_vector_idx ON {table} USING GIN (search_vector)',
+]
+POSTGRESQL_DROP = [
+    'DROP INDEX IF EXISTS {table}_search_vector_idx',
+    'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def run_statements(schema_editor, statements):
+    """Run the statements of the connection's backend for every table; others have no index"""
+    statements = statements.get(schema_editor.connection.vendor, [])
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            for statement in statements:
+                cursor.execute(statement.format(table=table))
+
+
+def create_index(apps, schema_editor):
+    run_statements(schema_editor, {'sqlite': SQLITE_CREATE, 'postgresql': POSTGRESQL_CREATE})
+
+
+def drop_index(apps, schema_editor):
+    run_statements(schema_editor, {'sqlite': SQLITE_DROP, 'postgresql': POSTGRESQL_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0004_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
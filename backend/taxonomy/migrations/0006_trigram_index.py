@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Frozen here rather than imported from taxonomy.fuzzy, so that later changes
+# to that module never alter what this migration does. Only PostgreSQL gets
+# indexes; other backends use fuzzy's in-process trigram index.
+INDEXES = [
+    (table, column)
+    for table in ('taxonomy_skill', 'taxonomy_occupation')
+    for column in ('preferred_label', 'alt_labels')
+]
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, column in INDEXES:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm_idx '
+                f'ON {table} USING GIN ({column} gin_trgm_ops)'
+            )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table, column in INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {table}_{column}_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from taxonomy.labels import entity_labels
+
+
+def populate_labels(apps, schema_editor):
+    for model_name, label_model_name, fk_name in (
+        ('Skill', 'SkillLabel', 'skill_id'),
+        ('Occupation', 'OccupationLabel', 'occupation_id'),
+    ):
+        model = apps.get_model('taxonomy', model_name)
+        label_model = apps.get_model('taxonomy', label_model_name)
+        rows = model.objects.values_list('id', 'preferred_label', 'alt_labels')
+        label_model.objects.bulk_create(
+            (
+                label_model(**{fk_name: entity_id}, normalized_label=normalized, label=label, is_preferred=is_preferred)
+                for entity_id, preferred_label, alt_labels in rows.iterator(chunk_size=5000)
+                for normalized, label, is_preferred in entity_labels(preferred_label, alt_labels)
+            ),
+            batch_size=5000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0006_trigram_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupationLabel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=1024)),
+                ('normalized_label', models.CharField(db_index=True, help_text='Case-folded label without accents or punctuation', max_length=1024)),
+                ('is_preferred', models.BooleanField(default=False)),
+                ('occupation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='labels', to='taxonomy.occupation')),
+            ],
+            options={
+                'unique_together': {('occupation', 'normalized_label')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SkillLabel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=1024)),
+                ('normalized_label', models.CharField(db_index=True, help_text='Case-folded label without accents or punctuation', max_length=1024)),
+                ('is_preferred', models.BooleanField(default=False)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='labels', to='taxonomy.skill')),
+            ],
+            options={
+                'unique_together': {('skill', 'normalized_label')},
+            },
+        ),
+        migrations.RunPython(populate_labels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0007_label_tables'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='occupation',
+            index=models.Index(fields=['preferred_label', 'id'], name='occupation_label_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['preferred_label', 'id'], name='skill_label_id_idx'),
+        ),
+    ]
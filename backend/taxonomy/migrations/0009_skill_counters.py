@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:09
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_counts(apps, schema_editor):
+    Skill = apps.get_model('taxonomy', 'Skill')
+    OccupationToSkillRelation = apps.get_model('taxonomy', 'OccupationToSkillRelation')
+
+    def counted(condition=Q()):
+        relations = OccupationToSkillRelation.objects.filter(condition, skill=OuterRef('pk'))
+        return Coalesce(
+            Subquery(relations.order_by().values('skill').annotate(count=Count('id')).values('count')),
+            Value(0),
+            output_field=IntegerField()
+        )
+
+    Skill.objects.update(
+        occupation_count=counted(), essential_count=counted(Q(relation_type='essential'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0008_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='essential_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of occupations for which this skill is essential'),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='occupation_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of occupations relating to this skill'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['-occupation_count', 'id'], name='skill_occupation_count_idx'),
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+    ]
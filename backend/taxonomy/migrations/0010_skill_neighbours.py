@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from taxonomy.cooccurrence import top_neighbours
+
+
+def populate_neighbours(apps, schema_editor):
+    OccupationToSkillRelation = apps.get_model('taxonomy', 'OccupationToSkillRelation')
+    SkillNeighbour = apps.get_model('taxonomy', 'SkillNeighbour')
+    relations = OccupationToSkillRelation.objects.values_list(
+        'occupation_id', 'skill_id', 'relation_type', 'signalling_value'
+    ).iterator(chunk_size=5000)
+    SkillNeighbour.objects.bulk_create(
+        (
+            SkillNeighbour(skill_id=skill_id, neighbour_id=neighbour_id, score=score, common_occupation_count=common)
+            for skill_id, neighbour_id, score, common in top_neighbours(relations)
+        ),
+        batch_size=5000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0009_skill_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillNeighbour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Co-occurrence weighted by relation type and signalling value')),
+                ('common_occupation_count', models.PositiveIntegerField()),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='taxonomy.skill')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='taxonomy.skill')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['skill', '-score'], name='skill_neighbour_score_idx')],
+                'unique_together': {('skill', 'neighbour')},
+            },
+        ),
+        migrations.RunPython(populate_neighbours, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:15
+
+from django.db import migrations, models
+
+from taxonomy.closure import closure_pairs
+
+
+def populate_closures(apps, schema_editor):
+    for hierarchy_name, closure_name in (
+        ('SkillHierarchy', 'SkillHierarchyClosure'),
+        ('OccupationHierarchy', 'OccupationHierarchyClosure'),
+    ):
+        hierarchy_model = apps.get_model('taxonomy', hierarchy_name)
+        closure_model = apps.get_model('taxonomy', closure_name)
+        edges = hierarchy_model.objects.values_list(
+            'parent_object_type', 'parent_id', 'child_object_type', 'child_id'
+        ).iterator(chunk_size=5000)
+        closure_model.objects.bulk_create(
+            (
+                closure_model(
+                    ancestor_type=ancestor_type, ancestor_id=ancestor_id,
+                    descendant_type=descendant_type, descendant_id=descendant_id, depth=depth
+                )
+                for ancestor_type, ancestor_id, descendant_type, descendant_id, depth in closure_pairs(edges)
+            ),
+            batch_size=5000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0010_skill_neighbours'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupationHierarchyClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ancestor_type', models.CharField(max_length=20)),
+                ('ancestor_id', models.CharField(max_length=100)),
+                ('descendant_type', models.CharField(max_length=20)),
+                ('descendant_id', models.CharField(max_length=100)),
+                ('depth', models.PositiveSmallIntegerField(help_text='Number of parent links between the two')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ancestor_id', 'depth'], name='occupation_closure_anc_idx'), models.Index(fields=['descendant_id', 'depth'], name='occupation_closure_desc_idx')],
+                'unique_together': {('ancestor_id', 'descendant_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SkillHierarchyClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ancestor_type', models.CharField(max_length=20)),
+                ('ancestor_id', models.CharField(max_length=100)),
+                ('descendant_type', models.CharField(max_length=20)),
+                ('descendant_id', models.CharField(max_length=100)),
+                ('depth', models.PositiveSmallIntegerField(help_text='Number of parent links between the two')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ancestor_id', 'depth'], name='skill_closure_ancestor_idx'), models.Index(fields=['descendant_id', 'depth'], name='skill_closure_desc_idx')],
+                'unique_together': {('ancestor_id', 'descendant_id')},
+            },
+        ),
+        migrations.RunPython(populate_closures, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:18
+
+from django.db import migrations, models
+
+
+def create_generation(apps, schema_editor):
+    TaxonomyGeneration = apps.get_model('taxonomy', 'TaxonomyGeneration')
+    TaxonomyGeneration.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0011_hierarchy_closure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaxonomyGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.PositiveBigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_generation, migrations.RunPython.noop),
+    ]
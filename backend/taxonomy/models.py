@@ -1,12 +1,18 @@
 from django.db import models
 import uuid
 
+from .text import split_alt_labels
+
 
 class BaseModel(models.Model):
     """Base model with common fields"""
     id = models.CharField(max_length=100, primary_key=True)
     uuid_history = models.TextField(help_text="Comma-separated list of UUIDs")
     origin_uri = models.URLField(max_length=4096, blank=True, null=True)
+    fingerprint = models.CharField(
+        max_length=40, blank=True, editable=False,
+        help_text="Hash of the imported CSV columns, used by incremental imports"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -58,9 +64,7 @@ class SkillGroup(BaseModel):
 
     def get_alt_labels_list(self):
         """Return alternative labels as a list"""
-        if self.alt_labels:
-            return self.alt_labels.split('|')
-        return []
+        return split_alt_labels(self.alt_labels)
 
     def set_alt_labels_list(self, labels_list):
         """Set alternative labels from a list"""
@@ -93,15 +97,27 @@ class Skill(BaseModel):
     definition = models.TextField(max_length=4000, blank=True)
     scope_note = models.TextField(max_length=4000, blank=True)
     is_localized = models.BooleanField(default=False)
+    occupation_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Number of occupations relating to this skill"
+    )
+    essential_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Number of occupations for which this skill is essential"
+    )
+
+    class Meta:
+        indexes = [
+            # Keyset pagination walks this index
+            models.Index(fields=['preferred_label', 'id'], name='skill_label_id_idx'),
+            # Most popular skills first
+            models.Index(fields=['-occupation_count', 'id'], name='skill_occupation_count_idx'),
+        ]
 
     def __str__(self):
         return self.preferred_label
 
     def get_alt_labels_list(self):
         """Return alternative labels as a list"""
-        if self.alt_labels:
-            return self.alt_labels.split('|')
-        return []
+        return split_alt_labels(self.alt_labels)
 
     def set_alt_labels_list(self, labels_list):
         """Set alternative labels from a list"""
@@ -126,9 +142,7 @@ class OccupationGroup(BaseModel):
 
     def get_alt_labels_list(self):
         """Return alternative labels as a list"""
-        if self.alt_labels:
-            return self.alt_labels.split('|')
-        return []
+        return split_alt_labels(self.alt_labels)
 
     def set_alt_labels_list(self, labels_list):
         """Set alternative labels from a list"""
@@ -153,14 +167,15 @@ class Occupation(BaseModel):
     occupation_type = models.CharField(max_length=20, choices=OCCUPATION_TYPES)
     is_localized = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [models.Index(fields=['preferred_label', 'id'], name='occupation_label_id_idx')]
+
     def __str__(self):
         return self.preferred_label
 
     def get_alt_labels_list(self):
         """Return alternative labels as a list"""
-        if self.alt_labels:
-            return self.alt_labels.split('|')
-        return []
+        return split_alt_labels(self.alt_labels)
 
     def set_alt_labels_list(self, labels_list):
         """Set alternative labels from a list"""
@@ -185,6 +200,10 @@ class SkillToSkillRelation(models.Model):
         related_name='requiring_skills'
     )
     relation_type = models.CharField(max_length=10, choices=RELATION_TYPES)
+    fingerprint = models.CharField(
+        max_length=40, blank=True, editable=False,
+        help_text="Hash of the imported CSV columns, used by incremental imports"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -233,6 +252,10 @@ class OccupationToSkillRelation(models.Model):
         null=True,
         help_text="Value between 0 and 1"
     )
+    fingerprint = models.CharField(
+        max_length=40, blank=True, editable=False,
+        help_text="Hash of the imported CSV columns, used by incremental imports"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -295,3 +318,130 @@ class OccupationHierarchy(models.Model):
 
     def __str__(self):
         return f"{self.parent_object_type}({self.parent_id}) -> {self.child_object_type}({self.child_id})"
+
+
+class HierarchyClosure(models.Model):
+    """Every ancestor/descendant pair of a hierarchy with its distance, rebuilt after each import"""
+    ancestor_type = models.CharField(max_length=20)
+    ancestor_id = models.CharField(max_length=100)
+    descendant_type = models.CharField(max_length=20)
+    descendant_id = models.CharField(max_length=100)
+    depth = models.PositiveSmallIntegerField(help_text="Number of parent links between the two")
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.ancestor_id} -({self.depth})-> {self.descendant_id}"
+
+
+class SkillHierarchyClosure(HierarchyClosure):
+    class Meta:
+        unique_together = ['ancestor_id', 'descendant_id']
+        indexes = [
+            models.Index(fields=['ancestor_id', 'depth'], name='skill_closure_ancestor_idx'),
+            models.Index(fields=['descendant_id', 'depth'], name='skill_closure_desc_idx'),
+        ]
+
+
+class OccupationHierarchyClosure(HierarchyClosure):
+    class Meta:
+        unique_together = ['ancestor_id', 'descendant_id']
+        indexes = [
+            models.Index(fields=['ancestor_id', 'depth'], name='occupation_closure_anc_idx'),
+            models.Index(fields=['descendant_id', 'depth'], name='occupation_closure_desc_idx'),
+        ]
+
+
+class SkillLabel(models.Model):
+    """Preferred and alternative labels of a skill, normalized for exact lookups"""
+    skill = models.ForeignKey(
+        Skill,
+        on_delete=models.CASCADE,
+        related_name='labels'
+    )
+    label = models.CharField(max_length=1024)
+    normalized_label = models.CharField(
+        max_length=1024,
+        db_index=True,
+        help_text="Case-folded label without accents or punctuation"
+    )
+    is_preferred = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ['skill', 'normalized_label']
+
+    def __str__(self):
+        return f"{self.label} -> {self.skill_id}"
+
+
+class OccupationLabel(models.Model):
+    """Preferred and alternative labels of an occupation, normalized for exact lookups"""
+    occupation = models.ForeignKey(
+        Occupation,
+        on_delete=models.CASCADE,
+        related_name='labels'
+    )
+    label = models.CharField(max_length=1024)
+    normalized_label = models.CharField(
+        max_length=1024,
+        db_index=True,
+        help_text="Case-folded label without accents or punctuation"
+    )
+    is_preferred = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ['occupation', 'normalized_label']
+
+    def __str__(self):
+        return f"{self.label} -> {self.occupation_id}"
+
+
+class SkillNeighbour(models.Model):
+    """Top skills co-occurring with a skill across occupations, precomputed after each import"""
+    skill = models.ForeignKey(
+        Skill,
+        on_delete=models.CASCADE,
+        related_name='neighbours'
+    )
+    neighbour = models.ForeignKey(
+        Skill,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField(help_text="Co-occurrence weighted by relation type and signalling value")
+    common_occupation_count = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ['skill', 'neighbour']
+        indexes = [models.Index(fields=['skill', '-score'], name='skill_neighbour_score_idx')]
+
+    def __str__(self):
+        return f"{self.skill_id} ~ {self.neighbour_id} ({self.score:.2f})"
+
+
+class ImportCheckpoint(models.Model):
+    """Progress of one CSV file in the latest import_csv run"""
+    file_name = models.CharField(max_length=100, unique=True)
+    source_signature = models.CharField(
+        max_length=100,
+        help_text="Size and modification time of the file the checkpoint refers to"
+    )
+    rows_committed = models.PositiveIntegerField(default=0)
+    batch_id = models.PositiveIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        state = 'completed' if self.completed else f'batch {self.batch_id}'
+        return f"{self.file_name}: {self.rows_committed} rows ({state})"
+
+
+class TaxonomyGeneration(models.Model):
+    """Counter bumped by every import, part of the taxonomy version and the HTTP ETags"""
+    generation = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Generation {self.generation} ({self.changed_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,152 @@
+"""
+Pagination for the taxonomy list endpoints.
+
+Page numbers (?page=) stay the default. ?cursor= switches to keyset
+pagination: each page continues after the sort key of the last row
+((preferred_label, id) for skills and occupations, the primary key for
+relations), so every page costs the same index range scan however deep it
+is, and no total is counted. ?count=false drops the COUNT(*) from page
+number pagination.
+"""
+import base64
+import json
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_cursor(values, reverse=False):
+    data = json.dumps({'key': list(values), 'reverse': reverse}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (key values, reverse) of a cursor, or (None, False) for the first page"""
+    if not token:
+        return None, False
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        return list(data['key']), bool(data['reverse'])
+    except (ValueError, TypeError, KeyError):
+        raise NotFound('Invalid cursor')
+
+
+def key_filter(ordering, values, lookup='gt'):
+    """Filter for rows whose ordering tuple sorts after (gt) or before (lt) `values`"""
+    condition = Q()
+    for position in range(len(ordering)):
+        equal = dict(zip(ordering[:position], values))
+        condition |= Q(**equal, **{f'{ordering[position]}__{lookup}': values[position]})
+    # The redundant bound on the first column lets the database seek the
+    # index instead of scanning it from the start
+    return Q(**{f'{ordering[0]}__{lookup}e': values[0]}) & condition
+
+
+class TaxonomyPagination(PageNumberPagination):
+    """
+    Page number pagination with a keyset mode and an optional count.
+
+    Views opt into keyset pagination with a `keyset_ordering` attribute;
+    querysets ordered some other way (search results ranked by relevance)
+    keep page numbers.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.mode = 'page'
+        ordering = tuple(getattr(view, 'keyset_ordering', ()))
+        if self.cursor_query_param in request.query_params and ordering and self.keyset_ordered(queryset, ordering):
+            self.mode = 'keyset'
+            return self.paginate_keyset(queryset, request, ordering)
+        if request.query_params.get(self.count_query_param, '').lower() in ('false', '0', 'no'):
+            self.mode = 'uncounted'
+            return self.paginate_uncounted(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    @staticmethod
+    def keyset_ordered(queryset, ordering):
+        query = queryset.query
+        return not query.extra_order_by and tuple(query.order_by) in ((), ordering, ordering[:1])
+
+    def paginate_keyset(self, queryset, request, ordering):
+        page_size = self.get_page_size(request)
+        key, reverse = decode_cursor(request.query_params.get(self.cursor_query_param))
+        if key is not None and len(key) != len(ordering):
+            raise NotFound('Invalid cursor')
+
+        if key is not None:
+            queryset = queryset.filter(key_filter(ordering, key, 'lt' if reverse else 'gt'))
+        queryset = queryset.order_by(*[f'-{field}' if reverse else field for field in ordering])
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_cursor = self.previous_cursor = None
+        if rows:
+            first = [getattr(rows[0], field) for field in ordering]
+            last = [getattr(rows[-1], field) for field in ordering]
+            # A page reached backwards always has rows after it, one reached
+            # forwards from a cursor always has rows before it
+            if reverse or has_more:
+                self.next_cursor = encode_cursor(last)
+            if (reverse and has_more) or (not reverse and key is not None):
+                self.previous_cursor = encode_cursor(first, reverse=True)
+        return rows
+
+    def paginate_uncounted(self, queryset, request):
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = max(1, int(request.query_params.get(self.page_query_param, 1)))
+        except ValueError:
+            raise NotFound('Invalid page')
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_next_link(self):
+        if self.mode == 'keyset':
+            if self.next_cursor is None:
+                return None
+            url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+            return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+        if self.mode == 'uncounted':
+            if not self.has_next:
+                return None
+            return replace_query_param(
+                self.request.build_absolute_uri(), self.page_query_param, self.page_number + 1
+            )
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.mode == 'keyset':
+            if self.previous_cursor is None:
+                return None
+            url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+            return replace_query_param(url, self.cursor_query_param, self.previous_cursor)
+        if self.mode == 'uncounted':
+            if self.page_number == 1:
+                return None
+            url = self.request.build_absolute_uri()
+            if self.page_number == 2:
+                return remove_query_param(url, self.page_query_param)
+            return replace_query_param(url, self.page_query_param, self.page_number - 1)
+        return super().get_previous_link()
+
+    def get_paginated_response(self, data):
+        if self.mode == 'page':
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
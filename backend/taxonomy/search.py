@@ -0,0 +1,154 @@
+"""
+Full-text search over skills and occupations.
+
+SQLite uses FTS5 external-content tables kept in sync by triggers, PostgreSQL
+a generated, weighted tsvector column with a GIN index. Both rank label
+matches above alternative label matches, and those above description
+matches. When neither index is available, callers fall back to icontains.
+"""
+import re
+from django.db import connection
+from django.db.models import Q
+
+
+# Models with a full-text index, and the columns indexed for each
+SEARCH_TABLES = ('taxonomy_skill', 'taxonomy_occupation')
+SEARCH_COLUMNS = ('preferred_label', 'alt_labels', 'description')
+
+# bm25() column weights on SQLite; PostgreSQL uses the A/B/C tsvector weights
+# set by migration 0005_search_index
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+_ready = {}
+
+
+def fts_table(table):
+    return f'{table}_fts'
+
+
+def sqlite_index_sql(table):
+    """Statements creating the FTS5 table and sync triggers for `table`.
+
+    Migration 0005_search_index has a frozen copy of these statements (and of
+    the PostgreSQL search_vector column); keep the two in step.
+    """
+    fts = fts_table(table)
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{columns}, content='{table}', content_rowid='rowid', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.rowid, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.rowid, {new_values}); END",
+    ]
+
+
+def create_search_index(connection):
+    """Create the SQLite FTS5 tables and triggers and index the existing rows"""
+    with connection.cursor() as cursor:
+        for table in SEARCH_TABLES:
+            for statement in sqlite_index_sql(table):
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {fts_table(table)}({fts_table(table)}) VALUES ('rebuild')")
+    _ready.clear()
+
+
+def repair_search_index(connection):
+    """Recreate the SQLite sync triggers if a table rebuild dropped them.
+
+    SQLite migrations that alter a column copy the table into a new one, which
+    drops its triggers and renumbers its rowids. Rebuilding the FTS table from
+    its content table fixes both.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        triggers = {row[0] for row in cursor.fetchall()}
+    tables = set(connection.introspection.table_names())
+    if all(table in tables for table in SEARCH_TABLES) and any(
+        fts_table(table) in tables and f'{fts_table(table)}_insert' not in triggers
+        for table in SEARCH_TABLES
+    ):
+        create_search_index(connection)
+
+
+def index_ready(table):
+    """Whether the full-text index of `table` exists on the current database"""
+    key = (connection.alias, connection.settings_dict['NAME'], table)
+    if key not in _ready:
+        if connection.vendor == 'sqlite':
+            _ready[key] = fts_table(table) in connection.introspection.table_names()
+        elif connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                columns = connection.introspection.get_table_description(cursor, table)
+            _ready[key] = any(column.name == 'search_vector' for column in columns)
+        else:
+            _ready[key] = False
+    return _ready[key]
+
+
+def query_terms(query):
+    """Lower-cased words of a user query; special characters are dropped"""
+    return _WORD.findall(query.lower())
+
+
+def search_queryset(queryset, query):
+    """Filter `queryset` to full-text matches of `query`, best matches first.
+
+    Every word must match, and the last word may be a prefix so results
+    update as the user types. Returns None if there is no full-text index,
+    or on PostgreSQL if the query is only stopwords, so the caller can fall
+    back to icontains.
+    """
+    table = queryset.model._meta.db_table
+    terms = query_terms(query)
+    if not terms or table not in SEARCH_TABLES or not index_ready(table):
+        return None
+
+    if connection.vendor == 'sqlite':
+        fts = fts_table(table)
+        match = ' '.join(f'"{term}"' for term in terms[:-1])
+        match = f'{match} "{terms[-1]}"*'.strip()
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+        return queryset.extra(
+            select={'search_rank': f'bm25({fts}, {weights})'},
+            tables=[fts],
+            where=[f'{fts}.rowid = {table}.rowid', f'{fts} MATCH %s'],
+            params=[match],
+            order_by=['search_rank', 'preferred_label'],
+        )
+
+    tsquery = ' & '.join(f'{term}:*' if index == len(terms) - 1 else term for index, term in enumerate(terms))
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT numnode(to_tsquery('english', %s))", [tsquery])
+        if not cursor.fetchone()[0]:
+            # Only stopwords ("the", "and of"): the tsquery is empty and would match nothing
+            return None
+    return queryset.extra(
+        select={'search_rank': f"ts_rank({table}.search_vector, to_tsquery('english', %s))"},
+        select_params=[tsquery],
+        where=[f"{table}.search_vector @@ to_tsquery('english', %s)"],
+        params=[tsquery],
+        order_by=['-search_rank', 'preferred_label'],
+    )
+
+
+def search(queryset, query):
+    """Ranked full-text search, or an icontains filter ordered by label"""
+    ranked = search_queryset(queryset, query)
+    if ranked is not None:
+        return ranked
+    return queryset.filter(
+        Q(preferred_label__icontains=query) |
+        Q(description__icontains=query) |
+        Q(alt_labels__icontains=query)
+    ).order_by('preferred_label')
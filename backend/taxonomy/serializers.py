@@ -1,3 +1,4 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import (
     ModelInfo, SkillGroup, Skill, OccupationGroup, Occupation,
@@ -6,13 +7,128 @@ from .models import (
 )
 
 
-class ModelInfoSerializer(serializers.ModelSerializer):
+# Occupations embedded in each serialized skill
+RELATED_OCCUPATIONS_LIMIT = 10
+
+
+def parse_field_paths(value):
+    """Turn "id,steps.title,steps.skills" into {'id': {}, 'steps': {'title': {}, 'skills': {}}}"""
+    tree = {}
+    for path in (value or '').split(','):
+        node = tree
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+def field_tree(request):
+    """The ?fields= and ?expand= paths of a request merged into one tree, or None for all fields"""
+    params = getattr(request, 'query_params', None) or getattr(request, 'GET', {})
+    if 'fields' not in params:
+        return None
+    tree = parse_field_paths(params.get('fields'))
+    for name, subtree in parse_field_paths(params.get('expand')).items():
+        tree.setdefault(name, {}).update(subtree)
+    return tree
+
+
+def requested_fields(tree, path=''):
+    """Field names requested at a dotted path of a field tree: None for all, an empty set for none"""
+    for name in filter(None, path.split('.')):
+        if tree is None:
+            return None
+        if name not in tree:
+            return set()
+        tree = tree[name] or None
+    return None if tree is None else set(tree)
+
+
+def wants(fields, name):
+    return fields is None or name in fields
+
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets chosen per request.
+
+    ?fields=id,preferred_label returns only those fields; dotted paths
+    (steps.title) select the fields of nested serializers, and a nested
+    serializer named without a path keeps all its fields. ?expand= adds
+    more paths to a sparse fieldset, typically the embedded relations
+    (expand=related_skills). Fields that are left out are never computed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.field_tree = kwargs.pop('field_tree', None)
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        tree = self.field_tree
+        root = self.parent is None or (
+            isinstance(self.parent, serializers.ListSerializer) and self.parent.parent is None
+        )
+        if tree is None and root:
+            tree = field_tree(self.context.get('request'))
+        if tree is None:
+            return fields
+
+        for name in list(fields):
+            if name not in tree:
+                del fields[name]
+                continue
+            nested = fields[name]
+            if isinstance(nested, serializers.ListSerializer):
+                nested = nested.child
+            if isinstance(nested, DynamicFieldsMixin):
+                nested.field_tree = tree[name] or None
+        return fields
+
+
+def skill_prefetches(prefix='', fields=None):
+    """Prefetches for the relations SkillSerializer embeds, under an optional lookup prefix.
+
+    `fields` is the set of requested field names (None for all); relations
+    that were not requested are not fetched.
+    """
+    prefetches = []
+    if wants(fields, 'related_skills'):
+        prefetches.append(Prefetch(
+            f'{prefix}required_skills',
+            queryset=SkillToSkillRelation.objects.select_related('required_skill').order_by('id'),
+            to_attr='prefetched_required_skills'
+        ))
+    if wants(fields, 'related_occupations'):
+        prefetches.append(Prefetch(
+            f'{prefix}occupation_relations',
+            queryset=OccupationToSkillRelation.objects.select_related('occupation')
+            .order_by('id')[:RELATED_OCCUPATIONS_LIMIT],
+            to_attr='prefetched_occupation_relations'
+        ))
+    return prefetches
+
+
+def occupation_prefetches(prefix='', fields=None):
+    """Prefetches for the relations OccupationSerializer embeds"""
+    if not wants(fields, 'related_skills'):
+        return []
+    return [
+        Prefetch(
+            f'{prefix}skill_relations',
+            queryset=OccupationToSkillRelation.objects.select_related('skill').order_by('id'),
+            to_attr='prefetched_skill_relations'
+        ),
+    ]
+
+
+class ModelInfoSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ModelInfo
         fields = '__all__'
 
 
-class SkillGroupSerializer(serializers.ModelSerializer):
+class SkillGroupSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     alt_labels_list = serializers.SerializerMethodField()
     uuid_history_list = serializers.SerializerMethodField()
 
@@ -31,7 +147,7 @@ class SkillGroupSerializer(serializers.ModelSerializer):
         return obj.get_uuid_history_list()
 
 
-class SkillSerializer(serializers.ModelSerializer):
+class SkillSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     alt_labels_list = serializers.SerializerMethodField()
     uuid_history_list = serializers.SerializerMethodField()
     related_skills = serializers.SerializerMethodField()
@@ -43,6 +159,7 @@ class SkillSerializer(serializers.ModelSerializer):
             'id', 'uuid_history', 'uuid_history_list', 'origin_uri',
             'skill_type', 'reuse_level', 'preferred_label', 'alt_labels', 'alt_labels_list',
             'description', 'definition', 'scope_note', 'is_localized',
+            'occupation_count', 'essential_count',
             'created_at', 'updated_at', 'related_skills', 'related_occupations'
         ]
 
@@ -53,8 +170,10 @@ class SkillSerializer(serializers.ModelSerializer):
         return obj.get_uuid_history_list()
 
     def get_related_skills(self, obj):
-        # Get skills that this skill requires
-        required_relations = SkillToSkillRelation.objects.filter(requiring_skill=obj)
+        # Get skills that this skill requires, prefetched by skill_prefetches()
+        required_relations = getattr(obj, 'prefetched_required_skills', None)
+        if required_relations is None:
+            required_relations = obj.required_skills.select_related('required_skill').order_by('id')
         return [
             {
                 'skill_id': rel.required_skill.id,
@@ -66,7 +185,11 @@ class SkillSerializer(serializers.ModelSerializer):
 
     def get_related_occupations(self, obj):
         # Get occupations that use this skill
-        occupation_relations = OccupationToSkillRelation.objects.filter(skill=obj)[:10]
+        occupation_relations = getattr(obj, 'prefetched_occupation_relations', None)
+        if occupation_relations is None:
+            occupation_relations = obj.occupation_relations.select_related('occupation').order_by('id')[
+                :RELATED_OCCUPATIONS_LIMIT
+            ]
         return [
             {
                 'occupation_id': rel.occupation.id,
@@ -81,7 +204,7 @@ class SkillSerializer(serializers.ModelSerializer):
         ]
 
 
-class OccupationGroupSerializer(serializers.ModelSerializer):
+class OccupationGroupSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     alt_labels_list = serializers.SerializerMethodField()
     uuid_history_list = serializers.SerializerMethodField()
 
@@ -100,7 +223,7 @@ class OccupationGroupSerializer(serializers.ModelSerializer):
         return obj.get_uuid_history_list()
 
 
-class OccupationSerializer(serializers.ModelSerializer):
+class OccupationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     alt_labels_list = serializers.SerializerMethodField()
     uuid_history_list = serializers.SerializerMethodField()
     related_skills = serializers.SerializerMethodField()
@@ -121,8 +244,10 @@ class OccupationSerializer(serializers.ModelSerializer):
         return obj.get_uuid_history_list()
 
     def get_related_skills(self, obj):
-        # Get skills related to this occupation
-        skill_relations = OccupationToSkillRelation.objects.filter(occupation=obj)
+        # Get skills related to this occupation, prefetched by occupation_prefetches()
+        skill_relations = getattr(obj, 'prefetched_skill_relations', None)
+        if skill_relations is None:
+            skill_relations = obj.skill_relations.select_related('skill').order_by('id')
         return [
             {
                 'skill_id': rel.skill.id,
@@ -135,7 +260,7 @@ class OccupationSerializer(serializers.ModelSerializer):
         ]
 
 
-class SkillToSkillRelationSerializer(serializers.ModelSerializer):
+class SkillToSkillRelationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     requiring_skill_name = serializers.CharField(source='requiring_skill.preferred_label', read_only=True)
     required_skill_name = serializers.CharField(source='required_skill.preferred_label', read_only=True)
 
@@ -147,7 +272,7 @@ class SkillToSkillRelationSerializer(serializers.ModelSerializer):
         ]
 
 
-class OccupationToSkillRelationSerializer(serializers.ModelSerializer):
+class OccupationToSkillRelationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     occupation_name = serializers.CharField(source='occupation.preferred_label', read_only=True)
     skill_name = serializers.CharField(source='skill.preferred_label', read_only=True)
 
@@ -160,7 +285,7 @@ class OccupationToSkillRelationSerializer(serializers.ModelSerializer):
         ]
 
 
-class SkillHierarchySerializer(serializers.ModelSerializer):
+class SkillHierarchySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = SkillHierarchy
         fields = [
@@ -169,7 +294,7 @@ class SkillHierarchySerializer(serializers.ModelSerializer):
         ]
 
 
-class OccupationHierarchySerializer(serializers.ModelSerializer):
+class OccupationHierarchySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = OccupationHierarchy
         fields = [
@@ -179,14 +304,14 @@ class OccupationHierarchySerializer(serializers.ModelSerializer):
 
 
 # Special serializers for the frontend needs
-class SkillSearchSerializer(serializers.ModelSerializer):
+class SkillSearchSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Lightweight serializer for search results"""
     class Meta:
         model = Skill
         fields = ['id', 'preferred_label', 'skill_type', 'reuse_level', 'description']
 
 
-class OccupationSearchSerializer(serializers.ModelSerializer):
+class OccupationSearchSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Lightweight serializer for search results"""
     class Meta:
         model = Occupation
@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .counters import recount_skills
+from .labels import refresh_labels
+from .models import Skill, Occupation, OccupationToSkillRelation
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_save, sender=Occupation)
+def update_labels(sender, instance, raw=False, **kwargs):
+    """Keep the label lookup tables in sync with edits made outside import_csv"""
+    if not raw:
+        refresh_labels(instance)
+
+
+@receiver(pre_save, sender=OccupationToSkillRelation)
+def remember_counted_skill(sender, instance, raw=False, **kwargs):
+    """Note the skill a relation belonged to, in case the edit moves it to another one"""
+    if not raw and instance.pk:
+        instance._previous_skill_id = sender.objects.filter(pk=instance.pk).values_list(
+            'skill_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=OccupationToSkillRelation)
+@receiver(post_delete, sender=OccupationToSkillRelation)
+def update_skill_counts(sender, instance, raw=False, **kwargs):
+    """Keep Skill.occupation_count and essential_count in step with relation writes"""
+    if not raw:
+        recount_skills({instance.skill_id, getattr(instance, '_previous_skill_id', None)} - {None})
+
+
+COUNTER_RECEIVERS = [
+    (pre_save, remember_counted_skill),
+    (post_save, update_skill_counts),
+    (post_delete, update_skill_counts),
+]
+
+
+@contextmanager
+def deferred_skill_counts():
+    """Disconnect the skill counter receivers for the duration of a bulk write.
+
+    While a delete receiver is connected, Django loads every deleted
+    relation (also those cascaded from skills and occupations) and sends a
+    signal per row instead of issuing one DELETE. The caller recounts once
+    afterwards with recount_skills().
+    """
+    for signal, handler in COUNTER_RECEIVERS:
+        signal.disconnect(handler, sender=OccupationToSkillRelation)
+    try:
+        yield
+    finally:
+        for signal, handler in COUNTER_RECEIVERS:
+            signal.connect(handler, sender=OccupationToSkillRelation)
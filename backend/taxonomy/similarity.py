@@ -0,0 +1,97 @@
+"""
+Occupation similarity from the skills occupations share.
+
+Each occupation is a sparse vector over skills, weighted like skill
+co-occurrence (relation type times signalling value). Every worker builds
+the occupation x skill matrix once per taxonomy version and keeps two
+copies: one with L2-normalized rows for cosine similarity and a binary one
+for Jaccard similarity. A query multiplies the queried rows by the
+transposed matrix, so a batch of occupations costs one sparse product.
+"""
+import threading
+import numpy as np
+from scipy import sparse
+from .cooccurrence import relation_matrix
+from .models import OccupationToSkillRelation
+from .versioning import taxonomy_version
+
+
+METRICS = ('cosine', 'jaccard')
+MAX_LIMIT = 50
+
+
+class OccupationSimilarity:
+    """Sparse occupation x skill matrices of one taxonomy version"""
+
+    def __init__(self, relations):
+        self.occupation_ids, _, matrix = relation_matrix(relations)
+        self.index = {occupation_id: row for row, occupation_id in enumerate(self.occupation_ids)}
+
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        inverse_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        self.normalized = sparse.diags(inverse_norms) @ matrix
+        self.normalized_t = self.normalized.T.tocsr()
+
+        self.binary = matrix.copy()
+        self.binary.data[:] = 1.0
+        self.binary_t = self.binary.T.tocsr()
+        self.skill_counts = np.diff(self.binary.indptr)
+
+    def __len__(self):
+        return len(self.occupation_ids)
+
+    def similar(self, occupation_ids, limit=10, metric='cosine'):
+        """Return {occupation ID: [(similar occupation ID, score, common skill count)]}, best first.
+
+        Occupations without skill relations are left out of the result.
+        """
+        queried = [occupation_id for occupation_id in dict.fromkeys(occupation_ids) if occupation_id in self.index]
+        if not queried or len(self) < 2:
+            return {occupation_id: [] for occupation_id in queried}
+        rows = np.array([self.index[occupation_id] for occupation_id in queried])
+        limit = max(1, min(limit, len(self) - 1))
+
+        common = (self.binary[rows] @ self.binary_t).toarray()
+        if metric == 'jaccard':
+            union = self.skill_counts[rows][:, None] + self.skill_counts[None, :] - common
+            scores = np.divide(common, union, out=np.zeros_like(common), where=union > 0)
+        else:
+            scores = (self.normalized[rows] @ self.normalized_t).toarray()
+        # An occupation is not similar to itself
+        scores[np.arange(len(rows)), rows] = -1.0
+
+        top = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+        results = {}
+        for position, occupation_id in enumerate(queried):
+            candidates = top[position]
+            # Best score first, ties in matrix order so results are stable
+            candidates = candidates[np.lexsort((candidates, -scores[position, candidates]))]
+            results[occupation_id] = [
+                (self.occupation_ids[column], float(scores[position, column]), int(common[position, column]))
+                for column in candidates if scores[position, column] > 0
+            ]
+        return results
+
+
+_lock = threading.Lock()
+_similarity = None
+_similarity_version = None
+
+
+def get_similarity():
+    """Return the similarity matrices of the current taxonomy version, building them once"""
+    global _similarity, _similarity_version
+    version = taxonomy_version()
+    if _similarity_version != version:
+        with _lock:
+            if _similarity_version != version:
+                relations = OccupationToSkillRelation.objects.values_list(
+                    'occupation_id', 'skill_id', 'relation_type', 'signalling_value'
+                ).iterator(chunk_size=5000)
+                _similarity = OccupationSimilarity(relations)
+                _similarity_version = version
+    return _similarity
+
+
+def similar_occupations(occupation_ids, limit=10, metric='cosine'):
+    return get_similarity().similar(occupation_ids, limit, metric)
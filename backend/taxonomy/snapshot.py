@@ -0,0 +1,397 @@
+"""
+Compact binary snapshot of the taxonomy graph.
+
+The snapshot stores every skill, skill group, occupation and occupation group
+as an integer node index, their IDs and labels in an interned string table,
+and the relation and hierarchy tables as CSR (compressed sparse row)
+adjacency arrays. Workers mmap the file read-only, so all processes on a host
+share one copy of the graph through the page cache instead of rebuilding it
+from SQL.
+
+File layout: MAGIC, a uint32 header length, a JSON header describing the
+sections, then each section as a raw native-endian array aligned to 8 bytes.
+File names start with a hash of the database connection, so databases that
+share TAXONOMY_SNAPSHOT_DIR (e.g. the benchmark's throwaway database) never
+load or prune each other's snapshots.
+"""
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from django.conf import settings
+from django.db import connection
+from .models import (
+    Skill, SkillGroup, Occupation, OccupationGroup,
+    SkillToSkillRelation, OccupationToSkillRelation,
+    SkillHierarchy, OccupationHierarchy
+)
+from .versioning import taxonomy_version
+
+
+MAGIC = b'JCTAXSNP'
+FORMAT_VERSION = 2
+ALIGNMENT = 8
+
+# Node kinds, stored in contiguous index ranges in this order
+KINDS = ('skill', 'skill_group', 'occupation', 'occupation_group')
+KIND_MODELS = {
+    'skill': Skill,
+    'skill_group': SkillGroup,
+    'occupation': Occupation,
+    'occupation_group': OccupationGroup,
+}
+# Model fields stored per node as node_types and node_reuse_levels
+KIND_ATTRIBUTES = {
+    'skill': ('skill_type', 'reuse_level'),
+    'skill_group': (None, None),
+    'occupation': ('occupation_type', None),
+    'occupation_group': ('group_type', None),
+}
+
+# Relation type codes stored alongside CSR edges
+RELATION_TYPES = ('', 'essential', 'optional')
+RELATION_CODES = {name: code for code, name in enumerate(RELATION_TYPES)}
+
+# CSR adjacency lists in the snapshot; every one is indexed by node
+GRAPHS = (
+    'skill_requires',         # skill -> skills it requires
+    'skill_required_by',      # skill -> skills requiring it
+    'occupation_skills',      # occupation -> skills (weights: signalling value)
+    'skill_occupations',      # skill -> occupations (weights: signalling value)
+    'skill_children',         # skill group / skill -> children in the skill hierarchy
+    'skill_parents',
+    'occupation_children',    # occupation group / occupation -> children in the occupation hierarchy
+    'occupation_parents',
+)
+# Signalling value stored for edges that have none
+NO_WEIGHT = -1.0
+
+
+def _csr(node_count, sources, targets, codes, weights=None):
+    """Group edge arrays by source node into CSR arrays"""
+    indptr = array('I', bytes(4 * (node_count + 1)))
+    for source in sources:
+        indptr[source + 1] += 1
+    for node in range(node_count):
+        indptr[node + 1] += indptr[node]
+
+    edge_count = len(sources)
+    cursor = array('I', indptr[:-1])
+    indices = array('I', bytes(4 * edge_count))
+    edge_codes = array('B', bytes(edge_count))
+    edge_weights = array('f', bytes(4 * edge_count)) if weights is not None else None
+    for edge, source in enumerate(sources):
+        position = cursor[source]
+        cursor[source] = position + 1
+        indices[position] = targets[edge]
+        edge_codes[position] = codes[edge]
+        if edge_weights is not None:
+            edge_weights[position] = weights[edge]
+
+    sections = {'indptr': indptr, 'indices': indices, 'codes': edge_codes}
+    if edge_weights is not None:
+        sections['weights'] = edge_weights
+    return sections
+
+
+class _Edges:
+    """Edge list accumulated as compact arrays while reading the database"""
+
+    def __init__(self, weighted=False):
+        self.sources = array('I')
+        self.targets = array('I')
+        self.codes = array('B')
+        self.weights = array('f') if weighted else None
+
+    def add(self, source, target, code, weight=None):
+        self.sources.append(source)
+        self.targets.append(target)
+        self.codes.append(code)
+        if self.weights is not None:
+            self.weights.append(NO_WEIGHT if weight is None else weight)
+
+    def csr(self, node_count):
+        return _csr(node_count, self.sources, self.targets, self.codes, self.weights)
+
+
+def collect_sections(chunk_size=5000):
+    """Read the taxonomy from the database into snapshot sections"""
+    strings = {}
+    string_list = []
+
+    def intern(value):
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(string_list)
+            string_list.append(value)
+        return index
+
+    node_index = {}
+    node_ids = array('I')
+    node_labels = array('I')
+    node_types = array('I')
+    node_reuse_levels = array('I')
+    ranges = {}
+    for kind in KINDS:
+        start = len(node_ids)
+        type_field, reuse_field = KIND_ATTRIBUTES[kind]
+        rows = KIND_MODELS[kind].objects.order_by('id').values_list(
+            'id', 'preferred_label', *[field for field in (type_field, reuse_field) if field]
+        )
+        for node_id, label, *attributes in rows.iterator(chunk_size=chunk_size):
+            node_index[node_id] = len(node_ids)
+            node_ids.append(intern(node_id))
+            node_labels.append(intern(label))
+            attributes = iter(attributes)
+            node_types.append(intern(next(attributes) if type_field else ''))
+            node_reuse_levels.append(intern(next(attributes) if reuse_field else ''))
+        ranges[kind] = [start, len(node_ids)]
+    node_count = len(node_ids)
+
+    edges = {name: _Edges(weighted=name in ('occupation_skills', 'skill_occupations')) for name in GRAPHS}
+
+    relations = SkillToSkillRelation.objects.values_list(
+        'requiring_skill_id', 'required_skill_id', 'relation_type'
+    )
+    for requiring, required, relation_type in relations.iterator(chunk_size=chunk_size):
+        source, target = node_index.get(requiring), node_index.get(required)
+        if source is None or target is None:
+            continue
+        code = RELATION_CODES.get(relation_type, 0)
+        edges['skill_requires'].add(source, target, code)
+        edges['skill_required_by'].add(target, source, code)
+
+    relations = OccupationToSkillRelation.objects.values_list(
+        'occupation_id', 'skill_id', 'relation_type', 'signalling_value'
+    )
+    for occupation, skill, relation_type, signalling in relations.iterator(chunk_size=chunk_size):
+        source, target = node_index.get(occupation), node_index.get(skill)
+        if source is None or target is None:
+            continue
+        code = RELATION_CODES.get(relation_type, 0)
+        weight = None if signalling is None else float(signalling)
+        edges['occupation_skills'].add(source, target, code, weight)
+        edges['skill_occupations'].add(target, source, code, weight)
+
+    for model, prefix in ((SkillHierarchy, 'skill'), (OccupationHierarchy, 'occupation')):
+        rows = model.objects.values_list('parent_id', 'child_id')
+        for parent, child in rows.iterator(chunk_size=chunk_size):
+            source, target = node_index.get(parent), node_index.get(child)
+            if source is None or target is None:
+                continue
+            edges[f'{prefix}_children'].add(source, target, 0)
+            edges[f'{prefix}_parents'].add(target, source, 0)
+
+    encoded = [value.encode('utf-8') for value in string_list]
+    string_offsets = array('Q', bytes(8 * (len(encoded) + 1)))
+    total = 0
+    for index, value in enumerate(encoded):
+        total += len(value)
+        string_offsets[index + 1] = total
+
+    # Node indexes sorted by ID, for binary search lookups without a dict
+    id_order = array('I', sorted(range(node_count), key=lambda node: string_list[node_ids[node]]))
+
+    sections = {
+        'string_data': b''.join(encoded),
+        'string_offsets': string_offsets,
+        'node_ids': node_ids,
+        'node_labels': node_labels,
+        'node_types': node_types,
+        'node_reuse_levels': node_reuse_levels,
+        'id_order': id_order,
+    }
+    for name, edge_list in edges.items():
+        for part, values in edge_list.csr(node_count).items():
+            sections[f'{name}.{part}'] = values
+    return ranges, sections
+
+
+def write_snapshot(path, version, ranges, sections):
+    """Write snapshot sections to `path` atomically"""
+    layout = {}
+    offset = 0
+    for name, values in sections.items():
+        typecode = values.typecode if isinstance(values, array) else 'B'
+        size = len(values) * (values.itemsize if isinstance(values, array) else 1)
+        layout[name] = {'offset': offset, 'size': size, 'typecode': typecode}
+        offset += -(-size // ALIGNMENT) * ALIGNMENT
+
+    header = json.dumps({
+        'format': FORMAT_VERSION,
+        'version': version,
+        'byteorder': sys.byteorder,
+        'ranges': ranges,
+        'sections': layout,
+    }).encode('utf-8')
+    # Pad the header so that the first section starts aligned
+    prefix = len(MAGIC) + 4
+    header += b' ' * (-(prefix + len(header)) % ALIGNMENT)
+
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(MAGIC)
+        file.write(struct.pack('<I', len(header)))
+        file.write(header)
+        for name, values in sections.items():
+            data = values.tobytes() if isinstance(values, array) else values
+            file.write(data)
+            file.write(b'\0' * (-len(data) % ALIGNMENT))
+    os.replace(temporary, path)
+
+
+def snapshot_prefix():
+    """Return the file name prefix of the active database's snapshots"""
+    database = connection.settings_dict
+    identity = f'{connection.vendor}:{database.get("HOST")}:{database.get("PORT")}:{database["NAME"]}'
+    return f'taxonomy-{hashlib.sha1(identity.encode()).hexdigest()[:12]}-'
+
+
+def snapshot_path(version):
+    safe_version = re.sub(r'[^A-Za-z0-9._-]', '_', version)
+    return os.path.join(settings.TAXONOMY_SNAPSHOT_DIR, f'{snapshot_prefix()}{safe_version}.v{FORMAT_VERSION}.snap')
+
+
+def prune_snapshots(keep):
+    """Remove the active database's snapshots other than `keep`.
+
+    Processes that still have a removed file mapped keep reading it until
+    they reload.
+    """
+    prefix = snapshot_prefix()
+    for name in os.listdir(settings.TAXONOMY_SNAPSHOT_DIR):
+        stale = os.path.join(settings.TAXONOMY_SNAPSHOT_DIR, name)
+        if name.startswith(prefix) and name.endswith('.snap') and stale != keep:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:  # Pruned by a concurrent build
+                pass
+
+
+def build_snapshot(version=None, prune=False):
+    """Build the snapshot of the current taxonomy and return its path.
+
+    With `prune`, snapshots of older versions are removed. Only imports and
+    build_taxonomy_snapshot prune: a worker that builds on demand may still
+    hold a version key from before an import and must not remove the newer
+    snapshot.
+    """
+    version = version or taxonomy_version()
+    os.makedirs(settings.TAXONOMY_SNAPSHOT_DIR, exist_ok=True)
+    ranges, sections = collect_sections()
+    path = snapshot_path(version)
+    write_snapshot(path, version, ranges, sections)
+    if prune:
+        prune_snapshots(path)
+    return path
+
+
+class Snapshot:
+    """Read-only view of a snapshot file, backed by mmap"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f'{path} is not a taxonomy snapshot')
+        (header_length,) = struct.unpack_from('<I', buffer, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(buffer[start:start + header_length]))
+        if header['format'] != FORMAT_VERSION or header['byteorder'] != sys.byteorder:
+            raise ValueError(f'{path} was written by an incompatible build')
+
+        self.version = header['version']
+        self.ranges = {kind: tuple(bounds) for kind, bounds in header['ranges'].items()}
+        data_start = start + header_length
+        self._sections = {}
+        for name, section in header['sections'].items():
+            offset = data_start + section['offset']
+            self._sections[name] = buffer[offset:offset + section['size']].cast(section['typecode'])
+
+        self.node_count = len(self._sections['node_ids'])
+        self._string_data = self._sections['string_data']
+        self._string_offsets = self._sections['string_offsets']
+
+    def string(self, index):
+        start, end = self._string_offsets[index], self._string_offsets[index + 1]
+        return bytes(self._string_data[start:end]).decode('utf-8')
+
+    def node_id(self, node):
+        return self.string(self._sections['node_ids'][node])
+
+    def label(self, node):
+        return self.string(self._sections['node_labels'][node])
+
+    def node_type(self, node):
+        """skill_type, occupation_type or group_type of a node"""
+        return self.string(self._sections['node_types'][node])
+
+    def reuse_level(self, node):
+        return self.string(self._sections['node_reuse_levels'][node])
+
+    def kind(self, node):
+        for kind, (start, end) in self.ranges.items():
+            if start <= node < end:
+                return kind
+        raise IndexError(node)
+
+    def nodes(self, kind):
+        """Range of node indexes of one kind"""
+        return range(*self.ranges[kind])
+
+    def index_of(self, node_id):
+        """Node index of a taxonomy ID, or None"""
+        order = self._sections['id_order']
+        position = bisect_left(order, node_id, key=self.node_id)
+        if position < len(order) and self.node_id(order[position]) == node_id:
+            return order[position]
+        return None
+
+    def neighbours(self, graph, node):
+        """Return (targets, relation codes, weights or None) of a node in one CSR graph"""
+        indptr = self._sections[f'{graph}.indptr']
+        start, end = indptr[node], indptr[node + 1]
+        weights = self._sections.get(f'{graph}.weights')
+        return (
+            self._sections[f'{graph}.indices'][start:end],
+            self._sections[f'{graph}.codes'][start:end],
+            weights[start:end] if weights is not None else None,
+        )
+
+    def degree(self, graph, node):
+        indptr = self._sections[f'{graph}.indptr']
+        return indptr[node + 1] - indptr[node]
+
+    def edge_count(self, graph):
+        return len(self._sections[f'{graph}.indices'])
+
+
+_lock = threading.Lock()
+_loaded = None
+
+
+def get_snapshot():
+    """Return the mmapped snapshot of the current taxonomy version.
+
+    import_csv builds the file after every import; a worker builds it itself
+    only when it is missing, and reloads it when a new version is imported.
+    """
+    global _loaded
+    version = taxonomy_version()
+    if _loaded is not None and _loaded.version == version:
+        return _loaded
+    with _lock:
+        if _loaded is None or _loaded.version != version:
+            path = snapshot_path(version)
+            if not os.path.exists(path):
+                build_snapshot(version)
+            _loaded = Snapshot(path)
+    return _loaded
@@ -1,3 +1,1097 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import signal
+import tarfile
+import tempfile
+import zipfile
+from decimal import Decimal
+from importlib import import_module
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from .models import (
+    ImportCheckpoint, ModelInfo, Skill, SkillGroup, Occupation, OccupationGroup, SkillToSkillRelation, OccupationToSkillRelation,
+    SkillHierarchy, OccupationHierarchy, SkillNeighbour
+)
+from . import autocomplete, extraction, fuzzy, snapshot
+from .closure import rebuild_closures
+from .counters import recount_skills
+from .csv_format import CSV_COLUMNS, ArchiveSource, DirectorySource, open_source
+from .cooccurrence import rebuild_neighbours, top_neighbours
+from .export import EXPORTS, stream_export
+from .labels import rebuild_labels, resolve, resolve_occupations
+from .management.commands.benchmark_taxonomy import ENDPOINTS
+from .search import SEARCH_TABLES, sqlite_index_sql
+from .serializers import SkillSerializer
+from .signals import deferred_skill_counts
+from .text import split_alt_labels
+from .tree import MAX_DEPTH as MAX_TREE_DEPTH, _trees
+from .versioning import bump_generation, clear_version_cache, taxonomy_version
+
+
+def write_csv(directory, file_name, rows):
+    """Write a Tabiya CSV file, leaving out columns the rows do not set"""
+    with open(os.path.join(directory, file_name), 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, CSV_COLUMNS[file_name], restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_taxonomy(directory, skills=None):
+    """Write a small taxonomy bundle; `skills` replaces the rows of skills.csv"""
+    write_csv(directory, 'model_info.csv', [{'UUIDHISTORY': 'uuid-model', 'NAME': 'test', 'VERSION': 'v1'}])
+    write_csv(directory, 'skill_groups.csv', [{'ID': 'digital', 'UUIDHISTORY': 'uuid-digital', 'PREFERREDLABEL': 'digital'}])
+    write_csv(directory, 'skills.csv', skills or [
+        {'ID': 'python', 'UUIDHISTORY': 'uuid-python', 'PREFERREDLABEL': 'python', 'ALTLABELS': 'python 3'},
+        {'ID': 'django', 'UUIDHISTORY': 'uuid-django', 'PREFERREDLABEL': 'django'},
+        {'ID': 'welding', 'UUIDHISTORY': 'uuid-welding', 'PREFERREDLABEL': 'welding'},
+    ])
+    write_csv(directory, 'occupation_groups.csv', [
+        {'ID': 'ict', 'UUIDHISTORY': 'uuid-ict', 'CODE': '25', 'GROUPTYPE': 'iscogroup', 'PREFERREDLABEL': 'ict'}
+    ])
+    write_csv(directory, 'occupations.csv', [
+        {'ID': 'developer', 'UUIDHISTORY': 'uuid-developer', 'OCCUPATIONGROUPCODE': '25', 'CODE': '25.1',
+         'OCCUPATIONTYPE': 'escooccupation', 'PREFERREDLABEL': 'developer'},
+        {'ID': 'welder', 'UUIDHISTORY': 'uuid-welder', 'OCCUPATIONGROUPCODE': '72', 'CODE': '72.1',
+         'OCCUPATIONTYPE': 'escooccupation', 'PREFERREDLABEL': 'welder'},
+    ])
+    write_csv(directory, 'skill_hierarchy.csv', [
+        {'PARENTOBJECTTYPE': 'skillgroup', 'PARENTID': 'digital', 'CHILDOBJECTTYPE': 'skill', 'CHILDID': 'python'}
+    ])
+    write_csv(directory, 'occupation_hierarchy.csv', [
+        {'PARENTOBJECTTYPE': 'occupationgroup', 'PARENTID': 'ict', 'CHILDOBJECTTYPE': 'escooccupation', 'CHILDID': 'developer'}
+    ])
+    write_csv(directory, 'skill_to_skill_relations.csv', [
+        {'REQUIRINGID': 'django', 'RELATIONTYPE': 'essential', 'REQUIREDID': 'python'}
+    ])
+    write_csv(directory, 'occupation_to_skill_relations.csv', [
+        {'OCCUPATIONID': 'developer', 'SKILLID': 'python', 'RELATIONTYPE': 'essential', 'SIGNALLINGVALUE': '0.8'},
+        {'OCCUPATIONID': 'developer', 'SKILLID': 'django', 'RELATIONTYPE': 'optional'},
+        {'OCCUPATIONID': 'welder', 'SKILLID': 'welding', 'RELATIONTYPE': 'essential'},
+        {'OCCUPATIONID': 'welder', 'SKILLID': 'unknown', 'RELATIONTYPE': 'essential'},
+    ])
+
+
+def stored_rows():
+    """The imported columns of every taxonomy table"""
+    rows = {}
+    for model in (
+        ModelInfo, SkillGroup, Skill, OccupationGroup, Occupation, SkillHierarchy, OccupationHierarchy,
+        SkillToSkillRelation, OccupationToSkillRelation
+    ):
+        columns = [
+            field.attname for field in model._meta.concrete_fields
+            if not field.auto_created and field.attname not in ('created_at', 'updated_at', 'fingerprint')
+        ]
+        rows[model.__name__] = sorted(model.objects.values_list(*columns), key=repr)
+    return rows
+
+
+def import_csv(directory, *args):
+    output = io.StringIO()
+    # Keep the snapshot the import builds next to the CSV files
+    snapshot_dir = directory if os.path.isdir(directory) else os.path.dirname(directory)
+    with override_settings(TAXONOMY_SNAPSHOT_DIR=snapshot_dir):
+        call_command('import_csv', directory, *args, stdout=output)
+    return output.getvalue()
+
+
+class SerializerQueryCountTests(TestCase):
+    """The skill and occupation endpoints issue a fixed number of queries per page"""
+
+    @classmethod
+    def setUpTestData(cls):
+        skills = [
+            Skill.objects.create(
+                id=f'skill-{index:02d}', uuid_history=f'uuid-skill-{index}',
+                preferred_label=f'skill {index:02d}',
+                skill_type='knowledge' if index < 5 else 'skill/competence'
+            )
+            for index in range(30)
+        ]
+        occupations = [
+            Occupation.objects.create(
+                id=f'occupation-{index:02d}', uuid_history=f'uuid-occupation-{index}',
+                occupation_group_code='1234', code=f'1234.{index}',
+                preferred_label=f'occupation {index:02d}',
+                occupation_type='escooccupation' if index < 5 else 'localoccupation'
+            )
+            for index in range(30)
+        ]
+        for index, skill in enumerate(skills):
+            for offset in (1, 2):
+                SkillToSkillRelation.objects.create(
+                    requiring_skill=skill, required_skill=skills[(index + offset) % len(skills)],
+                    relation_type='essential'
+                )
+            for offset in range(12):
+                OccupationToSkillRelation.objects.create(
+                    occupation=occupations[(index + offset) % len(occupations)], skill=skill,
+                    relation_type='optional'
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def assertQueriesPerPage(self, queries, url, small_page_filter):
+        # count, page and one query per prefetch, however many rows the page has
+        with self.assertNumQueries(queries):
+            full_page = self.client.get(url)
+        with self.assertNumQueries(queries):
+            small_page = self.client.get(url, small_page_filter)
+        self.assertEqual(len(full_page.data['results']), 20)
+        self.assertEqual(len(small_page.data['results']), 5)
+        return full_page.data['results']
+
+    def test_skill_list(self):
+        results = self.assertQueriesPerPage(4, '/api/taxonomy/skills/', {'skill_type': 'knowledge'})
+        self.assertEqual(len(results[0]['related_skills']), 2)
+        self.assertEqual(len(results[0]['related_occupations']), 10)
+        self.assertEqual(results[0]['related_skills'][0]['skill_name'], 'skill 01')
+
+    def test_occupation_list(self):
+        results = self.assertQueriesPerPage(3, '/api/taxonomy/occupations/', {'occupation_type': 'escooccupation'})
+        self.assertEqual(len(results[0]['related_skills']), 12)
+
+    def test_skill_detail(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/taxonomy/skills/skill-00/')
+        self.assertEqual(len(response.data['related_occupations']), 10)
+
+    def test_occupation_detail(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/taxonomy/occupations/occupation-00/')
+        self.assertEqual(len(response.data['related_skills']), 12)
+
+    def test_batch_lookup(self):
+        ids = [f'skill-{index:02d}' for index in range(25)] + ['skill-00', 'unknown']
+        with self.assertNumQueries(3):
+            response = self.client.post('/api/taxonomy/skills/batch/', {'ids': ids}, format='json')
+        self.assertEqual(len(response.data['results']), 25)
+        self.assertEqual(len(response.data['results']['skill-07']['related_occupations']), 10)
+        self.assertEqual(response.data['missing'], ['unknown'])
+
+        response = self.client.post(
+            '/api/taxonomy/occupations/batch/?fields=id', {'ids': ['occupation-03']}, format='json'
+        )
+        self.assertEqual(response.data['results'], {'occupation-03': {'id': 'occupation-03'}})
+
+    def test_serializer_without_prefetch(self):
+        data = SkillSerializer(Skill.objects.get(pk='skill-00')).data
+        self.assertEqual(len(data['related_occupations']), 10)
+
+    def test_sparse_fieldset_skips_prefetches(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/taxonomy/skills/', {'fields': 'id,preferred_label'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'preferred_label'})
+
+    def test_expand_adds_relations(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                '/api/taxonomy/skills/', {'fields': 'id', 'expand': 'related_skills'}
+            )
+        self.assertEqual(set(response.data['results'][0]), {'id', 'related_skills'})
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Repeated labels, so that pages split between rows sharing a label
+        for index in range(25):
+            Skill.objects.create(
+                id=f'skill-{index:02d}', uuid_history=f'uuid-skill-{index}', preferred_label=f'skill {index % 7}'
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_cursor_walk_matches_ordering(self):
+        url, pages = '/api/taxonomy/skills/?fields=id&cursor=&page_size=4', []
+        while url:
+            with self.assertNumQueries(1):
+                data = self.client.get(url).data
+            self.assertNotIn('count', data)
+            pages.append([row['id'] for row in data['results']])
+            url = data['next']
+
+        expected = list(Skill.objects.order_by('preferred_label', 'id').values_list('id', flat=True))
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual(len(pages), 7)
+
+        previous = self.client.get(self.client.get(
+            '/api/taxonomy/skills/', {'fields': 'id', 'cursor': '', 'page_size': 4}
+        ).data['next']).data['previous']
+        self.assertEqual([row['id'] for row in self.client.get(previous).data['results']], pages[0])
+
+    def test_count_opt_out(self):
+        with self.assertNumQueries(1):
+            data = self.client.get(
+                '/api/taxonomy/skills/', {'fields': 'id', 'count': 'false', 'page': 7, 'page_size': 4}
+            ).data
+        self.assertNotIn('count', data)
+        self.assertEqual(len(data['results']), 1)
+        self.assertIsNone(data['next'])
+
+
+class SkillSuggestionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        skills = {
+            name: Skill.objects.create(id=name, uuid_history=f'uuid-{name}', preferred_label=name)
+            for name in ('python', 'django', 'sql', 'welding')
+        }
+        occupations = [
+            Occupation.objects.create(
+                id=f'occupation-{index}', uuid_history=f'uuid-occupation-{index}',
+                occupation_group_code='1234', code=f'1234.{index}', preferred_label=f'occupation {index}',
+                occupation_type='escooccupation'
+            )
+            for index in range(3)
+        ]
+        for occupation, names in zip(occupations, [('python', 'django', 'sql'), ('python', 'django'), ('sql', 'welding')]):
+            for name in names:
+                OccupationToSkillRelation.objects.create(
+                    occupation=occupation, skill=skills[name], relation_type='essential'
+                )
+        rebuild_neighbours()
+
+    def test_single_seed_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/taxonomy/skill-suggestions/', {'skill_id': 'python'})
+        self.assertEqual([skill['id'] for skill in response.data], ['django', 'sql'])
+        self.assertEqual(response.data[0]['common_occupation_count'], 2)
+
+    def test_several_seeds(self):
+        response = self.client.get('/api/taxonomy/skill-suggestions/', {'skill_ids': 'django,welding'})
+        self.assertEqual([skill['id'] for skill in response.data], ['python', 'sql'])
+
+    def test_top_neighbours(self):
+        relations = [
+            ('developer', 'python', 'essential', 0.8),
+            ('developer', 'django', 'optional', None),
+            ('developer', 'sql', '', 0),
+            ('analyst', 'python', 'essential', None),
+            ('analyst', 'sql', 'essential', 1),
+        ]
+        neighbours = {(skill, neighbour): (score, common) for skill, neighbour, score, common in top_neighbours(relations)}
+        self.assertEqual(neighbours[('python', 'django')], (0.4, 1))
+        # Zero scores still count the shared occupation
+        self.assertEqual(neighbours[('django', 'sql')], (0.0, 1))
+        self.assertEqual(neighbours[('sql', 'python')], (1.0, 2))
+        self.assertEqual(len(neighbours), 6)
+        self.assertEqual([row[1] for row in top_neighbours(relations, limit=1) if row[0] == 'python'], ['sql'])
+
+        # Relations of an unknown type are left out rather than failing the rebuild
+        with self.assertLogs('taxonomy.cooccurrence', 'WARNING'):
+            with_unknown = list(top_neighbours([*relations, ('developer', 'rust', 'advanced', None)]))
+        self.assertEqual(with_unknown, list(top_neighbours(relations)))
+
+
+class HierarchyClosureTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for parent, child in (('root', 'group'), ('root', 'other'), ('group', 'leaf'), ('other', 'leaf')):
+            SkillHierarchy.objects.create(
+                parent_object_type='skillgroup', parent_id=parent, child_object_type='skillgroup', child_id=child
+            )
+        SkillGroup.objects.create(id='root', uuid_history='uuid-root', code='S', preferred_label='root group')
+        rebuild_closures()
+
+    def test_descendants_nearest_first(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/taxonomy/skill-hierarchy/root/descendants/')
+        self.assertEqual(
+            [(node['id'], node['depth']) for node in response.data['descendants']],
+            [('group', 1), ('other', 1), ('leaf', 2)]
+        )
+
+    def test_ancestors_root_first(self):
+        response = self.client.get('/api/taxonomy/skill-hierarchy/leaf/ancestors/')
+        self.assertEqual([node['id'] for node in response.data['ancestors']], ['root', 'group', 'other'])
+        self.assertEqual(response.data['ancestors'][0]['label'], 'root group')
+
+
+class ConditionalRequestTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Skill.objects.create(id='python', uuid_history='uuid-python', preferred_label='python')
+
+    def setUp(self):
+        clear_version_cache()
+
+    def test_matching_etag_is_answered_without_queries(self):
+        response = self.client.get('/api/taxonomy/skills/python/')
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertIn('max-age=', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/taxonomy/skills/python/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertIn('Accept', cached['Vary'])
+
+        cached = self.client.get('/api/taxonomy/skills/python/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_errors_have_no_validators(self):
+        response = self.client.get('/api/taxonomy/skills/unknown/')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+        self.assertFalse(response.has_header('Cache-Control'))
+
+    def test_import_changes_etag(self):
+        etag = self.client.get('/api/taxonomy/stats/')['ETag']
+        bump_generation()
+        response = self.client.get('/api/taxonomy/stats/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class SimilarOccupationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        skills = {
+            name: Skill.objects.create(id=name, uuid_history=f'uuid-{name}', preferred_label=name)
+            for name in ('python', 'django', 'sql', 'welding', 'cutting')
+        }
+        for name, skill_names in (
+            ('developer', ('python', 'django', 'sql')),
+            ('web developer', ('python', 'django')),
+            ('analyst', ('sql',)),
+            ('welder', ('welding', 'cutting')),
+        ):
+            occupation = Occupation.objects.create(
+                id=name, uuid_history=f'uuid-{name}', occupation_group_code='1234', code=f'1234.{len(name)}',
+                preferred_label=name, occupation_type='escooccupation'
+            )
+            for skill_name in skill_names:
+                OccupationToSkillRelation.objects.create(
+                    occupation=occupation, skill=skills[skill_name], relation_type='essential'
+                )
+        Occupation.objects.create(
+            id='unrelated', uuid_history='uuid-unrelated', occupation_group_code='1234', code='1234.0',
+            preferred_label='unrelated', occupation_type='escooccupation'
+        )
+
+    def test_cosine_neighbours(self):
+        response = self.client.get('/api/taxonomy/similar-occupations/', {'occupation_id': 'developer'})
+        neighbours = response.data['results']['developer']
+        self.assertEqual([row['id'] for row in neighbours], ['web developer', 'analyst'])
+        self.assertAlmostEqual(neighbours[0]['score'], 0.8165, places=4)
+        self.assertEqual(neighbours[0]['common_skill_count'], 2)
+
+    def test_batch_jaccard(self):
+        response = self.client.get('/api/taxonomy/similar-occupations/', {
+            'occupation_ids': 'web developer,welder,unrelated,unknown', 'metric': 'jaccard'
+        })
+        self.assertEqual(response.data['results']['web developer'][0]['score'], round(2 / 3, 4))
+        self.assertEqual(response.data['results']['welder'], [])
+        self.assertEqual(response.data['missing'], ['unrelated', 'unknown'])
+
+
+class SkillMappingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.skills = {
+            name: Skill.objects.create(id=name, uuid_history=f'uuid-{name}', preferred_label=name)
+            for name in ('python', 'django')
+        }
+        cls.occupation = Occupation.objects.create(
+            id='developer', uuid_history='uuid-developer', occupation_group_code='1234', code='1234.1',
+            preferred_label='developer', occupation_type='escooccupation'
+        )
+        SkillToSkillRelation.objects.create(
+            requiring_skill=cls.skills['django'], required_skill=cls.skills['python'], relation_type='essential'
+        )
+        OccupationToSkillRelation.objects.create(
+            occupation=cls.occupation, skill=cls.skills['python'], relation_type='essential', signalling_value=0.5
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.snapshot_dir = directory.name
+        settings = override_settings(TAXONOMY_SNAPSHOT_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Test classes share the empty database's version key
+        snapshot._loaded = None
+        self.addCleanup(setattr, snapshot, '_loaded', None)
+
+    def test_build_prunes_only_this_databases_snapshots(self):
+        directory = self.snapshot_dir
+        stale = snapshot.snapshot_path('old')
+        other_database = os.path.join(directory, 'taxonomy-0123456789ab-old.v2.snap')
+        for path in (stale, other_database):
+            open(path, 'wb').close()
+
+        path = snapshot.build_snapshot(prune=True)
+        self.assertEqual(sorted(os.listdir(directory)), sorted(os.path.basename(name) for name in (path, other_database)))
+        self.assertIsNotNone(snapshot.Snapshot(path).index_of('python'))
+
+    def mapping(self, skill_id):
+        response = self.client.get('/api/taxonomy/skill-mapping/', {'skill_id': skill_id})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_neighbourhood_from_snapshot(self):
+        self.assertEqual([node['id'] for node in self.mapping('django')['nodes']], ['django', 'python'])
+        data = self.mapping('python')
+        self.assertEqual([node['id'] for node in data['nodes']], ['python', 'developer'])
+        self.assertIn(
+            {'from': 'developer', 'to': 'python', 'label': 'essential',
+             'type': 'occupation_skill_relation', 'signalling_value': '0.50'},
+            data['edges']
+        )
+
+    def test_skill_added_after_snapshot_falls_back_to_database(self):
+        self.mapping('python')
+        # Added without a new import, so the loaded snapshot does not know it
+        rust = Skill.objects.create(id='rust', uuid_history='uuid-rust', preferred_label='rust')
+        OccupationToSkillRelation.objects.create(occupation=self.occupation, skill=rust, relation_type='optional')
+        SkillToSkillRelation.objects.create(
+            requiring_skill=rust, required_skill=self.skills['python'], relation_type='optional'
+        )
+        data = self.mapping('rust')
+        self.assertEqual(data['center_skill']['id'], 'rust')
+        self.assertEqual([(node['id'], node['group']) for node in data['nodes']], [
+            ('rust', 'central'), ('python', 'related_skill'), ('developer', 'related_occupation')
+        ])
+        self.assertEqual(len(data['edges']), 2)
+
+
+class SkillCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.skill = Skill.objects.create(id='python', uuid_history='uuid-python', preferred_label='python')
+        for index in range(4):
+            occupation = Occupation.objects.create(
+                id=f'occupation-{index}', uuid_history=f'uuid-occupation-{index}', occupation_group_code='1234',
+                code=f'1234.{index}', preferred_label=f'occupation {index}', occupation_type='escooccupation'
+            )
+            OccupationToSkillRelation.objects.create(
+                occupation=occupation, skill=cls.skill, relation_type='essential' if index % 2 else 'optional'
+            )
+
+    def counts(self):
+        self.skill.refresh_from_db()
+        return self.skill.occupation_count, self.skill.essential_count
+
+    def test_relation_writes_recount(self):
+        self.assertEqual(self.counts(), (4, 2))
+        OccupationToSkillRelation.objects.filter(relation_type='essential').delete()
+        self.assertEqual(self.counts(), (2, 0))
+        Occupation.objects.filter(pk='occupation-0').delete()
+        self.assertEqual(self.counts(), (1, 0))
+
+    def test_deferred_bulk_delete(self):
+        with deferred_skill_counts():
+            # A single DELETE instead of loading and signalling every row
+            with self.assertNumQueries(1):
+                OccupationToSkillRelation.objects.filter(relation_type='optional').delete()
+            Occupation.objects.filter(pk='occupation-1').delete()
+        self.assertEqual(self.counts(), (4, 2))
+        recount_skills()
+        self.assertEqual(self.counts(), (1, 1))
+
+        # The receivers are connected again
+        OccupationToSkillRelation.objects.all().delete()
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_clear_import_recounts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_csv(directory, 'skills.csv', [{'ID': 'python', 'UUIDHISTORY': 'uuid-python', 'PREFERREDLABEL': 'python'}])
+            write_csv(directory, 'occupations.csv', [
+                {'ID': f'occupation-{index}', 'UUIDHISTORY': f'uuid-{index}', 'CODE': f'1234.{index}'}
+                for index in range(3)
+            ])
+            write_csv(directory, 'occupation_to_skill_relations.csv', [
+                {'OCCUPATIONID': f'occupation-{index}', 'SKILLID': 'python', 'RELATIONTYPE': relation_type}
+                for index, relation_type in enumerate(['essential', 'optional', 'optional'])
+            ])
+            import_csv(directory, '--clear')
+        self.assertEqual(self.counts(), (3, 1))
+
+
+class ImportTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_round_trip(self):
+        write_taxonomy(self.directory)
+        output = import_csv(self.directory, '--clear')
+        self.assertIn("e.g. row 4: unknown skill 'unknown'", output)
+
+        self.assertEqual(Skill.objects.count(), 3)
+        self.assertEqual(OccupationToSkillRelation.objects.count(), 3)
+        python = Skill.objects.get(pk='python')
+        self.assertEqual((python.occupation_count, python.essential_count), (1, 1))
+        self.assertEqual(OccupationToSkillRelation.objects.get(skill='python').signalling_value, Decimal('0.8'))
+        self.assertEqual(list(SkillNeighbour.objects.filter(skill='python').values_list('neighbour', flat=True)), ['django'])
+        self.assertEqual(resolve(['Python 3']), {'Python 3': 'python'})
+        # The import leaves the per-process caches of the new version built
+        for name in ('skill extractor', 'fuzzy trigram indexes', 'autocomplete indexes'):
+            self.assertIn(f'Built {name} in', output)
+        for version in (extraction._extractor_version, fuzzy._indexes_version, autocomplete._indexes_version):
+            self.assertEqual(version, taxonomy_version())
+        self.assertEqual([match['skill_id'] for match in extraction.extract_skills('python 3')], ['python'])
+
+        # Exported files import back into the same rows
+        imported = stored_rows()
+        with tempfile.TemporaryDirectory() as exported:
+            for file_name in EXPORTS:
+                with open(os.path.join(exported, file_name), 'wb') as file:
+                    file.writelines(stream_export(file_name))
+            import_csv(exported, '--clear')
+        self.assertEqual(stored_rows(), imported)
+
+    def test_incremental_reimport(self):
+        write_taxonomy(self.directory)
+        import_csv(self.directory, '--clear')
+        unchanged = Skill.objects.get(pk='django').updated_at
+
+        write_taxonomy(self.directory, skills=[
+            {'ID': 'python', 'UUIDHISTORY': 'uuid-python', 'PREFERREDLABEL': 'Python'},
+            {'ID': 'django', 'UUIDHISTORY': 'uuid-django', 'PREFERREDLABEL': 'django'},
+            {'ID': 'rust', 'UUIDHISTORY': 'uuid-rust', 'PREFERREDLABEL': 'rust'},
+        ])
+        output = import_csv(self.directory, '--incremental')
+        self.assertIn('skills.csv: 1 inserted, 1 updated, 1 deleted, 1 unchanged', output)
+        self.assertIn('occupation_to_skill_relations.csv: 0 inserted, 0 updated, 0 deleted, 2 unchanged', output)
+
+        self.assertEqual(
+            dict(Skill.objects.values_list('id', 'preferred_label')),
+            {'python': 'Python', 'django': 'django', 'rust': 'rust'}
+        )
+        self.assertEqual(Skill.objects.get(pk='django').updated_at, unchanged)
+        # The stale skill's relations went with it, and derived tables follow the new rows
+        self.assertFalse(OccupationToSkillRelation.objects.filter(skill='welding').exists())
+        self.assertEqual(resolve(['python 3']), {})
+        self.assertEqual(resolve(['PYTHON']), {'PYTHON': 'python'})
+
+    def test_unknown_relation_type_is_skipped(self):
+        write_taxonomy(self.directory)
+        write_csv(self.directory, 'occupation_to_skill_relations.csv', [
+            {'OCCUPATIONID': 'developer', 'SKILLID': 'python', 'RELATIONTYPE': 'essential'},
+            {'OCCUPATIONID': 'developer', 'SKILLID': 'django', 'RELATIONTYPE': 'advanced'},
+        ])
+        output = import_csv(self.directory, '--clear')
+        self.assertIn("e.g. row 2: unknown relation type 'advanced'", output)
+        self.assertEqual(list(OccupationToSkillRelation.objects.values_list('skill', flat=True)), ['python'])
+        # The import still finishes: new generation and snapshot
+        self.assertIn('Built taxonomy snapshot', output)
+        self.assertTrue(taxonomy_version().endswith('-g1'))
+
+    def test_resume_skips_committed_rows(self):
+        write_taxonomy(self.directory)
+        source = DirectorySource(self.directory)
+        # An earlier run finished model_info.csv and committed the first skill
+        ImportCheckpoint.objects.create(
+            file_name='model_info.csv', source_signature=source.signature('model_info.csv'), completed=True
+        )
+        ImportCheckpoint.objects.create(
+            file_name='skills.csv', source_signature=source.signature('skills.csv'), rows_committed=1, batch_id=1
+        )
+        Skill.objects.create(id='python', uuid_history='uuid-python', preferred_label='python')
+
+        output = import_csv(self.directory, '--resume', '--batch-size', '1')
+        self.assertIn('Skipping model_info.csv - already imported', output)
+        self.assertIn('Resuming skills.csv after row 1...', output)
+        self.assertFalse(ModelInfo.objects.exists())
+        self.assertEqual(sorted(Skill.objects.values_list('id', flat=True)), ['django', 'python', 'welding'])
+        self.assertEqual(ImportCheckpoint.objects.get(file_name='skills.csv').batch_id, 3)
+
+        # A file that changed since its partial import is not resumed
+        ImportCheckpoint.objects.filter(file_name='skills.csv').update(completed=False)
+        write_csv(self.directory, 'skills.csv', [{'ID': 'rust', 'UUIDHISTORY': 'uuid-rust', 'PREFERREDLABEL': 'rust'}])
+        with self.assertRaisesMessage(CommandError, 'skills.csv changed since it was partially imported'):
+            import_csv(self.directory, '--resume')
+
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for skill_id, label, alt_labels, description in (
+            ('reporting', 'reporting', '', 'Presenting the results of data analysis'),
+            ('statistics', 'statistics', 'data analysis methods', ''),
+            ('data-analysis', 'data analysis', '', ''),
+            ('python', 'python', '', 'A programming language'),
+        ):
+            Skill.objects.create(
+                id=skill_id, uuid_history=f'uuid-{skill_id}', preferred_label=label,
+                alt_labels=alt_labels, description=description
+            )
+
+    def skill_ids(self, query):
+        response = self.client.get('/api/taxonomy/search/', {'q': query})
+        return [skill['id'] for skill in response.data['skills']]
+
+    def test_label_matches_rank_first(self):
+        self.assertEqual(self.skill_ids('data analysis'), ['data-analysis', 'statistics', 'reporting'])
+        # The last word matches as a prefix while the user types
+        self.assertEqual(self.skill_ids('Data anal')[0], 'data-analysis')
+        response = self.client.get('/api/taxonomy/skills/', {'search': 'analysis', 'fields': 'id'})
+        self.assertEqual([skill['id'] for skill in response.data['results']], ['data-analysis', 'statistics', 'reporting'])
+
+    def test_fuzzy_matches_top_up_results(self):
+        # Test classes share the empty database's version key
+        fuzzy._indexes_version = None
+        self.assertEqual(self.skill_ids('pyhton'), ['python'])
+        self.assertEqual(self.skill_ids('statistcs analysis')[0], 'statistics')
+        # Exact matches come first, without duplicates
+        self.assertEqual(self.skill_ids('reporting'), ['reporting'])
+        self.assertEqual(self.skill_ids('xyzzy'), [])
+
+    def test_migration_matches_repair_statements(self):
+        # The migration keeps a frozen copy of the DDL that repair_search_index reruns
+        migration = import_module('taxonomy.migrations.0005_search_index')
+        for table in SEARCH_TABLES:
+            self.assertEqual(
+                [statement.format(table=table) for statement in migration.SQLITE_CREATE[:-1]],
+                sqlite_index_sql(table)
+            )
+
+
+class LabelResolutionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for skill_id, label, alt_labels in (
+            ('cafe-management', 'Café management', 'coffee shop management|running a café'),
+            ('shop-management', 'shop management', 'coffee shop management'),
+            ('management', 'management', ''),
+        ):
+            Skill.objects.create(id=skill_id, uuid_history=f'uuid-{skill_id}', preferred_label=label, alt_labels=alt_labels)
+        Occupation.objects.create(
+            id='barista', uuid_history='uuid-barista', occupation_group_code='5120', code='5120.1',
+            preferred_label='barista', alt_labels='coffee maker\ncoffee brewer', occupation_type='escooccupation'
+        )
+        rebuild_labels()
+
+    def test_case_accent_and_punctuation_insensitive(self):
+        with self.assertNumQueries(1):
+            matches = resolve(['CAFE  Management!', 'Running a cafe', 'unknown skill', ''])
+        self.assertEqual(matches, {'CAFE  Management!': 'cafe-management', 'Running a cafe': 'cafe-management'})
+        self.assertEqual(resolve_occupations(['Coffee brewer']), {'Coffee brewer': 'barista'})
+
+    def test_shared_alt_label_resolves_to_lowest_id(self):
+        self.assertEqual(resolve(['coffee shop management']), {'coffee shop management': 'cafe-management'})
+        # A preferred label wins over another skill's alternative label
+        Skill.objects.filter(pk='cafe-management').update(alt_labels='management')
+        rebuild_labels()
+        self.assertEqual(resolve(['management']), {'management': 'management'})
+
+    def test_saving_a_skill_refreshes_its_labels(self):
+        skill = Skill.objects.get(pk='management')
+        skill.alt_labels = 'administration'
+        skill.save()
+        self.assertEqual(resolve(['Administration']), {'Administration': 'management'})
+
+
+class HierarchyTreeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        SkillGroup.objects.create(id='digital', uuid_history='uuid-digital', preferred_label='digital')
+        SkillGroup.objects.create(id='programming', uuid_history='uuid-programming', preferred_label='programming')
+        for skill_id in ('python', 'django'):
+            Skill.objects.create(id=skill_id, uuid_history=f'uuid-{skill_id}', preferred_label=skill_id)
+        for parent_type, parent_id, child_type, child_id in (
+            ('skillgroup', 'digital', 'skillgroup', 'programming'),
+            ('skillgroup', 'programming', 'skill', 'python'),
+            ('skill', 'python', 'skill', 'django'),
+        ):
+            SkillHierarchy.objects.create(
+                parent_object_type=parent_type, parent_id=parent_id, child_object_type=child_type, child_id=child_id
+            )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(TAXONOMY_SNAPSHOT_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Test classes share the empty database's version key
+        snapshot._loaded = None
+        self.addCleanup(setattr, snapshot, '_loaded', None)
+        _trees.clear()
+
+    def tree(self, **params):
+        response = self.client.get('/api/taxonomy/tree/', {'hierarchy': 'skill', **params})
+        return response, json.loads(response.content) if response.status_code == 200 else None
+
+    def depth_of(self, node):
+        return 1 + max((self.depth_of(child) for child in node.get('children', [])), default=0)
+
+    def test_depth_limits_levels(self):
+        _, full = self.tree()
+        self.assertEqual([root['id'] for root in full['roots']], ['digital'])
+        self.assertEqual(self.depth_of(full['roots'][0]), 4)
+
+        _, limited = self.tree(depth=2)
+        root = limited['roots'][0]
+        self.assertEqual(self.depth_of(root), 2)
+        # Leaves below the limit still report how many children they have
+        self.assertEqual(root['children'][0]['child_count'], 1)
+        self.assertNotIn('children', root['children'][0])
+
+        _, capped = self.tree(depth=1000)
+        self.assertEqual(capped['depth'], MAX_TREE_DEPTH)
+
+    def test_invalid_depth(self):
+        for depth in ('0', '-1', 'deep', ''):
+            response, _ = self.tree(depth=depth)
+            self.assertEqual(response.status_code, 400, depth)
+
+    def test_etag_revalidation(self):
+        response, _ = self.tree(depth=2)
+        cached = self.client.get(
+            '/api/taxonomy/tree/', {'hierarchy': 'skill', 'depth': 2}, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(cached.status_code, 304)
+        self.assertNotEqual(self.tree()[0]['ETag'], response['ETag'])
+        for response in (response, cached):
+            self.assertEqual(response['Cache-Control'], 'public, max-age=300, stale-while-revalidate=3600')
+
+    def test_gzip_negotiation(self):
+        for accept_encoding, gzipped in (
+            ('gzip, deflate, br', True),
+            ('br;q=1.0, GZIP;q=0.5', True),
+            ('*', True),
+            ('gzip;q=0', False),
+            ('gzip; q=0.000, *', False),
+            ('*;q=0', False),
+            ('identity', False),
+            ('', False),
+        ):
+            response = self.client.get('/api/taxonomy/tree/', {'hierarchy': 'skill'}, HTTP_ACCEPT_ENCODING=accept_encoding)
+            self.assertEqual(response.get('Content-Encoding') == 'gzip', gzipped, accept_encoding)
+            body = gzip.decompress(response.content) if gzipped else response.content
+            self.assertEqual(json.loads(body)['roots'][0]['id'], 'digital')
+
+
+class ParallelImportTests(TransactionTestCase):
+    """import_csv --workers, whose writer threads need committed data"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        write_taxonomy(self.directory)
+        # A deadlocked pool fails the test instead of hanging the run
+        handler = signal.signal(signal.SIGALRM, lambda *args: self.fail('import_csv --workers hung'))
+        self.addCleanup(signal.signal, signal.SIGALRM, handler)
+        signal.alarm(60)
+        self.addCleanup(signal.alarm, 0)
+
+    def test_matches_sequential_import(self):
+        import_csv(self.directory, '--clear')
+        sequential = stored_rows()
+        # One-row batches fill the bounded parse queues
+        import_csv(self.directory, '--clear', '--workers', '2', '--batch-size', '1')
+        self.assertEqual(stored_rows(), sequential)
+        self.assertEqual(Skill.objects.get(pk='python').occupation_count, 1)
+
+    def test_malformed_file_fails_cleanly(self):
+        with open(os.path.join(self.directory, 'skills.csv'), 'wb') as file:
+            file.write(b'ID,PREFERREDLABEL\npython,\xff\xfe\n')
+        with self.assertRaisesMessage(CommandError, 'Could not parse skills.csv'):
+            import_csv(self.directory, '--clear', '--workers', '2', '--batch-size', '1')
+        self.assertFalse(ImportCheckpoint.objects.filter(file_name='skills.csv', completed=True).exists())
+
+        # The pool and its queues were torn down: the next import runs normally
+        write_taxonomy(self.directory)
+        import_csv(self.directory, '--clear', '--workers', '2')
+        self.assertEqual(Skill.objects.count(), 3)
+
+
+class BenchmarkTests(TransactionTestCase):
+    """generate_taxonomy and benchmark_taxonomy on a tiny bundle"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.bundle = os.path.join(self.directory, 'bundle')
+        call_command(
+            'generate_taxonomy', self.bundle, skills=40, occupations=10,
+            skills_per_occupation=5, seed=7, stdout=io.StringIO()
+        )
+
+    def test_generated_bundle_imports(self):
+        self.assertEqual(sorted(os.listdir(self.bundle)), sorted(CSV_COLUMNS))
+        import_csv(self.bundle, '--clear')
+        self.assertEqual(Skill.objects.count(), 40)
+        self.assertEqual(Occupation.objects.count(), 10)
+        self.assertTrue(OccupationToSkillRelation.objects.exists())
+
+    def test_writes_json_results(self):
+        output = os.path.join(self.directory, 'results.json')
+        with override_settings(TAXONOMY_SNAPSHOT_DIR=self.directory):
+            call_command('benchmark_taxonomy', self.bundle, repeat=1, output=output, stdout=io.StringIO())
+        with open(output, encoding='utf-8') as file:
+            results = json.load(file)
+        self.assertEqual(results['source'], os.path.abspath(self.bundle))
+        self.assertEqual(set(results['import']), {'full', 'incremental_unchanged'})
+        self.assertEqual(results['import']['full']['stages']['skills.csv']['rows'], 40)
+        self.assertEqual(
+            {name: endpoint['status'] for name, endpoint in results['endpoints'].items()},
+            {name: 200 for name, _ in ENDPOINTS}
+        )
+
+    def test_reports_baseline_regressions(self):
+        # Under the test runner every benchmark shares the test database,
+        # so a single run is compared against a hand-written baseline
+        baseline = os.path.join(self.directory, 'baseline.json')
+        with open(baseline, 'w', encoding='utf-8') as file:
+            json.dump({
+                'import': {'full': {'elapsed_seconds': 0.000001}},
+                'endpoints': {'stats': {'median_ms': 1000000}},
+            }, file)
+        stdout = io.StringIO()
+        with override_settings(TAXONOMY_SNAPSHOT_DIR=self.directory):
+            with self.assertRaisesMessage(CommandError, '1 benchmark(s) regressed by more than 20%: import.full'):
+                call_command('benchmark_taxonomy', self.bundle, repeat=1, baseline=baseline, stdout=stdout)
+        self.assertIn('endpoints.stats: 1000000 ->', stdout.getvalue())
+
+
+class ArchiveImportTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.bundle = os.path.join(self.directory, 'bundle')
+        os.mkdir(self.bundle)
+        write_taxonomy(self.bundle)
+        import_csv(self.bundle, '--clear')
+        self.expected = stored_rows()
+
+    def test_zip_with_wrapping_folder(self):
+        path = os.path.join(self.directory, 'taxonomy.zip')
+        with zipfile.ZipFile(path, 'w') as archive:
+            for file_name in CSV_COLUMNS:
+                archive.write(os.path.join(self.bundle, file_name), f'release-v1/{file_name}')
+        self.assertEqual(open_source(path).members()['skills.csv'][0], 'release-v1/skills.csv')
+
+        import_csv(path, '--clear')
+        self.assertEqual(stored_rows(), self.expected)
+
+    def test_tar_gz(self):
+        path = os.path.join(self.directory, 'taxonomy.tar.gz')
+        with tarfile.open(path, 'w:gz') as archive:
+            for file_name in CSV_COLUMNS:
+                archive.add(os.path.join(self.bundle, file_name), file_name)
+
+        import_csv(path, '--clear')
+        self.assertEqual(stored_rows(), self.expected)
+        # An unchanged archive keeps its signatures, so --resume skips its completed files
+        output = import_csv(path, '--resume')
+        self.assertIn('Skipping skills.csv - already imported', output)
+
+    def test_member_close_closes_archive(self):
+        path = os.path.join(self.directory, 'taxonomy.zip')
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.write(os.path.join(self.bundle, 'skills.csv'), 'skills.csv')
+        source = ArchiveSource(path)
+        signature = source.signature('skills.csv')
+        member = source.open('skills.csv')
+        self.assertTrue(member.read().startswith(b'ID,'))
+        member.close()
+        self.assertIsNone(member.archive.fp)
+
+        # Rewriting the archive changes the signature used by --resume and --incremental
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.writestr('skills.csv', 'ID\nrust\n')
+        self.assertNotEqual(ArchiveSource(path).signature('skills.csv'), signature)
+
+    def test_not_an_archive(self):
+        path = os.path.join(self.directory, 'skills.csv')
+        with open(path, 'w') as file:
+            file.write('ID\npython\n')
+        with self.assertRaisesMessage(ValueError, 'neither a directory nor a zip/tar archive'):
+            open_source(path)
+        with self.assertRaisesMessage(CommandError, 'neither a directory nor a zip/tar archive'):
+            import_csv(path)
+
+
+class AutocompleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for skill_id, label, alt_labels, occupation_count in (
+            ('programming-python', 'programming in python', '', 0),
+            ('pytorch', 'PyTorch', '', 1),
+            ('python', 'Python', '', 3),
+            ('scripting', 'scripting', 'py scripting', 5),
+        ):
+            Skill.objects.create(
+                id=skill_id, uuid_history=f'uuid-{skill_id}', preferred_label=label,
+                alt_labels=alt_labels, occupation_count=occupation_count
+            )
+        Occupation.objects.create(
+            id='python-developer', uuid_history='uuid-python-developer', occupation_group_code='2512',
+            code='2512.1', preferred_label='Python developer', occupation_type='escooccupation'
+        )
+
+    def setUp(self):
+        # Test classes share the empty database's version key
+        autocomplete._indexes_version = None
+
+    def suggestions(self, **params):
+        response = self.client.get('/api/taxonomy/autocomplete/', params)
+        self.assertEqual(response.status_code, 200)
+        return [(suggestion['type'], suggestion['id']) for suggestion in response.data]
+
+    def test_ranking(self):
+        # Preferred labels by relation count, then alternative labels, then later words
+        self.assertEqual([entity_id for _, entity_id in self.suggestions(q='py', type='skill')], [
+            'python', 'pytorch', 'scripting', 'programming-python'
+        ])
+        # Longer prefixes are ranked per request the same way
+        self.assertEqual(self.suggestions(q='Pyth'), [
+            ('skill', 'python'), ('occupation', 'python-developer'), ('skill', 'programming-python')
+        ])
+        self.assertEqual(self.suggestions(q='py', limit=2), [('skill', 'python'), ('skill', 'pytorch')])
+        self.assertEqual(self.suggestions(q='  '), [])
+
+    def test_alt_labels_split_on_pipes_and_newlines(self):
+        self.assertEqual(split_alt_labels('py scripting|python scripts\n  snake code \n\n'), [
+            'py scripting', 'python scripts', 'snake code'
+        ])
+        self.assertEqual(split_alt_labels(''), [])
+        Skill.objects.filter(pk='scripting').update(alt_labels='py scripting\nshell scripting')
+        response = self.client.get('/api/taxonomy/skills/scripting/', {'fields': 'alt_labels_list'})
+        self.assertEqual(response.data, {'alt_labels_list': ['py scripting', 'shell scripting']})
+
+    def test_invalid_parameters(self):
+        for params in ({'q': 'py', 'limit': 'many'}, {'q': 'py', 'type': 'group'}):
+            response = self.client.get('/api/taxonomy/autocomplete/', params)
+            self.assertEqual(response.status_code, 400, params)
+        self.assertEqual(len(self.suggestions(q='p', limit=1000)), 5)
+
+    def test_index_follows_taxonomy_version(self):
+        self.suggestions(q='pyr')
+        Skill.objects.create(id='pyramid', uuid_history='uuid-pyramid', preferred_label='pyramid selling')
+        # The index of the current version is cached per process
+        self.assertEqual(self.suggestions(q='pyr'), [])
+        bump_generation()
+        self.assertEqual(self.suggestions(q='pyr'), [('skill', 'pyramid')])
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Skill.objects.create(id='python', uuid_history='uuid-python', preferred_label='python', alt_labels='py\npython 3')
+        Skill.objects.create(id='welding', uuid_history='uuid-welding', preferred_label='welding, "arc"')
+        cls.user = User.objects.create_user('exporter', password='secret')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_command_writes_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = io.StringIO()
+            call_command('export_taxonomy', directory, '--files', 'skills.csv', stdout=output)
+            call_command('export_taxonomy', directory, '--format', 'ndjson', '--gzip', '--files', 'skills.csv', stdout=output)
+            self.assertEqual(sorted(os.listdir(directory)), ['skills.csv', 'skills.ndjson.gz'])
+            self.assertIn('Exported 1 file(s)', output.getvalue())
+
+            with open(os.path.join(directory, 'skills.csv'), encoding='utf-8', newline='') as file:
+                rows = list(csv.DictReader(file))
+            self.assertEqual(list(rows[0]), CSV_COLUMNS['skills.csv'])
+            self.assertEqual(
+                [(row['ID'], row['PREFERREDLABEL'], row['ALTLABELS']) for row in rows],
+                [('python', 'python', 'py\npython 3'), ('welding', 'welding, "arc"', '')]
+            )
+            with gzip.open(os.path.join(directory, 'skills.ndjson.gz'), 'rt', encoding='utf-8') as file:
+                records = [json.loads(line) for line in file]
+            self.assertEqual([record['ID'] for record in records], ['python', 'welding'])
+
+        with self.assertRaisesMessage(CommandError, 'Unknown export file(s): skills.txt'):
+            call_command('export_taxonomy', 'unused', '--files', 'skills.txt')
+
+    def test_endpoint(self):
+        url = '/api/taxonomy/export/skills.csv/'
+        self.assertIn(self.client.get(url).status_code, (401, 403))
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="skills.csv"')
+        plain = b''.join(response.streaming_content)
+        self.assertTrue(plain.startswith(b'"ID","ORIGINURI","UUIDHISTORY"'))
+
+        response = self.client.get('/api/taxonomy/export/skills.csv.gz/')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+
+        response = self.client.get('/api/taxonomy/export/skills.ndjson/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+
+        response = self.client.get('/api/taxonomy/export/passwords.csv/')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('skills.csv', response.data['available'])
+
+
+class SkillExtractionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for skill_id, label, alt_labels in (
+            ('management', 'management', ''),
+            ('project-management', 'project management', 'managing projects'),
+            ('python', 'Python', ''),
+            ('go', 'go', ''),
+        ):
+            Skill.objects.create(id=skill_id, uuid_history=f'uuid-{skill_id}', preferred_label=label, alt_labels=alt_labels)
+        cls.user = User.objects.create_user('reader', password='secret')
+
+    def setUp(self):
+        self.client = APIClient()
+        # Test classes share the empty database's version key
+        extraction._extractor_version = None
+
+    def test_longest_match_wins(self):
+        matches = extraction.extract_skills('Project management in PYTHON; go-live')
+        self.assertEqual(
+            [(match['skill_id'], match['text'], match['start']) for match in matches],
+            [('project-management', 'Project management', 0), ('python', 'PYTHON', 22)]
+        )
+        overlapping = extraction.extract_skills('project management', overlapping=True)
+        self.assertEqual({match['skill_id'] for match in overlapping}, {'project-management', 'management'})
+
+    def test_alternative_labels(self):
+        matches = extraction.extract_skills('Experience managing projects.')
+        self.assertEqual([(match['skill_id'], match['label']) for match in matches], [('project-management', 'project management')])
+
+    def test_endpoint_requires_authentication_and_limits(self):
+        url = '/api/taxonomy/extract/'
+        self.assertIn(self.client.post(url, {'text': 'python'}, format='json').status_code, (401, 403))
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(url, {'texts': ['python', 'management']}, format='json')
+        self.assertEqual([[match['skill_id'] for match in matches] for matches in response.data['results']],
+                         [['python'], ['management']])
+        self.assertEqual(self.client.post(url, {'texts': ['python'] * 51}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'text': 'x' * 20001}, format='json').status_code, 400)
@@ -0,0 +1,26 @@
+"""
+Helpers for matching user input against taxonomy labels.
+"""
+import re
+import unicodedata
+
+
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def normalize_label(text):
+    """Case-fold, strip accents and punctuation, and collapse whitespace"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _NON_WORD.sub(' ', text.casefold()).strip()
+
+
+def split_alt_labels(value):
+    """Split an alt_labels value into labels.
+
+    The models document alt labels as pipe-separated, while Tabiya releases
+    separate them with newlines; both are accepted.
+    """
+    if not value:
+        return []
+    return [label.strip() for label in re.split(r'[|\n]', value) if label.strip()]
@@ -0,0 +1,91 @@
+"""
+Nested skill and occupation browse trees, pre-serialized per taxonomy version.
+
+Trees are built from the hierarchy CSR arrays of the snapshot, serialized to
+JSON and gzip-compressed once per worker, taxonomy version and depth. The
+tree endpoint then only writes cached bytes.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from .snapshot import get_snapshot
+
+
+MAX_DEPTH = 10
+
+# hierarchy name: (children graph, parents graph, node kinds in the hierarchy)
+TREES = {
+    'skill': ('skill_children', 'skill_parents', ('skill_group', 'skill')),
+    'occupation': ('occupation_children', 'occupation_parents', ('occupation_group', 'occupation')),
+}
+
+
+class SerializedTree:
+    """A tree as JSON bytes, gzip bytes and a strong ETag for each encoding"""
+
+    def __init__(self, tree):
+        self.body = json.dumps(tree, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.gzipped = gzip.compress(self.body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+
+def build_tree(hierarchy, depth=None, snapshot=None):
+    """Return the roots of a hierarchy as nested dicts with id, label, type and children.
+
+    A node with several parents appears under each of them. Below `depth`
+    levels, children are left out and only counted in `child_count`.
+    """
+    snapshot = snapshot or get_snapshot()
+    children_graph, parents_graph, kinds = TREES[hierarchy]
+
+    def subtree(node, level, path):
+        children, _, _ = snapshot.neighbours(children_graph, node)
+        data = {
+            'id': snapshot.node_id(node),
+            'label': snapshot.label(node),
+            'type': snapshot.kind(node),
+            'child_count': len(children),
+        }
+        if depth is None or level < depth:
+            path.add(node)
+            data['children'] = sorted(
+                (subtree(child, level + 1, path) for child in children if child not in path),
+                key=lambda child: child['label']
+            )
+            path.discard(node)
+        return data
+
+    roots = [
+        node for kind in kinds for node in snapshot.nodes(kind)
+        if snapshot.degree(parents_graph, node) == 0 and snapshot.degree(children_graph, node) > 0
+    ]
+    return sorted((subtree(root, 1, set()) for root in roots), key=lambda root: root['label'])
+
+
+_lock = threading.Lock()
+_trees = {}
+
+
+def get_tree(hierarchy, depth=None):
+    """Return the SerializedTree of a hierarchy for the current taxonomy version"""
+    snapshot = get_snapshot()
+    key = (snapshot.version, hierarchy, depth)
+    tree = _trees.get(key)
+    if tree is None:
+        with _lock:
+            tree = _trees.get(key)
+            if tree is None:
+                tree = SerializedTree({
+                    'hierarchy': hierarchy,
+                    'depth': depth,
+                    'version': snapshot.version,
+                    'roots': build_tree(hierarchy, depth, snapshot),
+                })
+                # Trees of older versions are no longer served
+                for stale in [stale for stale in _trees if stale[0] != snapshot.version]:
+                    del _trees[stale]
+                _trees[key] = tree
+    return tree
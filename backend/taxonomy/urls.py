@@ -1,36 +1,55 @@
 from django.urls import path
 from . import views
+from .caching import conditional
 
 app_name = 'taxonomy'
 
+# Read endpoints answer conditional requests from the taxonomy version (see caching.py)
 urlpatterns = [
     # Model Info
-    path('model-info/', views.ModelInfoListView.as_view(), name='model-info-list'),
+    path('model-info/', conditional(views.ModelInfoListView.as_view()), name='model-info-list'),
     
     # Skills
-    path('skills/', views.SkillListView.as_view(), name='skill-list'),
-    path('skills/<str:pk>/', views.SkillDetailView.as_view(), name='skill-detail'),
-    path('skill-groups/', views.SkillGroupListView.as_view(), name='skill-group-list'),
-    path('skill-groups/<str:pk>/', views.SkillGroupDetailView.as_view(), name='skill-group-detail'),
+    path('skills/', conditional(views.SkillListView.as_view()), name='skill-list'),
+    path('skills/batch/', views.batch_lookup, {'kind': 'skill'}, name='skill-batch'),
+    path('skills/<str:pk>/', conditional(views.SkillDetailView.as_view()), name='skill-detail'),
+    path('skill-groups/', conditional(views.SkillGroupListView.as_view()), name='skill-group-list'),
+    path('skill-groups/<str:pk>/', conditional(views.SkillGroupDetailView.as_view()), name='skill-group-detail'),
     
     # Occupations
-    path('occupations/', views.OccupationListView.as_view(), name='occupation-list'),
-    path('occupations/<str:pk>/', views.OccupationDetailView.as_view(), name='occupation-detail'),
-    path('occupation-groups/', views.OccupationGroupListView.as_view(), name='occupation-group-list'),
-    path('occupation-groups/<str:pk>/', views.OccupationGroupDetailView.as_view(), name='occupation-group-detail'),
+    path('occupations/', conditional(views.OccupationListView.as_view()), name='occupation-list'),
+    path('occupations/batch/', views.batch_lookup, {'kind': 'occupation'}, name='occupation-batch'),
+    path('occupations/<str:pk>/', conditional(views.OccupationDetailView.as_view()), name='occupation-detail'),
+    path('occupation-groups/', conditional(views.OccupationGroupListView.as_view()), name='occupation-group-list'),
+    path('occupation-groups/<str:pk>/', conditional(views.OccupationGroupDetailView.as_view()), name='occupation-group-detail'),
     
     # Relations
-    path('skill-relations/', views.SkillToSkillRelationListView.as_view(), name='skill-relation-list'),
-    path('occupation-skill-relations/', views.OccupationToSkillRelationListView.as_view(), name='occupation-skill-relation-list'),
+    path('skill-relations/', conditional(views.SkillToSkillRelationListView.as_view()), name='skill-relation-list'),
+    path('occupation-skill-relations/', conditional(views.OccupationToSkillRelationListView.as_view()), name='occupation-skill-relation-list'),
     
     # Hierarchies
-    path('skill-hierarchy/', views.SkillHierarchyListView.as_view(), name='skill-hierarchy-list'),
-    path('occupation-hierarchy/', views.OccupationHierarchyListView.as_view(), name='occupation-hierarchy-list'),
+    path('skill-hierarchy/', conditional(views.SkillHierarchyListView.as_view()), name='skill-hierarchy-list'),
+    path('occupation-hierarchy/', conditional(views.OccupationHierarchyListView.as_view()), name='occupation-hierarchy-list'),
+    path('tree/', views.hierarchy_tree, name='hierarchy-tree'),
+    path('skill-hierarchy/<str:node_id>/ancestors/', conditional(views.hierarchy_ancestors),
+         {'hierarchy': 'skill'}, name='skill-ancestors'),
+    path('skill-hierarchy/<str:node_id>/descendants/', conditional(views.hierarchy_descendants),
+         {'hierarchy': 'skill'}, name='skill-descendants'),
+    path('occupation-hierarchy/<str:node_id>/ancestors/', conditional(views.hierarchy_ancestors),
+         {'hierarchy': 'occupation'}, name='occupation-ancestors'),
+    path('occupation-hierarchy/<str:node_id>/descendants/', conditional(views.hierarchy_descendants),
+         {'hierarchy': 'occupation'}, name='occupation-descendants'),
     
     # Search and Mapping
-    path('search/', views.search_view, name='search'),
-    path('skill-mapping/', views.skill_mapping_data, name='skill-mapping'),
-    path('stats/', views.taxonomy_stats, name='taxonomy-stats'),
-    path('popular-skills/', views.popular_skills, name='popular-skills'),
-    path('skill-suggestions/', views.skill_suggestions, name='skill-suggestions'),
+    path('search/', conditional(views.search_view), name='search'),
+    path('autocomplete/', conditional(views.autocomplete), name='autocomplete'),
+    path('extract/', views.extract_skills_view, name='extract-skills'),
+    path('skill-mapping/', conditional(views.skill_mapping_data), name='skill-mapping'),
+    path('stats/', conditional(views.taxonomy_stats), name='taxonomy-stats'),
+    path('popular-skills/', conditional(views.popular_skills), name='popular-skills'),
+    path('skill-suggestions/', conditional(views.skill_suggestions), name='skill-suggestions'),
+    path('similar-occupations/', conditional(views.similar_occupations), name='similar-occupations'),
+
+    # Export
+    path('export/<str:file_name>/', views.export_taxonomy, name='export'),
 ]
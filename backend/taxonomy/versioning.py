@@ -0,0 +1,77 @@
+"""
+Version key of the imported taxonomy, used to key derived data (snapshots,
+caches, indexes) and HTTP ETags so that they change whenever data is imported.
+"""
+import time
+from django.db.models import F, Subquery
+from django.utils import timezone
+from .models import ModelInfo, TaxonomyGeneration
+
+
+# Seconds a process reuses the version it read from the database
+VERSION_TTL = 5.0
+
+_cached_version = None
+_cached_last_modified = None
+_cached_until = 0.0
+
+
+def _read_version():
+    """Return (version key, last modification time) from a single query"""
+    latest = ModelInfo.objects.order_by('-updated_at')
+    row = TaxonomyGeneration.objects.filter(pk=1).annotate(
+        model_version=Subquery(latest.values('version')[:1]),
+        model_updated_at=Subquery(latest.values('updated_at')[:1]),
+    ).values_list('generation', 'changed_at', 'model_version', 'model_updated_at').first()
+    if row is None:
+        generation, changed_at = 0, None
+        version, updated_at = latest.values_list('version', 'updated_at').first() or (None, None)
+    else:
+        generation, changed_at, version, updated_at = row
+
+    if updated_at is None:
+        key = f'empty-g{generation}'
+    else:
+        key = f'{version or "unversioned"}-{updated_at.strftime("%Y%m%d%H%M%S%f")}-g{generation}'
+    return key, max(filter(None, (changed_at, updated_at)), default=None)
+
+
+def _refresh():
+    global _cached_version, _cached_last_modified, _cached_until
+    now = time.monotonic()
+    if _cached_version is None or now >= _cached_until:
+        _cached_version, _cached_last_modified = _read_version()
+        _cached_until = now + VERSION_TTL
+
+
+def taxonomy_version():
+    """Return the version key of the imported taxonomy.
+
+    The key combines the latest ModelInfo row with the import generation.
+    import_csv bumps the generation on every run, so the key changes even
+    when an incremental import leaves ModelInfo untouched.
+    """
+    _refresh()
+    return _cached_version
+
+
+def taxonomy_last_modified():
+    """Return when the taxonomy last changed, or None before the first import"""
+    _refresh()
+    return _cached_last_modified
+
+
+def bump_generation():
+    """Start a new import generation, invalidating every version-keyed cache"""
+    updated = TaxonomyGeneration.objects.filter(pk=1).update(
+        generation=F('generation') + 1, changed_at=timezone.now()
+    )
+    if not updated:
+        TaxonomyGeneration.objects.create(pk=1, generation=1)
+    clear_version_cache()
+
+
+def clear_version_cache():
+    """Forget the cached version, e.g. right after an import"""
+    global _cached_version
+    _cached_version = None
@@ -4,7 +4,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.db.models import Q, Count
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 import csv
 import io
 
@@ -19,8 +19,35 @@ from .serializers import (
     SkillToSkillRelationSerializer, OccupationToSkillRelationSerializer,
     SkillHierarchySerializer, OccupationHierarchySerializer,
     SkillSearchSerializer, OccupationSearchSerializer,
-    SkillMappingSerializer, TaxonomyStatsSerializer
+    SkillMappingSerializer, TaxonomyStatsSerializer,
+    field_tree, requested_fields, skill_prefetches, occupation_prefetches
 )
+from .export import EXPORTS, stream_export
+from .search import search as search_taxonomy
+from .autocomplete import autocomplete as autocomplete_labels
+from .fuzzy import with_fuzzy_matches
+from .extraction import extract_skills
+from .caching import accepts_gzip, cache_publicly
+from .pagination import TaxonomyPagination
+from .cooccurrence import NEIGHBOURS_PER_SKILL, suggest
+from .graph import DEFAULT_MAX_NODES, database_neighbourhood, neighbourhood
+from .closure import ancestors, descendants
+from .tree import MAX_DEPTH as MAX_TREE_DEPTH, TREES, get_tree
+from . import similarity
+
+
+# Most IDs a batch lookup accepts
+MAX_BATCH_IDS = 500
+
+# Limits of one skill extraction request
+MAX_EXTRACT_TEXTS = 50
+MAX_EXTRACT_TEXT_LENGTH = 20000
+
+# kind: (model, serializer, prefetches)
+BATCH_LOOKUPS = {
+    'skill': (Skill, SkillSerializer, skill_prefetches),
+    'occupation': (Occupation, OccupationSerializer, occupation_prefetches),
+}
 
 
 # Model Info Views
@@ -35,27 +62,26 @@ class SkillListView(generics.ListAPIView):
     queryset = Skill.objects.all()
     serializer_class = SkillSerializer
     permission_classes = [AllowAny]
+    pagination_class = TaxonomyPagination
+    keyset_ordering = ('preferred_label', 'id')
 
     def get_queryset(self):
-        queryset = Skill.objects.all()
+        fields = requested_fields(field_tree(self.request))
+        queryset = Skill.objects.prefetch_related(*skill_prefetches(fields=fields))
         search = self.request.query_params.get('search', None)
         skill_type = self.request.query_params.get('skill_type', None)
         reuse_level = self.request.query_params.get('reuse_level', None)
 
-        if search:
-            queryset = queryset.filter(
-                Q(preferred_label__icontains=search) |
-                Q(description__icontains=search) |
-                Q(alt_labels__icontains=search)
-            )
-        
         if skill_type:
             queryset = queryset.filter(skill_type=skill_type)
         
         if reuse_level:
             queryset = queryset.filter(reuse_level=reuse_level)
 
-        return queryset.order_by('preferred_label')
+        if search:
+            return search_taxonomy(queryset, search)
+
+        return queryset.order_by(*self.keyset_ordering)
 
 
 class SkillDetailView(generics.RetrieveAPIView):
@@ -63,6 +89,10 @@ class SkillDetailView(generics.RetrieveAPIView):
     serializer_class = SkillSerializer
     permission_classes = [AllowAny]
 
+    def get_queryset(self):
+        fields = requested_fields(field_tree(self.request))
+        return Skill.objects.prefetch_related(*skill_prefetches(fields=fields))
+
 
 class SkillGroupListView(generics.ListAPIView):
     queryset = SkillGroup.objects.all()
@@ -94,23 +124,22 @@ class OccupationListView(generics.ListAPIView):
     queryset = Occupation.objects.all()
     serializer_class = OccupationSerializer
     permission_classes = [AllowAny]
+    pagination_class = TaxonomyPagination
+    keyset_ordering = ('preferred_label', 'id')
 
     def get_queryset(self):
-        queryset = Occupation.objects.all()
+        fields = requested_fields(field_tree(self.request))
+        queryset = Occupation.objects.prefetch_related(*occupation_prefetches(fields=fields))
         search = self.request.query_params.get('search', None)
         occupation_type = self.request.query_params.get('occupation_type', None)
 
-        if search:
-            queryset = queryset.filter(
-                Q(preferred_label__icontains=search) |
-                Q(description__icontains=search) |
-                Q(alt_labels__icontains=search)
-            )
-        
         if occupation_type:
             queryset = queryset.filter(occupation_type=occupation_type)
 
-        return queryset.order_by('preferred_label')
+        if search:
+            return search_taxonomy(queryset, search)
+
+        return queryset.order_by(*self.keyset_ordering)
 
 
 class OccupationDetailView(generics.RetrieveAPIView):
@@ -118,6 +147,10 @@ class OccupationDetailView(generics.RetrieveAPIView):
     serializer_class = OccupationSerializer
     permission_classes = [AllowAny]
 
+    def get_queryset(self):
+        fields = requested_fields(field_tree(self.request))
+        return Occupation.objects.prefetch_related(*occupation_prefetches(fields=fields))
+
 
 class OccupationGroupListView(generics.ListAPIView):
     queryset = OccupationGroup.objects.all()
@@ -150,28 +183,36 @@ class OccupationGroupDetailView(generics.RetrieveAPIView):
 
 # Relation Views
 class SkillToSkillRelationListView(generics.ListAPIView):
-    queryset = SkillToSkillRelation.objects.all()
+    queryset = SkillToSkillRelation.objects.select_related('requiring_skill', 'required_skill').order_by('id')
     serializer_class = SkillToSkillRelationSerializer
     permission_classes = [AllowAny]
+    pagination_class = TaxonomyPagination
+    keyset_ordering = ('id',)
 
 
 class OccupationToSkillRelationListView(generics.ListAPIView):
-    queryset = OccupationToSkillRelation.objects.all()
+    queryset = OccupationToSkillRelation.objects.select_related('occupation', 'skill').order_by('id')
     serializer_class = OccupationToSkillRelationSerializer
     permission_classes = [AllowAny]
+    pagination_class = TaxonomyPagination
+    keyset_ordering = ('id',)
 
 
 # Hierarchy Views
 class SkillHierarchyListView(generics.ListAPIView):
-    queryset = SkillHierarchy.objects.all()
+    queryset = SkillHierarchy.objects.order_by('id')
     serializer_class = SkillHierarchySerializer
     permission_classes = [AllowAny]
+    pagination_class = TaxonomyPagination
+    keyset_ordering = ('id',)
 
 
 class OccupationHierarchyListView(generics.ListAPIView):
-    queryset = OccupationHierarchy.objects.all()
+    queryset = OccupationHierarchy.objects.order_by('id')
     serializer_class = OccupationHierarchySerializer
     permission_classes = [AllowAny]
+    pagination_class = TaxonomyPagination
+    keyset_ordering = ('id',)
 
 
 # Search Views
@@ -185,100 +226,79 @@ def search_view(request):
     if not query:
         return Response({'error': 'Search query is required'}, status=400)
 
-    # Search skills
-    skills = Skill.objects.filter(
-        Q(preferred_label__icontains=query) |
-        Q(description__icontains=query) |
-        Q(alt_labels__icontains=query)
-    )[:10]
+    # Search skills, topped up with typo-tolerant matches
+    skills = with_fuzzy_matches(search_taxonomy(Skill.objects.all(), query)[:10], query, 'skill')
 
     # Search occupations
-    occupations = Occupation.objects.filter(
-        Q(preferred_label__icontains=query) |
-        Q(description__icontains=query) |
-        Q(alt_labels__icontains=query)
-    )[:10]
+    occupations = with_fuzzy_matches(
+        search_taxonomy(Occupation.objects.all(), query)[:10], query, 'occupation'
+    )
 
     return Response({
-        'skills': SkillSearchSerializer(skills, many=True).data,
-        'occupations': OccupationSearchSerializer(occupations, many=True).data
+        'skills': SkillSearchSerializer(skills, many=True, context={'request': request}).data,
+        'occupations': OccupationSearchSerializer(occupations, many=True, context={'request': request}).data
     })
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def autocomplete(request):
+    """
+    Prefix suggestions for skill and occupation pickers, most popular first
+    """
+    query = request.GET.get('q', '').strip()
+    entity_type = request.GET.get('type') or None
+    if entity_type not in (None, 'skill', 'occupation'):
+        return Response({'error': 'type must be skill or occupation'}, status=400)
+    try:
+        limit = int(request.GET.get('limit', 10))
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=400)
+    if not query:
+        return Response([])
+
+    return Response(autocomplete_labels(query, entity_type, limit))
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def skill_mapping_data(request):
     """
-    Returns data for the skill mapping visualization
+    Returns data for the skill mapping visualization: the neighbourhood of a
+    skill up to `depth` hops (max 3), bounded by `max_nodes` and optionally
+    pruned to occupation links with a signalling value of at least
+    `min_signalling`
     """
     skill_id = request.GET.get('skill_id')
     if not skill_id:
         return Response({'error': 'skill_id is required'}, status=400)
-
     try:
-        skill = Skill.objects.get(id=skill_id)
-    except Skill.DoesNotExist:
+        depth = int(request.GET.get('depth', 1))
+        max_nodes = int(request.GET.get('max_nodes', DEFAULT_MAX_NODES))
+        min_signalling = request.GET.get('min_signalling')
+        min_signalling = float(min_signalling) if min_signalling else None
+    except ValueError:
+        return Response({'error': 'depth, max_nodes and min_signalling must be numbers'}, status=400)
+
+    skill = Skill.objects.filter(id=skill_id).values(
+        'id', 'preferred_label', 'description', 'skill_type', 'reuse_level'
+    ).first()
+    if skill is None:
         return Response({'error': 'Skill not found'}, status=404)
 
-    # Build nodes and edges for visualization
-    nodes = []
-    edges = []
-
-    # Add the main skill as central node
-    nodes.append({
-        'id': skill.id,
-        'label': skill.preferred_label,
-        'type': 'skill',
-        'group': 'central',
-        'skill_type': skill.skill_type,
-        'reuse_level': skill.reuse_level
-    })
-
-    # Add related skills
-    skill_relations = SkillToSkillRelation.objects.filter(requiring_skill=skill)
-    for relation in skill_relations:
-        related_skill = relation.required_skill
-        nodes.append({
-            'id': related_skill.id,
-            'label': related_skill.preferred_label,
-            'type': 'skill',
-            'group': 'related_skill',
-            'skill_type': related_skill.skill_type,
-            'reuse_level': related_skill.reuse_level
-        })
-        edges.append({
-            'from': skill.id,
-            'to': related_skill.id,
-            'label': relation.relation_type,
-            'type': 'skill_relation'
-        })
-
-    # Add related occupations
-    occupation_relations = OccupationToSkillRelation.objects.filter(skill=skill)[:10]
-    for relation in occupation_relations:
-        occupation = relation.occupation
-        nodes.append({
-            'id': occupation.id,
-            'label': occupation.preferred_label,
-            'type': 'occupation',
-            'group': 'related_occupation',
-            'occupation_type': occupation.occupation_type
-        })
-        edges.append({
-            'from': occupation.id,
-            'to': skill.id,
-            'label': relation.relation_type or relation.signalling_value_label,
-            'type': 'occupation_skill_relation',
-            'signalling_value': str(relation.signalling_value) if relation.signalling_value else None
-        })
+    # Skills added since the snapshot was built are answered from the database
+    nodes, edges = (
+        neighbourhood(skill_id, depth, max_nodes, min_signalling)
+        or database_neighbourhood(skill, max_nodes, min_signalling)
+    )
 
     data = {
         'nodes': nodes,
         'edges': edges,
         'center_skill': {
-            'id': skill.id,
-            'name': skill.preferred_label,
-            'description': skill.description
+            'id': skill['id'],
+            'name': skill['preferred_label'],
+            'description': skill['description']
         }
     }
 
@@ -327,9 +347,7 @@ def popular_skills(request):
     """
     Returns the most popular skills based on occupation relations
     """
-    popular_skills = Skill.objects.annotate(
-        occupation_count=Count('occupation_relations')
-    ).filter(occupation_count__gt=0).order_by('-occupation_count')[:20]
+    popular_skills = Skill.objects.filter(occupation_count__gt=0).order_by('-occupation_count', 'id')[:20]
 
     data = []
     for skill in popular_skills:
@@ -339,6 +357,7 @@ def popular_skills(request):
             'skill_type': skill.skill_type,
             'reuse_level': skill.reuse_level,
             'occupation_count': skill.occupation_count,
+            'essential_count': skill.essential_count,
             'description': skill.description[:200] if skill.description else ''
         })
 
@@ -349,38 +368,227 @@ def popular_skills(request):
 @permission_classes([AllowAny])
 def skill_suggestions(request):
     """
-    Returns skill suggestions based on a given skill
+    Returns skill suggestions for one skill (skill_id) or a whole profile
+    (skill_ids, comma-separated), from the precomputed co-occurrence table
     """
-    skill_id = request.GET.get('skill_id')
-    if not skill_id:
-        return Response({'error': 'skill_id is required'}, status=400)
-
+    seed_ids = request.GET.getlist('skill_id')
+    seed_ids += [skill_id for skill_id in request.GET.get('skill_ids', '').split(',') if skill_id]
+    seed_ids = list(dict.fromkeys(seed_ids))
+    if not seed_ids:
+        return Response({'error': 'skill_id or skill_ids is required'}, status=400)
     try:
-        skill = Skill.objects.get(id=skill_id)
-    except Skill.DoesNotExist:
-        return Response({'error': 'Skill not found'}, status=404)
-
-    # Find skills that are often used together with this skill
-    # by finding occupations that use this skill and seeing what other skills they use
-    occupations_with_skill = OccupationToSkillRelation.objects.filter(
-        skill=skill
-    ).values_list('occupation', flat=True)
+        limit = max(1, min(int(request.GET.get('limit', 10)), NEIGHBOURS_PER_SKILL))
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=400)
 
-    suggested_skills = Skill.objects.filter(
-        occupation_relations__occupation__in=occupations_with_skill
-    ).exclude(id=skill_id).annotate(
-        common_occupation_count=Count('occupation_relations__occupation')
-    ).order_by('-common_occupation_count')[:10]
+    suggestions = suggest(seed_ids, limit)
+    if not suggestions and not Skill.objects.filter(id__in=seed_ids).exists():
+        return Response({'error': 'Skill not found'}, status=404)
 
     data = []
-    for suggested_skill in suggested_skills:
+    for suggested_skill, score, common_occupation_count in suggestions:
         data.append({
             'id': suggested_skill.id,
             'preferred_label': suggested_skill.preferred_label,
             'skill_type': suggested_skill.skill_type,
             'reuse_level': suggested_skill.reuse_level,
-            'common_occupation_count': suggested_skill.common_occupation_count,
+            'common_occupation_count': common_occupation_count,
+            'score': round(score, 4),
             'description': suggested_skill.description[:200] if suggested_skill.description else ''
         })
 
     return Response(data)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def similar_occupations(request):
+    """
+    Returns the occupations closest to one occupation (occupation_id) or to
+    each of several (occupation_ids, comma-separated), by the cosine or
+    Jaccard similarity of their skills, keyed by the queried ID
+    """
+    occupation_ids = request.GET.getlist('occupation_id')
+    occupation_ids += [item for item in request.GET.get('occupation_ids', '').split(',') if item]
+    occupation_ids = list(dict.fromkeys(occupation_ids))
+    if not occupation_ids:
+        return Response({'error': 'occupation_id or occupation_ids is required'}, status=400)
+    if len(occupation_ids) > MAX_BATCH_IDS:
+        return Response({'error': f'At most {MAX_BATCH_IDS} occupations per request'}, status=400)
+    metric = request.GET.get('metric', 'cosine')
+    if metric not in similarity.METRICS:
+        return Response({'error': f'metric must be one of: {", ".join(similarity.METRICS)}'}, status=400)
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 10)), similarity.MAX_LIMIT))
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=400)
+
+    neighbours = similarity.similar_occupations(occupation_ids, limit, metric)
+    similar_ids = {similar_id for rows in neighbours.values() for similar_id, _, _ in rows}
+    occupations = Occupation.objects.only(
+        'id', 'preferred_label', 'code', 'occupation_type'
+    ).in_bulk(similar_ids)
+
+    results = {}
+    for occupation_id, rows in neighbours.items():
+        results[occupation_id] = [
+            {
+                'id': similar_id,
+                'preferred_label': occupations[similar_id].preferred_label,
+                'code': occupations[similar_id].code,
+                'occupation_type': occupations[similar_id].occupation_type,
+                'score': round(score, 4),
+                'common_skill_count': common_skill_count,
+            }
+            for similar_id, score, common_skill_count in rows if similar_id in occupations
+        ]
+    return Response({
+        'metric': metric,
+        'results': results,
+        # Unknown IDs, and occupations without any skill relation
+        'missing': [item for item in occupation_ids if item not in neighbours],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_taxonomy(request, file_name):
+    """
+    Streams one taxonomy file, e.g. skills.csv, skills.ndjson or skills.csv.gz
+    """
+    compress = file_name.endswith('.gz')
+    name = file_name[:-len('.gz')] if compress else file_name
+    output_format = 'csv'
+    if name.endswith('.ndjson'):
+        output_format = 'ndjson'
+        name = name[:-len('.ndjson')] + '.csv'
+    if name not in EXPORTS:
+        return Response({
+            'error': 'Unknown export file',
+            'available': sorted(EXPORTS)
+        }, status=404)
+
+    content_type = 'text/csv' if output_format == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(
+        stream_export(name, output_format, compress),
+        content_type='application/gzip' if compress else f'{content_type}; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def extract_skills_view(request):
+    """
+    Finds the taxonomy skills mentioned in free text, with character offsets.
+    Accepts {"text": "..."} or {"texts": ["...", ...]}, at most MAX_EXTRACT_TEXTS
+    texts of MAX_EXTRACT_TEXT_LENGTH characters each. Texts are scanned in the
+    request's own process; large offline batches go through the
+    extract_skills management command instead.
+    """
+    overlapping = bool(request.data.get('overlapping', False))
+    texts = request.data.get('texts')
+    single = texts is None
+    if single:
+        text = request.data.get('text')
+        if not isinstance(text, str) or not text:
+            return Response({'error': 'text or texts is required'}, status=400)
+        texts = [text]
+    elif not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        return Response({'error': 'texts must be a list of strings'}, status=400)
+
+    if len(texts) > MAX_EXTRACT_TEXTS:
+        return Response({'error': f'At most {MAX_EXTRACT_TEXTS} texts per request'}, status=400)
+    if any(len(text) > MAX_EXTRACT_TEXT_LENGTH for text in texts):
+        return Response({'error': f'Texts are limited to {MAX_EXTRACT_TEXT_LENGTH} characters'}, status=400)
+
+    results = [extract_skills(text, overlapping) for text in texts]
+    if single:
+        return Response({'matches': results[0]})
+    return Response({'results': results})
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def batch_lookup(request, kind):
+    """
+    Returns the skills or occupations of up to MAX_BATCH_IDS IDs, keyed by ID.
+    Accepts {"ids": ["...", ...]}; unknown IDs are listed in `missing`
+    """
+    ids = request.data.get('ids')
+    if not isinstance(ids, list) or not all(isinstance(item, str) for item in ids):
+        return Response({'error': 'ids must be a list of strings'}, status=400)
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BATCH_IDS:
+        return Response({'error': f'At most {MAX_BATCH_IDS} ids per request'}, status=400)
+
+    model, serializer_class, prefetches = BATCH_LOOKUPS[kind]
+    fields = requested_fields(field_tree(request))
+    found = model.objects.prefetch_related(*prefetches(fields=fields)).in_bulk(ids)
+    rows = [found[item] for item in ids if item in found]
+    data = serializer_class(rows, many=True, context={'request': request}).data
+    return Response({
+        'results': {row.pk: item for row, item in zip(rows, data)},
+        'missing': [item for item in ids if item not in found],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def hierarchy_ancestors(request, hierarchy, node_id):
+    """
+    Returns the ancestors of a skill, occupation or group, root first (breadcrumbs)
+    """
+    return Response({'id': node_id, 'ancestors': ancestors(hierarchy, node_id)})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def hierarchy_descendants(request, hierarchy, node_id):
+    """
+    Returns every descendant of a group or skill, nearest first, optionally
+    down to `max_depth` levels
+    """
+    max_depth = request.GET.get('max_depth')
+    try:
+        max_depth = int(max_depth) if max_depth else None
+    except ValueError:
+        return Response({'error': 'max_depth must be a number'}, status=400)
+    return Response({'id': node_id, 'descendants': descendants(hierarchy, node_id, max_depth)})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def hierarchy_tree(request):
+    """
+    Returns the whole skill or occupation hierarchy (hierarchy=skill|occupation)
+    as a nested tree, optionally limited to `depth` levels, from a
+    pre-serialized per-version cache
+    """
+    hierarchy = request.GET.get('hierarchy', 'occupation')
+    if hierarchy not in TREES:
+        return Response({'error': f'hierarchy must be one of: {", ".join(TREES)}'}, status=400)
+    depth = request.GET.get('depth')
+    if depth is not None:
+        try:
+            depth = int(depth)
+        except ValueError:
+            depth = 0
+        if depth < 1:
+            return Response({'error': 'depth must be a positive number'}, status=400)
+        depth = min(depth, MAX_TREE_DEPTH)
+
+    tree = get_tree(hierarchy, depth)
+    gzipped = accepts_gzip(request)
+    etag = tree.gzip_etag if gzipped else tree.etag
+    if etag in [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(tree.gzipped if gzipped else tree.body, content_type='application/json')
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+    response['ETag'] = etag
+    response['Vary'] = 'Accept-Encoding'
+    cache_publicly(response)
+    return response
@@ -0,0 +1,46 @@
+"""
+Build the per-process taxonomy caches before a request needs them.
+
+Each process compiles these caches lazily, the first time it sees a new
+taxonomy version. import_csv builds them right after an import, and the WSGI
+and ASGI entry points build them when a worker starts, so that the first
+request does not pay for them. A worker that is already running when an
+import bumps the version still rebuilds them on its next request.
+"""
+import logging
+import time
+from django.db import DatabaseError
+from . import autocomplete, fuzzy
+from .extraction import get_extractor
+
+
+logger = logging.getLogger(__name__)
+
+# Cache name -> function building it for the current taxonomy version
+CACHES = {
+    'skill extractor': get_extractor,
+    'fuzzy trigram indexes': fuzzy.warm_indexes,
+    'autocomplete indexes': autocomplete.get_indexes,
+}
+
+
+def warm_caches():
+    """Build every per-process cache and return how long each took in seconds"""
+    timings = {}
+    for name, build in CACHES.items():
+        started = time.perf_counter()
+        build()
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def warm_caches_on_start():
+    """Warm the caches of a starting worker, which must start even if the database is not ready"""
+    try:
+        timings = warm_caches()
+    except DatabaseError as error:
+        logger.warning('Skipped warming the taxonomy caches: %s', error)
+        return
+    logger.info('Warmed taxonomy caches: %s', ', '.join(
+        f'{name} in {elapsed:.2f}s' for name, elapsed in timings.items()
+    ))
@@ -3,6 +3,8 @@ import type { AxiosInstance } from 'axios';
 import { config } from './config';
 import type {
   PaginatedResponse,
+  BatchResponse,
+  SimilarOccupations,
   SearchResults,
   TaxonomyStats,
   PopularSkill,
@@ -168,6 +170,11 @@ class JobCompassAPI {
     return response.data;
   }
 
+  async getSkillsBatch(ids: string[]): Promise<BatchResponse<Skill>> {
+    const response = await this.client.post<BatchResponse<Skill>>('/taxonomy/skills/batch/', { ids });
+    return response.data;
+  }
+
   async getSkillGroups(): Promise<PaginatedResponse<SkillGroup>> {
     const response = await this.client.get<PaginatedResponse<SkillGroup>>('/taxonomy/skill-groups/');
     return response.data;
@@ -191,6 +198,11 @@ class JobCompassAPI {
     return response.data;
   }
 
+  async getOccupationsBatch(ids: string[]): Promise<BatchResponse<Occupation>> {
+    const response = await this.client.post<BatchResponse<Occupation>>('/taxonomy/occupations/batch/', { ids });
+    return response.data;
+  }
+
   async getOccupationGroups(filters: OccupationGroupFilters = {}): Promise<PaginatedResponse<OccupationGroup>> {
     const response = await this.client.get<PaginatedResponse<OccupationGroup>>('/taxonomy/occupation-groups/', {
       params: filters,
@@ -221,6 +233,17 @@ class JobCompassAPI {
     return response.data;
   }
 
+  async getSimilarOccupations(
+    occupationIds: string[],
+    metric: 'cosine' | 'jaccard' = 'cosine',
+    limit = 10
+  ): Promise<SimilarOccupations> {
+    const response = await this.client.get<SimilarOccupations>('/taxonomy/similar-occupations/', {
+      params: { occupation_ids: occupationIds.join(','), metric, limit },
+    });
+    return response.data;
+  }
+
   // Skill mapping API
   async getSkillMappingData(skillId: string): Promise<SkillMappingData> {
     const response = await this.client.get<SkillMappingData>('/taxonomy/skill-mapping/', {
@@ -238,20 +238,29 @@ export const useDebouncedSearch = (initialQuery = '', delay = 300) => {
 // Custom hook for infinite scroll (for pagination)
 import { useInfiniteQuery } from '@tanstack/react-query';
 
+// Taxonomy lists page with cursors; searches, ranked by relevance, with page numbers
+type PageParam = { cursor?: string; page?: number };
+
+const nextPageParam = (lastPage: PaginatedResponse<any>): PageParam | undefined => {
+  if (!lastPage.next) {
+    return undefined;
+  }
+  const url = new URL(lastPage.next);
+  const cursor = url.searchParams.get('cursor');
+  if (cursor) {
+    return { cursor };
+  }
+  const page = url.searchParams.get('page');
+  return page ? { page: parseInt(page, 10) } : undefined;
+};
+
 export const useInfiniteSkills = (filters?: SkillFilters) => {
   return useInfiniteQuery<PaginatedResponse<any>, Error>({
     queryKey: ['taxonomy', 'skills', 'infinite', filters],
-    queryFn: ({ pageParam = 1 }) => 
-      api.getSkills({ ...filters, page: pageParam as number }),
-    getNextPageParam: (lastPage: PaginatedResponse<any>) => {
-      if (lastPage.next) {
-        const url = new URL(lastPage.next);
-        const page = url.searchParams.get('page');
-        return page ? parseInt(page, 10) : undefined;
-      }
-      return undefined;
-    },
-    initialPageParam: 1,
+    queryFn: ({ pageParam }) => 
+      api.getSkills({ ...filters, ...(pageParam as PageParam) }),
+    getNextPageParam: nextPageParam,
+    initialPageParam: { cursor: '' },
     staleTime: 5 * 60 * 1000,
   });
 };
@@ -259,17 +268,10 @@ export const useInfiniteSkills = (filters?: SkillFilters) => {
 export const useInfiniteOccupations = (filters?: OccupationFilters) => {
   return useInfiniteQuery<PaginatedResponse<any>, Error>({
     queryKey: ['taxonomy', 'occupations', 'infinite', filters],
-    queryFn: ({ pageParam = 1 }) => 
-      api.getOccupations({ ...filters, page: pageParam as number }),
-    getNextPageParam: (lastPage: PaginatedResponse<any>) => {
-      if (lastPage.next) {
-        const url = new URL(lastPage.next);
-        const page = url.searchParams.get('page');
-        return page ? parseInt(page, 10) : undefined;
-      }
-      return undefined;
-    },
-    initialPageParam: 1,
+    queryFn: ({ pageParam }) => 
+      api.getOccupations({ ...filters, ...(pageParam as PageParam) }),
+    getNextPageParam: nextPageParam,
+    initialPageParam: { cursor: '' },
     staleTime: 5 * 60 * 1000,
   });
 };
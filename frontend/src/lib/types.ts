@@ -184,6 +184,21 @@ export interface SkillSuggestion {
   description: string;
 }
 
+export interface SimilarOccupation {
+  id: string;
+  preferred_label: string;
+  code: string;
+  occupation_type: string;
+  score: number;
+  common_skill_count: number;
+}
+
+export interface SimilarOccupations {
+  metric: 'cosine' | 'jaccard';
+  results: Record<string, SimilarOccupation[]>;
+  missing: string[];
+}
+
 // Skill mapping visualization types
 export interface SkillMappingData {
   nodes: NetworkNode[];
@@ -221,6 +236,11 @@ export interface PaginatedResponse<T> {
   results: T[];
 }
 
+export interface BatchResponse<T> {
+  results: Record<string, T>;
+  missing: string[];
+}
+
 // Authentication types
 export interface User {
   id: number;
@@ -351,6 +371,7 @@ export interface SkillFilters {
   reuse_level?: string;
   page?: number;
   page_size?: number;
+  cursor?: string;
 }
 
 export interface OccupationFilters {
@@ -358,6 +379,7 @@ export interface OccupationFilters {
   occupation_type?: string;
   page?: number;
   page_size?: number;
+  cursor?: string;
 }
 
 export interface OccupationGroupFilters {